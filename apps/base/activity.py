@@ -0,0 +1,117 @@
+"""
+Registro de última atividade dos usuários com escrita adiada (write-behind).
+
+Cada requisição autenticada apenas anota `user_id -> horário` em memória.
+As anotações são agrupadas e gravadas em um único UPDATE quando o buffer
+atinge `MAX_BUFFER` usuários, a cada `FLUSH_INTERVAL` segundos e no
+encerramento do processo. Um mesmo usuário é anotado no máximo uma vez a
+cada `RESOLUTION` segundos. A mesma gravação renova a presença
+(`apps.base.presence`) dos usuários anotados que ainda estão logados.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'RESOLUTION': 60,
+    'FLUSH_INTERVAL': 30,
+    'MAX_BUFFER': 500,
+}
+
+
+class ActivityTracker:
+    def __init__(self, resolution, flush_interval, max_buffer):
+        self.resolution = resolution
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._pending = {}
+        self._recorded = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def record(self, user_id, when=None):
+        """Anota a atividade do usuário; grava no banco só quando necessário."""
+        when = when or timezone.now()
+        with self._lock:
+            last = self._recorded.get(user_id)
+            if last is not None and (when - last).total_seconds() < self.resolution:
+                return
+            self._recorded[user_id] = when
+            self._pending[user_id] = when
+            should_flush = (
+                len(self._pending) >= self.max_buffer
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if self._flusher is None:
+                self._start_flusher()
+        if should_flush:
+            self.flush()
+
+    def last_seen(self, user_id):
+        """Horário mais recente conhecido pelo processo (gravado ou não)."""
+        return self._recorded.get(user_id)
+
+    def forget(self, user_id):
+        """Descarta a anotação pendente do usuário (ex.: no logout)."""
+        with self._lock:
+            self._pending.pop(user_id, None)
+            self._recorded.pop(user_id, None)
+
+    def flush(self):
+        """Grava o buffer em um único UPDATE. Retorna a quantidade de usuários."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        from .models import CustomUser
+        from .presence import renew_many
+
+        try:
+            CustomUser.objects.filter(pk__in=pending).update(last_activity=Case(
+                *(When(pk=user_id, then=Value(when)) for user_id, when in pending.items()),
+                output_field=DateTimeField(),
+            ))
+            renew_many(pending)
+        except Exception:
+            logger.exception("Falha ao gravar a última atividade de %d usuário(s).", len(pending))
+            with self._lock:
+                # Devolve ao buffer o que não foi gravado, sem sobrescrever anotações mais novas.
+                for user_id, when in pending.items():
+                    self._pending.setdefault(user_id, when)
+            return 0
+        return len(pending)
+
+    def _start_flusher(self):
+        self._flusher = threading.Thread(target=self._run, name='activity-flusher', daemon=True)
+        self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+                connections.close_all()
+
+
+def _build_tracker():
+    options = {**DEFAULTS, **getattr(settings, 'ACTIVITY_TRACKING', {})}
+    return ActivityTracker(
+        resolution=options['RESOLUTION'],
+        flush_interval=options['FLUSH_INTERVAL'],
+        max_buffer=options['MAX_BUFFER'],
+    )
+
+
+tracker = _build_tracker()
+atexit.register(tracker.flush)
@@ -1,21 +1,43 @@
+from django.utils.functional import SimpleLazyObject
 from apps.phoenix.forms import BOP_SearchForm, Procedure_SearchForm, Report_SearchForm, Person_SearchForm
 from apps.base.forms import CustomPasswordChangeForm, CustomUserChangeForm
 
+def _lazy_form(request, name, factory):
+    """
+    Adia a construção do formulário até o template acessá-lo.
+    A instância é memorizada na requisição, então vários `render()` na
+    mesma requisição compartilham o mesmo formulário.
+    """
+    def build():
+        forms_cache = request.__dict__.setdefault('_forms_context_cache', {})
+        if name not in forms_cache:
+            forms_cache[name] = factory()
+        return forms_cache[name]
+    return SimpleLazyObject(build)
+
 def forms_context(request):
     """
     Adiciona os formulários ao contexto.
     Verifica se o usuário está logado antes de instanciar forms de usuário.
+    Views decoradas com `skip_forms_context` não recebem os formulários.
     """
+    if getattr(request, 'skip_forms_context', False):
+        return {}
+
     context = {
         # Formulários de pesquisa (não dependem de usuário logado)
-        'bop_search_form': BOP_SearchForm(),
-        'procedure_search_form': Procedure_SearchForm(),
-        'report_search_form': Report_SearchForm(),
-        'person_search_form': Person_SearchForm(),
+        'bop_search_form': _lazy_form(request, 'bop_search_form', BOP_SearchForm),
+        'procedure_search_form': _lazy_form(request, 'procedure_search_form', Procedure_SearchForm),
+        'report_search_form': _lazy_form(request, 'report_search_form', Report_SearchForm),
+        'person_search_form': _lazy_form(request, 'person_search_form', Person_SearchForm),
     }
 
     # Só tentamos criar os forms de senha/perfil se o usuário estiver autenticado
     if request.user.is_authenticated:
-        context['password_change_form'] = CustomPasswordChangeForm(user=request.user)
-        context['user_change_form'] = CustomUserChangeForm(instance=request.user)
-    return context
\ No newline at end of file
+        context['password_change_form'] = _lazy_form(
+            request, 'password_change_form', lambda: CustomPasswordChangeForm(user=request.user)
+        )
+        context['user_change_form'] = _lazy_form(
+            request, 'user_change_form', lambda: CustomUserChangeForm(instance=request.user)
+        )
+    return context
@@ -0,0 +1,94 @@
+"""
+Diretório de usuários: listagem paginada com grupo, nível, status online e
+permissão de gerenciamento calculados em uma única consulta.
+"""
+from django.db.models import BooleanField, Case, Exists, OuterRef, Q, Value, When
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import CustomUser, UserPresence
+from .pagination import KeysetPage, clamp_limit, decode_cursor, encode_cursor
+from .roles import annotate_roles, get_role
+from .templatetags.auth_extras import last_activity as last_activity_label
+from .thumbnails import avatar_url
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+DIRECTORY_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'email', 'profile_picture', 'avatar_hash',
+    'last_activity', 'is_active', 'is_superuser',
+)
+
+
+class UserDirectory:
+    """
+    Cada linha é um `CustomUser` com as anotações `group_name`,
+    `group_level`, `online` e `manageable` (pelo usuário que consulta).
+    """
+
+    def __init__(self, requester):
+        self.requester = requester
+
+    def _manageable(self):
+        if self.requester.is_superuser:
+            return Value(True)
+        return Case(
+            When(Q(group_level__gt=get_role(self.requester).level) & ~Q(pk=self.requester.pk), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+
+    def queryset(self, search=None, group=None, online=None, active_only=False):
+        online_now = UserPresence.objects.filter(user=OuterRef('pk'), expires_at__gt=timezone.now())
+        qs = annotate_roles(CustomUser.objects.only(*DIRECTORY_FIELDS)).annotate(online=Exists(online_now))
+        qs = qs.annotate(manageable=self._manageable())
+        if active_only:
+            qs = qs.filter(is_active=True)
+        if search:
+            for term in search.split():
+                qs = qs.filter(
+                    Q(username__icontains=term) | Q(first_name__icontains=term)
+                    | Q(last_name__icontains=term) | Q(email__icontains=term)
+                )
+        if group:
+            qs = qs.filter(group_name=group)
+        if online is not None:
+            qs = qs.filter(online=online)
+        return qs.order_by('username')
+
+    def page(self, cursor=None, limit=PAGE_SIZE, **filters):
+        """
+        Retorna um `KeysetPage` ordenado por `username`.
+        `cursor` é o `next_cursor` da página anterior.
+        """
+        limit = clamp_limit(limit, PAGE_SIZE, MAX_PAGE_SIZE)
+        qs = self.queryset(**filters)
+        if cursor:
+            (last_username,) = decode_cursor(cursor)
+            qs = qs.filter(username__gt=last_username)
+        rows = list(qs[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].username]) if has_more else None
+        return KeysetPage(rows, next_cursor, has_more)
+
+
+def serialize(user):
+    """Representação JSON de uma linha do diretório."""
+    return {
+        'id': user.pk,
+        'username': user.username,
+        'full_name': user.get_full_name() or user.username,
+        'email': user.email,
+        'profile_picture': user.profile_picture.url if user.profile_picture else None,
+        'avatar': avatar_url(user, 42),
+        'group': user.group_name,
+        'level': user.group_level,
+        'online': user.online,
+        'last_activity': user.last_activity.isoformat() if user.last_activity else None,
+        'last_activity_label': last_activity_label(user.last_activity),
+        'profile_url': reverse('base:user_profile', args=[user.pk]),
+        'is_active': user.is_active,
+        'manageable': user.manageable,
+    }
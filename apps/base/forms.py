@@ -2,6 +2,8 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm, PasswordChangeForm, SetPasswordForm
 from django.contrib.auth.models import Group
 from .models import CustomUser
+from .roles import has_group
+from .thumbnails import update_user as update_thumbnails
 
 class CustomUserCreationForm(UserCreationForm):
     """
@@ -27,9 +29,9 @@ class CustomUserCreationForm(UserCreationForm):
         super().__init__(*args, **kwargs)
         
         if self.requesting_user:
-            if self.requesting_user.groups.filter(name='Coordenador').exists():
+            if has_group(self.requesting_user, 'Coordenador'):
                 self.fields['group'].queryset = Group.objects.filter(name__in=['Gerente', 'Usuário'])
-            elif self.requesting_user.groups.filter(name='Gerente').exists():
+            elif has_group(self.requesting_user, 'Gerente'):
                 self.fields['group'].queryset = Group.objects.filter(name__in=['Usuário'])
 
         for field in self.fields.values():
@@ -42,6 +44,7 @@ class CustomUserCreationForm(UserCreationForm):
             user.save()
             group = self.cleaned_data.get('group')
             user.groups.add(group)
+            update_thumbnails(user)
         return user
 
 class AdminUserUpdateForm(forms.ModelForm):
@@ -72,9 +75,9 @@ class AdminUserUpdateForm(forms.ModelForm):
             self.fields['group'].initial = self.instance.groups.first()
 
         if self.requesting_user:
-            if self.requesting_user.groups.filter(name='Coordenador').exists():
+            if has_group(self.requesting_user, 'Coordenador'):
                 self.fields['group'].queryset = Group.objects.filter(name__in=['Gerente', 'Usuário'])
-            elif self.requesting_user.groups.filter(name='Gerente').exists():
+            elif has_group(self.requesting_user, 'Gerente'):
                 self.fields['group'].queryset = Group.objects.filter(name__in=['Usuário'])
         
         for field_name, field in self.fields.items():
@@ -89,6 +92,8 @@ class AdminUserUpdateForm(forms.ModelForm):
             user.save()
             group = self.cleaned_data.get('group')
             user.groups.set([group])
+            if 'profile_picture' in self.changed_data:
+                update_thumbnails(user)
         return user
 
 class CustomUserChangeForm(UserChangeForm):
@@ -112,6 +117,12 @@ class CustomUserChangeForm(UserChangeForm):
         for field in self.fields.values():
             field.widget.attrs.update({'class': 'form-control'})
 
+    def save(self, commit=True):
+        user = super().save(commit=commit)
+        if commit and 'profile_picture' in self.changed_data:
+            update_thumbnails(user)
+        return user
+
 class CustomPasswordChangeForm(PasswordChangeForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
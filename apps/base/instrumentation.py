@@ -0,0 +1,223 @@
+"""
+Instrumentação das consultas SQL de cada requisição.
+
+Durante a requisição, um execute wrapper em cada conexão da thread anota as
+instruções executadas: quantidade, tempo total no banco, as mais lentas e o
+"formato" de cada uma (o SQL sem literais). Um mesmo formato repetido várias
+vezes na requisição é o sinal de N+1 (uma consulta por item dentro de um
+laço, em geral em templates ou propriedades do modelo).
+
+Cada view tem um orçamento de consultas (`BUDGETS`, pelo nome
+`app_name:url_name` da rota, ou o decorator `query_budget`). Requisições que
+estouram o orçamento, repetem um formato `N_PLUS_ONE_THRESHOLD` vezes ou têm
+instruções acima de `SLOW_QUERY_MS` são registradas no log e guardadas em um
+buffer circular com as `RING_SIZE` mais recentes, visível aos
+administradores. Com `STRICT` (modo de teste), o orçamento estourado lança
+`QueryBudgetExceeded`.
+
+As consultas feitas em outras threads (o executor das pesquisas da Phoenix,
+os gravadores em segundo plano) não entram na contagem da requisição.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'STRICT': False,
+    'DEFAULT_BUDGET': 50,
+    'BUDGETS': {},
+    'N_PLUS_ONE_THRESHOLD': 10,
+    'SLOW_QUERY_MS': 200,
+    'KEEP_SLOWEST': 5,
+    'RING_SIZE': 100,
+}
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'QUERY_INSTRUMENTATION', {})}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view executou mais consultas que o seu orçamento (modo estrito)."""
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def sql_shape(sql):
+    """SQL sem literais nem parâmetros: consultas iguais a menos dos valores têm o mesmo formato."""
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _PLACEHOLDER_LIST.sub('(...)', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+class QueryProfile:
+    """Consultas de uma requisição."""
+
+    def __init__(self, keep_slowest):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.slowest = []
+        self._seq = 0
+
+    def add(self, alias, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[sql_shape(sql)] += 1
+        self._seq += 1
+        entry = (duration, self._seq, alias, sql)
+        if len(self.slowest) < self.keep_slowest:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.add(alias, sql, time.perf_counter() - start)
+        return wrapper
+
+    def repeated(self, threshold):
+        """Formatos executados pelo menos `threshold` vezes, do mais repetido ao menos."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def slowest_statements(self):
+        return [(alias, sql, duration) for duration, _, alias, sql in sorted(self.slowest, reverse=True)]
+
+
+@contextmanager
+def capture(keep_slowest=None):
+    """Anota as consultas feitas nesta thread, em todas as conexões, enquanto o bloco executa."""
+    profile = QueryProfile(keep_slowest or get_options()['KEEP_SLOWEST'])
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(profile.wrapper(alias)))
+        yield profile
+
+
+class OffenderLog:
+    """Buffer circular com as requisições problemáticas mais recentes (por processo)."""
+
+    def __init__(self, size):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def recent(self):
+        """Entradas da mais recente para a mais antiga."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+offenders = OffenderLog(get_options()['RING_SIZE'])
+
+
+def view_name(request):
+    """
+    Nome `app_name:url_name` da rota resolvida; sem nome, o caminho da view
+    (`modulo.View`), e sem rota, o caminho da requisição.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return request.path
+    if match.url_name:
+        return match.view_name
+    func = getattr(match.func, 'view_class', match.func)
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def budget_for(request, options):
+    match = getattr(request, 'resolver_match', None)
+    budget = getattr(getattr(match, 'func', None), 'query_budget', None)
+    if budget is None:
+        budget = options['BUDGETS'].get(view_name(request), options['DEFAULT_BUDGET'])
+    return budget
+
+
+def query_budget(limit):
+    """Define o orçamento de consultas da view (sobrepõe `BUDGETS` e `DEFAULT_BUDGET`)."""
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+def inspect(request, response, profile, options):
+    """
+    Confere o perfil da requisição com o orçamento e os limites; registra no
+    log e no buffer quando há problema. Retorna a entrada registrada ou None.
+    """
+    budget = budget_for(request, options)
+    repeated = profile.repeated(options['N_PLUS_ONE_THRESHOLD'])
+    slow_limit = options['SLOW_QUERY_MS'] / 1000
+    slowest = profile.slowest_statements()
+
+    problems = []
+    if budget is not None and profile.count > budget:
+        problems.append('orcamento')
+    if repeated:
+        problems.append('n+1')
+    if slowest and slowest[0][2] >= slow_limit:
+        problems.append('lenta')
+    if not problems:
+        return None
+
+    entry = {
+        'when': timezone.now(),
+        'view': view_name(request),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': getattr(response, 'status_code', None),
+        'user_id': getattr(getattr(request, 'user', None), 'pk', None),
+        'count': profile.count,
+        'budget': budget,
+        'db_time_ms': round(profile.duration * 1000, 1),
+        'problems': problems,
+        'repeated': repeated,
+        'slowest': [
+            {'alias': alias, 'sql': sql, 'ms': round(duration * 1000, 1)}
+            for alias, sql, duration in slowest
+        ],
+    }
+    offenders.add(entry)
+    logger.warning(
+        "%s %s (%s): %d consultas (orçamento %s), %.1f ms no banco; problemas: %s.",
+        entry['method'], entry['path'], entry['view'], entry['count'], budget,
+        entry['db_time_ms'], ', '.join(problems),
+    )
+    for shape, count in repeated:
+        logger.warning("  repetida %dx: %s", count, shape[:300])
+
+    if options['STRICT'] and 'orcamento' in problems:
+        raise QueryBudgetExceeded(
+            f"{entry['view']} executou {profile.count} consultas (orçamento {budget})."
+        )
+    return entry
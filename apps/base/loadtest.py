@@ -0,0 +1,271 @@
+"""
+Teste de carga em processo das páginas críticas do portal.
+
+Cada usuário virtual é uma thread com o seu próprio `django.test.Client`,
+que chama a aplicação WSGI diretamente (sem servidor nem rede). O usuário
+virtual faz login por `base:login`, como o navegador, e depois executa
+passos sorteados do cenário (`build_scenario`), com uma pausa aleatória
+entre eles (think time), até o tempo do teste acabar.
+
+Para cada endpoint (`app_name:url_name`) são medidos latência (p50, p95,
+p99), vazão, erros e consultas SQL por requisição. As consultas das
+pesquisas da Phoenix executadas no executor próprio (`apps.phoenix.concurrency`)
+não entram na contagem. Os SLOs (`LOAD_TEST['SLOS']`) são conferidos ao final.
+Durante o teste as senhas usam `PASSWORD_HASHERS` (um hash rápido): o login
+mede a aplicação, e não o PBKDF2 concorrendo pelo GIL com os demais usuários
+virtuais.
+
+Os usuários de teste são contas reais (prefixo `USERNAME_PREFIX`) no banco
+configurado (a primeira é sempre `Administrador`). Fora do `DEBUG`, o
+teste só roda com confirmação explícita. A senha vem de
+`LOAD_TEST['PASSWORD']`; sem ela, cada execução sorteia uma nova. `cleanup_users` remove essas contas.
+"""
+import random
+import secrets
+import statistics
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import DatabaseError, close_old_connections, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from .instrumentation import capture
+from .models import Application, Module
+
+DEFAULTS = {
+    'USERS': 10,
+    'DURATION': 30,
+    'THINK_TIME': 0.5,
+    'PASSWORD': None,
+    'USERNAME_PREFIX': 'loadtest_',
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+    'DEFAULT_SLO': {'p95_ms': 500, 'error_rate': 0.01},
+    'SLOS': {},
+}
+
+# Grupo -> fração dos usuários virtuais.
+ROLE_MIX = {'Administrador': 0.1, 'Gerente': 0.2, 'Usuário': 0.7}
+PHOENIX_MODULES = {'home': 'Pesquisa', 'resultados': 'Resultados', 'itens_salvos': 'Itens Salvos'}
+
+class LoadTestRefused(Exception):
+    """O teste criaria contas no banco configurado sem que isso tenha sido confirmado."""
+
+
+Step = namedtuple('Step', ['name', 'weight', 'method', 'url', 'data', 'managerial'])
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'LOAD_TEST', {})}
+
+
+def _check_allowed(confirmed):
+    """Recusa o teste fora do `DEBUG` sem confirmação explícita (a senha não confirma nada)."""
+    if not (settings.DEBUG or confirmed):
+        raise LoadTestRefused("DEBUG está desligado: confirme que o banco não é o de produção.")
+
+
+def _check_prefix(prefix):
+    if not prefix:
+        raise LoadTestRefused("LOAD_TEST['USERNAME_PREFIX'] não pode ser vazio.")
+
+
+def cleanup_users(prefix=None):
+    """Remove os usuários de teste (username com o prefixo). Retorna quantos foram removidos."""
+    prefix = get_options()['USERNAME_PREFIX'] if prefix is None else prefix
+    _check_prefix(prefix)
+    users = get_user_model().objects.filter(username__startswith=prefix)
+    count = users.count()
+    users.delete()
+    return count
+
+
+def seed_users(count, password, prefix):
+    """
+    Cria (ou reaproveita) `count` usuários de teste distribuídos pelos grupos
+    de `ROLE_MIX`, com acesso aos módulos da Phoenix. Retorna a lista de
+    `(username, grupo)`.
+    """
+    User = get_user_model()
+    groups = {name: Group.objects.get_or_create(name=name)[0] for name in ROLE_MIX}
+    application, _ = Application.objects.get_or_create(app_namespace='phoenix', defaults={'name': 'Phoenix'})
+    modules = [
+        Module.objects.get_or_create(application=application, view_name=view_name, defaults={'name': name})[0]
+        for view_name, name in PHOENIX_MODULES.items()
+    ]
+
+    accounts = []
+    names = list(ROLE_MIX)
+    weights = [ROLE_MIX[name] for name in names]
+    rng = random.Random(0)
+    for index in range(count):
+        group_name = names[0] if index == 0 else rng.choices(names, weights)[0]
+        username = f'{prefix}{index:04d}'
+        user, created = User.objects.get_or_create(username=username, defaults={'email': f'{username}@example.com'})
+        if created or not user.check_password(password):
+            user.set_password(password)
+            user.save()
+        user.groups.set([groups[group_name]])
+        user.modules.add(*modules)
+        accounts.append((username, group_name))
+    return accounts
+
+
+def build_scenario():
+    """Passos dos usuários virtuais. Os números de boletim pesquisados vêm da própria sicadfull."""
+    steps = [
+        Step('base:home', 6, 'get', reverse('base:home'), None, False),
+        Step('base:set_theme', 1, 'post_json', reverse('base:set_theme'), None, False),
+        Step('base:user_management', 3, 'get', reverse('base:user_management'), None, True),
+        Step('phoenix:home', 4, 'get', reverse('phoenix:home'), None, False),
+        Step('phoenix:itens_salvos', 1, 'get', reverse('phoenix:itens_salvos'), None, False),
+    ]
+    try:
+        from apps.phoenix.models import Sicadfull
+
+        numbers = list(
+            Sicadfull.objects.filter(exclusao=False, nro_bop__isnull=False)
+            .order_by('-pk').values_list('nro_bop', flat=True)[:200]
+        )
+    except DatabaseError:
+        numbers = []
+    if numbers:
+        steps.append(Step(
+            'phoenix:resultados', 3, 'get', reverse('phoenix:resultados', args=['bop']), numbers, False,
+        ))
+    return steps
+
+
+class Recorder:
+    """Amostras por endpoint, compartilhadas entre as threads."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, name, elapsed, status, queries):
+        with self._lock:
+            self.samples[name].append((elapsed, status, queries))
+
+
+def _request(client, step, rng):
+    if step.method == 'post_json':
+        return client.post(step.url, {'theme': rng.choice(('light', 'dark'))}, content_type='application/json')
+    if step.data:
+        return client.get(step.url, {'nro_bop': rng.choice(step.data)})
+    return client.get(step.url)
+
+
+def _timed(recorder, name, func):
+    with capture() as profile:
+        start = time.perf_counter()
+        response = func()
+        elapsed = time.perf_counter() - start
+    recorder.add(name, elapsed, response.status_code, profile.count)
+    return response
+
+
+def virtual_user(index, username, group_name, password, steps, deadline, think_time, recorder):
+    rng = random.Random(index)
+    client = Client()
+    try:
+        response = _timed(recorder, 'base:login', lambda: client.post(
+            reverse('base:login'), {'username': username, 'password': password},
+        ))
+        if response.status_code != 200:
+            return
+        allowed = [step for step in steps if not step.managerial or group_name != 'Usuário']
+        weights = [step.weight for step in allowed]
+        while time.monotonic() < deadline:
+            step = rng.choices(allowed, weights)[0]
+            _timed(recorder, step.name, lambda: _request(client, step, rng))
+            if think_time:
+                time.sleep(rng.uniform(0, think_time * 2))
+    finally:
+        close_old_connections()
+        connections.close_all()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(recorder, wall_time):
+    report = {}
+    for name, samples in sorted(recorder.samples.items()):
+        latencies = [elapsed * 1000 for elapsed, _, _ in samples]
+        # 5xx, 429 (pesquisa recusada) e 401/403 do login contam como erro; redirecionamentos não.
+        errors = sum(1 for _, status, _ in samples if status >= 500 or status in (401, 403, 429))
+        report[name] = {
+            'requests': len(samples),
+            'throughput_rps': round(len(samples) / wall_time, 2) if wall_time else None,
+            'p50_ms': round(_percentile(latencies, 0.50), 2),
+            'p95_ms': round(_percentile(latencies, 0.95), 2),
+            'p99_ms': round(_percentile(latencies, 0.99), 2),
+            'max_ms': round(max(latencies), 2),
+            'error_rate': round(errors / len(samples), 4),
+            'queries_mean': round(statistics.fmean(queries for _, _, queries in samples), 2),
+            'queries_max': max(queries for _, _, queries in samples),
+        }
+    return report
+
+
+def check_slos(report, slos, default_slo):
+    """Lista `(endpoint, métrica, medido, limite)` dos SLOs não atendidos."""
+    violations = []
+    for name, result in report.items():
+        for metric, limit in {**default_slo, **slos.get(name, {})}.items():
+            measured = result.get(metric)
+            if measured is not None and limit is not None and measured > limit:
+                violations.append((name, metric, measured, limit))
+    return violations
+
+
+def run(users=None, duration=None, think_time=None, seed_only=False, confirmed=False):
+    """
+    Prepara os usuários, executa o teste e retorna
+    `(relatório por endpoint, tempo total em segundos, violações de SLO)`.
+    Lança `LoadTestRefused` fora do `DEBUG`, a menos que `confirmed` seja verdadeiro.
+    """
+    options = get_options()
+    users = users or options['USERS']
+    duration = options['DURATION'] if duration is None else duration
+    think_time = options['THINK_TIME'] if think_time is None else think_time
+
+    _check_allowed(confirmed)
+    _check_prefix(options['USERNAME_PREFIX'])
+    password = options['PASSWORD'] or secrets.token_urlsafe(16)
+    with override_settings(PASSWORD_HASHERS=options['PASSWORD_HASHERS']):
+        accounts = seed_users(users, password, options['USERNAME_PREFIX'])
+        if seed_only:
+            return {}, 0.0, []
+        return _run(accounts, password, duration, think_time, options)
+
+
+def _run(accounts, password, duration, think_time, options):
+    steps = build_scenario()
+    recorder = Recorder()
+
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=virtual_user, name=f'loadtest-{index}',
+            args=(index, username, group_name, password, steps, deadline, think_time, recorder),
+        )
+        for index, (username, group_name) in enumerate(accounts)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.monotonic() - started
+
+    report = summarize(recorder, wall_time)
+    return report, wall_time, check_slos(report, options['SLOS'], options['DEFAULT_SLO'])
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.base import thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera as miniaturas das fotos de perfil já existentes e grava o hash de cada foto "
+        "nos usuários. Cada arquivo de foto é processado uma única vez, em paralelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Fotos processadas em paralelo.")
+        parser.add_argument('--force', action='store_true', help="Regera as miniaturas que já existem.")
+        parser.add_argument(
+            '--missing-only', action='store_true',
+            help="Processa apenas os usuários ainda sem miniaturas (avatar_hash vazio).",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.exclude(profile_picture='')
+        if options['missing_only']:
+            users = users.filter(avatar_hash='')
+        # Vários usuários podem apontar para o mesmo arquivo (ex.: a foto padrão).
+        names = sorted(set(users.values_list('profile_picture', flat=True)))
+        field = User._meta.get_field('profile_picture')
+
+        def process(name):
+            try:
+                field_file = field.attr_class(None, field, name)
+                return name, thumbnails.generate(field_file, force=options['force'])
+            finally:
+                connections.close_all()
+
+        done = failed = 0
+        # O Pillow libera o GIL ao redimensionar e codificar: threads bastam para o paralelismo.
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {executor.submit(process, name): name for name in names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    _, digest = future.result()
+                except (OSError, ValueError) as exc:
+                    failed += 1
+                    self.stderr.write(f"{name}: {exc}")
+                    continue
+                updated = users.filter(profile_picture=name).exclude(avatar_hash=digest).update(avatar_hash=digest)
+                done += 1
+                self.stdout.write(f"{name}: {digest} ({updated} usuário(s) atualizado(s))")
+
+        self.stdout.write(self.style.SUCCESS(f"{done} foto(s) processada(s), {failed} com erro."))
@@ -0,0 +1,80 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.base import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga em processo: usuários virtuais autenticados acessam as páginas "
+        "críticas do portal e da Phoenix; falha quando algum SLO não é atendido."
+    )
+
+    def add_arguments(self, parser):
+        options = loadtest.get_options()
+        parser.add_argument('--users', type=int, default=options['USERS'], help="Usuários virtuais simultâneos.")
+        parser.add_argument('--duration', type=float, default=options['DURATION'], help="Duração do teste (segundos).")
+        parser.add_argument(
+            '--think-time', type=float, default=options['THINK_TIME'],
+            help="Pausa média (segundos) entre os passos de cada usuário virtual.",
+        )
+        parser.add_argument('--seed-only', action='store_true', help="Apenas cria os usuários e grupos de teste.")
+        parser.add_argument('--output', help="Arquivo JSON onde o relatório é gravado.")
+        parser.add_argument(
+            '--cleanup', action='store_true',
+            help=f"Apenas remove os usuários de teste (prefixo {options['USERNAME_PREFIX']!r}).",
+        )
+        parser.add_argument(
+            '--i-know-this-is-not-production', action='store_true', dest='confirmed',
+            help="Permite criar os usuários de teste com DEBUG desligado.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['cleanup']:
+                removed = loadtest.cleanup_users()
+                self.stdout.write(self.style.SUCCESS(f"{removed} usuário(s) de teste removidos."))
+                return
+            report, wall_time, violations = loadtest.run(
+                users=options['users'], duration=options['duration'], think_time=options['think_time'],
+                seed_only=options['seed_only'], confirmed=options['confirmed'],
+            )
+        except loadtest.LoadTestRefused as exc:
+            raise CommandError(str(exc)) from exc
+        if options['seed_only']:
+            self.stdout.write(self.style.SUCCESS(f"{options['users']} usuário(s) de teste prontos."))
+            return
+
+        total = sum(result['requests'] for result in report.values())
+        self.stdout.write(
+            f"{options['users']} usuário(s) virtuais, {wall_time:.1f}s, "
+            f"{total} requisições ({total / wall_time:.1f}/s)"
+        )
+        self.stdout.write(
+            f"{'endpoint':<24} {'req':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'erros':>7} {'consultas':>10}"
+        )
+        for name, result in report.items():
+            self.stdout.write(
+                f"{name:<24} {result['requests']:>6} {result['throughput_rps']:>7.1f} {result['p50_ms']:>8.1f} "
+                f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['error_rate']:>7.1%} "
+                f"{result['queries_mean']:>10.1f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump({
+                    'users': options['users'], 'duration': wall_time, 'think_time': options['think_time'],
+                    'endpoints': report,
+                    'violations': [
+                        {'endpoint': name, 'metric': metric, 'measured': measured, 'limit': limit}
+                        for name, metric, measured, limit in violations
+                    ],
+                }, output, indent=2, ensure_ascii=False)
+
+        if violations:
+            for name, metric, measured, limit in violations:
+                self.stderr.write(f"SLO não atendido: {name} {metric} = {measured} (limite {limit})")
+            raise CommandError(f"{len(violations)} SLO(s) não atendido(s).")
+        self.stdout.write(self.style.SUCCESS("Todos os SLOs foram atendidos."))
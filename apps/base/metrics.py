@@ -0,0 +1,327 @@
+"""
+Métricas do portal (latência, status, tempo no banco, caches e logins).
+
+Contadores e histogramas ficam em memória do processo, com um lock por
+métrica, e são expostos no formato de texto do Prometheus pela view
+`base:metrics`. Os histogramas usam faixas fixas (`buckets`): registrar uma
+observação é uma busca binária e dois incrementos.
+
+Em servidores com vários processos (gunicorn, uWSGI com prefork), defina
+`METRICS['MULTIPROCESS_DIR']`: cada processo grava o seu estado em um
+arquivo `metrics-<pid>.json` nesse diretório a cada `FLUSH_INTERVAL`
+segundos e no encerramento, e a view soma os arquivos de todos os
+processos. Os arquivos de processos encerrados continuam somando (os
+contadores do Prometheus só crescem); limpe o diretório ao reiniciar o
+servidor.
+"""
+import atexit
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'NAMESPACE': 'sara',
+    'MULTIPROCESS_DIR': None,
+    'FLUSH_INTERVAL': 15,
+    'TOKEN': None,
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'METRICS', {})}
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labelnames)
+
+    def dump(self):
+        with self._lock:
+            values = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {'kind': self.kind, 'help': self.documentation, 'labels': list(self.labelnames), 'values': values}
+
+    def _copy(self, value):
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Contagens por faixa (a última é +Inf) e soma das observações.
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _copy(self, value):
+        return [list(value[0]), value[1]]
+
+    def dump(self):
+        data = super().dump()
+        data['buckets'] = list(self.buckets)
+        return data
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica já registrada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """
+        `collector()` é chamado a cada coleta e retorna pares
+        `(contador, {rótulos}, valor)` somados ao estado dos contadores.
+        Serve para valores já contados em outro lugar (ex.: `LRUCache.hits`).
+        """
+        self._collectors.append(collector)
+
+    def dump(self):
+        """Estado de todas as métricas (serializável em JSON)."""
+        data = {name: metric.dump() for name, metric in self._metrics.items()}
+        for collector in self._collectors:
+            for metric, labels, value in collector():
+                values = data[metric.name]['values']
+                key = list(metric._key(labels))
+                for entry in values:
+                    if entry[0] == key:
+                        entry[1] += value
+                        break
+                else:
+                    values.append([key, value])
+        return data
+
+    def clear(self):
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+registry = Registry()
+
+
+def merge(dumps):
+    """Soma os estados (`Registry.dump`) de vários processos."""
+    merged = {}
+    for data in dumps:
+        for name, metric in data.items():
+            target = merged.setdefault(name, {**metric, 'values': {}})
+            if metric.get('buckets') != target.get('buckets'):
+                continue
+            for key, value in metric['values']:
+                key = tuple(key)
+                current = target['values'].get(key)
+                if current is None:
+                    target['values'][key] = json.loads(json.dumps(value))
+                elif metric['kind'] == 'histogram':
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                else:
+                    target['values'][key] = current + value
+    for metric in merged.values():
+        metric['values'] = [[list(key), value] for key, value in metric['values'].items()]
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+def exposition(data, namespace=None):
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+    namespace = get_options()['NAMESPACE'] if namespace is None else namespace
+    lines = []
+    for name in sorted(data):
+        metric = data[name]
+        full_name = f'{namespace}_{name}' if namespace else name
+        lines.append(f'# HELP {full_name} {metric["help"]}')
+        lines.append(f'# TYPE {full_name} {metric["kind"]}')
+        for key, value in sorted(metric['values']):
+            if metric['kind'] == 'histogram':
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip([*metric['buckets'], math.inf], counts):
+                    cumulative += count
+                    lines.append(f'{full_name}_bucket{_labels(metric["labels"], key, [("le", _number(float(bound)))])} {cumulative}')
+                lines.append(f'{full_name}_sum{_labels(metric["labels"], key)} {_number(float(total))}')
+                lines.append(f'{full_name}_count{_labels(metric["labels"], key)} {cumulative}')
+            else:
+                lines.append(f'{full_name}{_labels(metric["labels"], key)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class MultiProcessStore:
+    """Arquivos de estado, um por processo, em um diretório compartilhado."""
+
+    def __init__(self, directory, flush_interval):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self._flusher = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.directory / f'metrics-{os.getpid()}.json'
+
+    def write(self):
+        """Grava o estado deste processo (troca atômica do arquivo)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(registry.dump()))
+        os.replace(temporary, path)
+
+    def read_all(self):
+        dumps = []
+        for path in self.directory.glob('metrics-*.json'):
+            try:
+                dumps.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                logger.warning("Arquivo de métricas ilegível: %s", path)
+        return dumps
+
+    def collect(self):
+        self.write()
+        return merge(self.read_all())
+
+    def ensure_flusher(self):
+        # Iniciado no primeiro uso, já dentro do processo filho (depois do fork).
+        if self._flusher is not None and self._flusher[0] == os.getpid():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher[0] == os.getpid():
+                return
+            thread = threading.Thread(target=self._run, name='metrics-flusher', daemon=True)
+            self._flusher = (os.getpid(), thread)
+            thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Falha ao gravar as métricas do processo %d.", os.getpid())
+
+
+def _build_store():
+    options = get_options()
+    if not options['MULTIPROCESS_DIR']:
+        return None
+    store = MultiProcessStore(options['MULTIPROCESS_DIR'], options['FLUSH_INTERVAL'])
+    atexit.register(store.write)
+    return store
+
+
+store = _build_store()
+
+
+def collect():
+    """Estado das métricas: do processo ou, com `MULTIPROCESS_DIR`, somado entre os processos."""
+    if store is not None:
+        return store.collect()
+    return registry.dump()
+
+
+# --- Métricas do portal ---
+
+request_latency = registry.histogram(
+    'http_request_duration_seconds', 'Duração das requisições por view.', ['view', 'method'],
+)
+responses = registry.counter(
+    'http_responses_total', 'Respostas por view e código de status.', ['view', 'method', 'status'],
+)
+db_time = registry.histogram(
+    'db_time_seconds', 'Tempo no banco por requisição (consultas da thread da requisição).', ['view'],
+)
+db_queries = registry.histogram(
+    'db_queries_per_request', 'Consultas SQL por requisição.', ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+cache_requests = registry.counter(
+    'cache_requests_total', 'Consultas aos caches da aplicação, por resultado (hit/miss).', ['cache', 'result'],
+)
+logins = registry.counter(
+    'login_attempts_total', 'Tentativas de login por resultado.', ['result'],
+)
+
+
+def _lru_caches():
+    from .caching import named_caches
+
+    for lru in named_caches():
+        yield cache_requests, {'cache': lru.name, 'result': 'hit'}, lru.hits
+        yield cache_requests, {'cache': lru.name, 'result': 'miss'}, lru.misses
+
+
+registry.add_collector(_lru_caches)
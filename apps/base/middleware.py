@@ -1,9 +1,14 @@
-from django.utils import timezone
-from .models import CustomUser
+import time
+
+from django.conf import settings
+
+from . import instrumentation, metrics
+from .activity import tracker
 
 class UpdateLastActivityMiddleware:
     """
-    Middleware que atualiza o campo `last_activity` do usuário a cada requisição.
+    Middleware que registra a última atividade do usuário a cada requisição.
+    A gravação em `last_activity` é agrupada e adiada pelo `ActivityTracker`.
     """
     def __init__(self, get_response):
         self.get_response = get_response
@@ -11,5 +16,60 @@ class UpdateLastActivityMiddleware:
     def __call__(self, request):
         response = self.get_response(request)
         if request.user.is_authenticated:
-            CustomUser.objects.filter(pk=request.user.pk).update(last_activity=timezone.now())
-        return response
\ No newline at end of file
+            tracker.record(request.user.pk)
+        return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Middleware que mede as consultas SQL de cada requisição (quantidade, tempo,
+    repetições e as mais lentas) e confere o orçamento de consultas da view.
+    Ver `apps.base.instrumentation`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = instrumentation.get_options()
+        if not options['ENABLED']:
+            return self.get_response(request)
+        with instrumentation.capture(options['KEEP_SLOWEST']) as profile:
+            request.query_profile = profile
+            response = self.get_response(request)
+        instrumentation.inspect(request, response, profile, options)
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(profile.count)
+            response['Server-Timing'] = f'db;dur={profile.duration * 1000:.1f};desc="{profile.count} consultas"'
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Middleware que alimenta as métricas de latência, status e tempo no banco
+    por view (`apps.base.metrics`). Deve vir antes do
+    `QueryInstrumentationMiddleware`, de quem lê o perfil das consultas.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = metrics.get_options()
+        if not options['ENABLED']:
+            return self.get_response(request)
+        if metrics.store is not None:
+            metrics.store.ensure_flusher()
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        # Rotas não resolvidas (404) ficam em um único rótulo, para não criar uma série por caminho.
+        match = getattr(request, 'resolver_match', None)
+        view = instrumentation.view_name(request) if match is not None else 'unmatched'
+        metrics.request_latency.observe(elapsed, view=view, method=request.method)
+        metrics.responses.inc(view=view, method=request.method, status=response.status_code)
+        profile = getattr(request, 'query_profile', None)
+        if profile is not None:
+            metrics.db_time.observe(profile.duration, view=view)
+            metrics.db_queries.observe(profile.count, view=view)
+        return response
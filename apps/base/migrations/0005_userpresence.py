@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_customuser_theme'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPresence',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='presence', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Online até')),
+            ],
+            options={
+                'verbose_name': 'Presença',
+                'verbose_name_plural': 'Presenças',
+            },
+        ),
+    ]
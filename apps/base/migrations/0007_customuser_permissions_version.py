@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_customuser_avatar_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='permissions_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Versão das Permissões'),
+        ),
+    ]
@@ -72,6 +72,14 @@ class CustomUser(AbstractUser):
         upload_to='profile_pics/',
         default='profile_pics/default.jpg'
     )
+    # Hash do conteúdo da foto, que nomeia as miniaturas (apps.base.thumbnails).
+    avatar_hash = models.CharField(
+        _("Hash da Foto"),
+        max_length=16,
+        blank=True,
+        default='',
+        editable=False
+    )
     allowed_ip_address = models.CharField(
         _("IP de Acesso Permitido"),
         max_length=15,
@@ -97,8 +105,44 @@ class CustomUser(AbstractUser):
         choices=THEME_CHOICES,
         default='light' # Tema padrão para novos usuários
     )
+    # Versão das permissões de módulo, incrementada por apps.base.permissions
+    # a cada alteração de acessos; identifica o snapshot de permissões em cache.
+    permissions_version = models.PositiveIntegerField(
+        _("Versão das Permissões"),
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = _("Usuário")
         verbose_name_plural = _("Usuários")
-        ordering = ['username']
\ No newline at end of file
+        ordering = ['username']
+
+    def save(self, *args, **kwargs):
+        # `permissions_version` só é alterada por UPDATE com F(): salvar uma
+        # instância carregada antes de uma revogação não pode voltar a versão.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name != 'permissions_version'
+            ]
+        super().save(*args, **kwargs)
+
+class UserPresence(models.Model):
+    """
+    Índice de usuários online: uma linha por usuário com sessão ativa,
+    válida até `expires_at` (renovada pela atividade do usuário).
+    """
+    user = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='presence',
+        verbose_name=_("Usuário")
+    )
+    expires_at = models.DateTimeField(_("Online até"), db_index=True)
+
+    class Meta:
+        verbose_name = _("Presença")
+        verbose_name_plural = _("Presenças")
@@ -0,0 +1,53 @@
+"""
+Cursores opacos para paginação por chave (keyset/seek pagination).
+
+O cursor carrega os valores da chave de ordenação do último item da página;
+a próxima página é buscada com `WHERE chave > cursor`, o que mantém o custo
+constante independentemente da profundidade da página.
+"""
+import base64
+import json
+from collections import namedtuple
+from datetime import date, datetime
+
+KeysetPage = namedtuple('KeysetPage', ['rows', 'next_cursor', 'has_more'])
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return {'__date__': value.isoformat()}
+    raise TypeError(f"Tipo não suportado no cursor: {type(value).__name__}")
+
+
+def _object_hook(obj):
+    if '__date__' in obj:
+        value = obj['__date__']
+        return datetime.fromisoformat(value) if 'T' in value else date.fromisoformat(value)
+    return obj
+
+
+def encode_cursor(values):
+    """Codifica uma lista de valores em um token opaco e seguro para URLs."""
+    raw = json.dumps(list(values), default=_default, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decodifica um token de `encode_cursor`. Lança ValueError se for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw, object_hook=_object_hook)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor inválido.") from exc
+    if not isinstance(values, list):
+        raise ValueError("Cursor inválido.")
+    return values
+
+
+def clamp_limit(value, default, maximum):
+    """Converte o tamanho de página pedido pelo cliente, respeitando o limite."""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
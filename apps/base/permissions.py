@@ -0,0 +1,76 @@
+"""
+Snapshot compilado das permissões de módulo de cada usuário.
+
+O conjunto de pares `(app_namespace, view_name)` liberados para o usuário é
+calculado uma vez e guardado no cache do Django, em uma chave que inclui
+`CustomUser.permissions_version`. Os sinais em `apps.base.signals`
+incrementam essa versão no banco (do usuário, ou de todos quando mudam
+aplicações e módulos). Como o `AuthenticationMiddleware` relê o usuário a
+cada requisição, uma revogação vale imediatamente em todos os processos,
+mesmo com o cache local de cada worker; o `PERMISSION_SNAPSHOT_TTL` só
+limita o tempo que snapshots antigos ocupam o cache.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+
+from .metrics import cache_requests
+
+
+def invalidate_user(user_id):
+    """Invalida o snapshot de um usuário."""
+    get_user_model().objects.filter(pk=user_id).update(permissions_version=F('permissions_version') + 1)
+
+
+def invalidate_all():
+    """Invalida os snapshots de todos os usuários."""
+    get_user_model().objects.update(permissions_version=F('permissions_version') + 1)
+
+
+def get_module_snapshot(user):
+    """
+    Retorna o `frozenset` de pares (app_namespace, view_name) liberados ao usuário.
+    O resultado é memorizado na instância do usuário (ou seja, na requisição).
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    snapshot = getattr(user, '_module_snapshot', None)
+    if snapshot is not None:
+        return snapshot
+
+    key = f'perm:snapshot:{user.pk}:{user.permissions_version}'
+    snapshot = cache.get(key)
+    cache_requests.inc(cache='permissions', result='miss' if snapshot is None else 'hit')
+    if snapshot is None:
+        snapshot = frozenset(user.modules.values_list('application__app_namespace', 'view_name'))
+        cache.set(key, snapshot, timeout=getattr(settings, 'PERMISSION_SNAPSHOT_TTL', 300))
+    user._module_snapshot = snapshot
+    return snapshot
+
+
+def _split(module):
+    app_namespace, _, view_name = module.partition(':')
+    return app_namespace, view_name
+
+
+def can_access(user, app_namespace, view_name):
+    """Verifica se o usuário pode acessar a view `app_namespace:view_name`."""
+    if not user.is_authenticated:
+        return False
+    if user.is_superuser:
+        return True
+    return (app_namespace, view_name) in get_module_snapshot(user)
+
+
+def accessible_modules(user, modules):
+    """
+    Filtra, de uma vez, quais dos módulos ("app_namespace:view_name")
+    o usuário pode acessar. Retorna um `set` com os liberados.
+    """
+    if not user.is_authenticated:
+        return set()
+    if user.is_superuser:
+        return set(modules)
+    snapshot = get_module_snapshot(user)
+    return {module for module in modules if _split(module) in snapshot}
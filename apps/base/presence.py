@@ -0,0 +1,67 @@
+"""
+Registro de presença (usuários online).
+
+Substitui a varredura da tabela de sessões: o login marca o usuário como
+online até o fim da sessão, cada gravação de atividade renova esse prazo e
+o logout remove a marcação. Só o login cria a marcação: a atividade anotada
+antes de um logout (em outro processo, ou num flush já em andamento) apenas
+renova linhas existentes e não traz o usuário de volta. Consultar um usuário é uma busca pela chave
+primária e a lista de online é uma única consulta indexada.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from .models import UserPresence
+
+
+def _expiry(when=None):
+    return (when or timezone.now()) + timedelta(seconds=settings.SESSION_COOKIE_AGE)
+
+
+def mark_online(user_id, when=None):
+    """Marca o usuário como online (login), criando a linha se necessário."""
+    # Um único INSERT ... ON CONFLICT: sem a leitura prévia do `update_or_create`,
+    # que no SQLite falha com "database is locked" em logins simultâneos.
+    UserPresence.objects.bulk_create(
+        [UserPresence(user_id=user_id, expires_at=_expiry(when))],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['expires_at'],
+    )
+
+
+def renew_many(last_seen):
+    """
+    Renova a presença de vários usuários de uma vez (`{user_id: horário}`),
+    em um único UPDATE. Usuários sem marcação (deslogados) são ignorados.
+    """
+    if not last_seen:
+        return 0
+    return UserPresence.objects.filter(user_id__in=last_seen).update(expires_at=Case(
+        *(When(user_id=user_id, then=Value(_expiry(when))) for user_id, when in last_seen.items()),
+        output_field=DateTimeField(),
+    ))
+
+
+def mark_offline(user_id):
+    UserPresence.objects.filter(user_id=user_id).delete()
+
+
+def is_online(user_id):
+    return UserPresence.objects.filter(user_id=user_id, expires_at__gt=timezone.now()).exists()
+
+
+def online_user_ids(request=None):
+    """
+    Conjunto com os ids de todos os usuários online.
+    Com `request`, o resultado é memorizado durante a requisição.
+    """
+    if request is not None and hasattr(request, '_online_user_ids'):
+        return request._online_user_ids
+    ids = frozenset(UserPresence.objects.filter(expires_at__gt=timezone.now()).values_list('user_id', flat=True))
+    if request is not None:
+        request._online_user_ids = ids
+    return ids
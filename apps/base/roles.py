@@ -0,0 +1,119 @@
+"""
+Resolução de papéis (grupos e nível hierárquico) dos usuários.
+
+O papel de cada usuário é calculado uma única vez e memorizado na própria
+instância, que vive durante a requisição. Quando os grupos já vieram por
+`prefetch_related('groups')` nenhuma consulta é feita; para listas sem
+prefetch, `resolve_roles` carrega os grupos de todos os usuários em uma
+única consulta.
+"""
+from collections import namedtuple
+
+from django.db.models import Case, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+# Níveis mais baixos representam maior poder.
+GROUP_LEVELS = {
+    'Administrador': 1,
+    'Coordenador': 2,
+    'Gerente': 3,
+    'Usuário': 4,
+}
+SUPERUSER_LEVEL = 1
+NO_GROUP_LEVEL = 5
+NO_GROUP_NAME = 'Sem Grupo'
+MANAGERIAL_GROUPS = frozenset({'Administrador', 'Coordenador', 'Gerente'})
+
+Role = namedtuple('Role', ['groups', 'level', 'group_name'])
+
+
+def _build_role(is_superuser, groups):
+    """`groups` é uma sequência de (id, nome) de grupos."""
+    groups = sorted(groups)
+    names = frozenset(name for _, name in groups)
+    level = min((GROUP_LEVELS.get(name, NO_GROUP_LEVEL) for name in names), default=NO_GROUP_LEVEL)
+    if is_superuser:
+        level = SUPERUSER_LEVEL
+    return Role(names, level, groups[0][1] if groups else NO_GROUP_NAME)
+
+
+def get_role(user):
+    """Retorna o `Role` do usuário, consultando o banco no máximo uma vez por instância."""
+    role = getattr(user, '_role', None)
+    if role is not None:
+        return role
+    if not user.is_authenticated:
+        return Role(frozenset(), NO_GROUP_LEVEL, NO_GROUP_NAME)
+    prefetched = getattr(user, '_prefetched_objects_cache', {}).get('groups')
+    if prefetched is not None:
+        groups = [(group.pk, group.name) for group in prefetched]
+    else:
+        groups = user.groups.values_list('id', 'name')
+    role = _build_role(user.is_superuser, groups)
+    user._role = role
+    return role
+
+
+def resolve_roles(users):
+    """
+    Resolve o papel de vários usuários com uma única consulta.
+    Aceita um queryset ou uma lista; retorna a lista de usuários.
+    """
+    from .models import CustomUser
+
+    users = list(users)
+    pending = {
+        user.pk: user for user in users
+        if getattr(user, '_role', None) is None
+        and 'groups' not in getattr(user, '_prefetched_objects_cache', {})
+    }
+    if pending:
+        groups = {user_id: [] for user_id in pending}
+        memberships = CustomUser.groups.through.objects.filter(
+            customuser_id__in=pending,
+        ).values_list('customuser_id', 'group_id', 'group__name')
+        for user_id, group_id, name in memberships:
+            groups[user_id].append((group_id, name))
+        for user_id, user in pending.items():
+            user._role = _build_role(user.is_superuser, groups[user_id])
+    for user in users:
+        get_role(user)
+    return users
+
+
+def annotate_roles(queryset):
+    """
+    Anota `group_level` e `group_name` em um queryset de usuários, calculados
+    no próprio banco (para filtrar e ordenar sem carregar os grupos).
+    """
+    from .models import CustomUser
+
+    memberships = CustomUser.groups.through.objects.filter(customuser_id=OuterRef('pk'))
+    level = Case(
+        *(When(group__name=name, then=Value(group_level)) for name, group_level in GROUP_LEVELS.items()),
+        default=Value(NO_GROUP_LEVEL),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(
+        group_level=Case(
+            When(is_superuser=True, then=Value(SUPERUSER_LEVEL)),
+            default=Coalesce(
+                Subquery(memberships.annotate(level=level).order_by('level').values('level')[:1]),
+                Value(NO_GROUP_LEVEL),
+            ),
+            output_field=IntegerField(),
+        ),
+        group_name=Coalesce(
+            Subquery(memberships.order_by('group_id').values('group__name')[:1]),
+            Value(NO_GROUP_NAME),
+        ),
+    )
+
+
+def has_group(user, group_name):
+    return group_name in get_role(user).groups
+
+
+def is_managerial(user):
+    """Administradores, coordenadores e gerentes."""
+    return bool(get_role(user).groups & MANAGERIAL_GROUPS)
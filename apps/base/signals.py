@@ -0,0 +1,44 @@
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import permissions
+from .activity import tracker
+from .models import Application, CustomUser, Module
+from .presence import mark_offline, mark_online
+
+
+@receiver(user_logged_in)
+def user_logged_in_presence(sender, request, user, **kwargs):
+    mark_online(user.pk)
+
+
+@receiver(user_logged_out)
+def user_logged_out_presence(sender, request, user, **kwargs):
+    if user is not None:
+        tracker.forget(user.pk)
+        mark_offline(user.pk)
+
+
+@receiver(m2m_changed, sender=CustomUser.modules.through)
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def user_access_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalida o snapshot de permissões ao alterar módulos ou grupos de usuários."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        permissions.invalidate_user(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            permissions.invalidate_user(user_id)
+    else:
+        # `clear()` a partir do módulo/grupo: não sabemos quais usuários foram afetados.
+        permissions.invalidate_all()
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def modules_changed(sender, **kwargs):
+    permissions.invalidate_all()
@@ -2,7 +2,7 @@ from django import template
 from django.utils import timezone
 from django.utils.timesince import timesince
 from apps.base.utils import user_can_manage_other, get_user_group_level
-from django.contrib.sessions.models import Session
+from apps.base import permissions, presence, roles
 
 register = template.Library()
 
@@ -20,7 +20,7 @@ def has_group(user, group_name):
     Verifica se um usuário pertence a um grupo específico.
     Uso: {% if request.user|has_group:"Gerente" %}
     """
-    return user.groups.filter(name=group_name).exists()
+    return roles.has_group(user, group_name)
 
 @register.filter(name='is_manageable_by')
 def is_manageable_by(target_user, requesting_user):
@@ -36,7 +36,24 @@ def get_group(user):
     Retorna o nome do primeiro grupo do usuário.
     Uso: {% get_group user %}
     """
-    return user.groups.first().name if user.groups.exists() else 'Sem Grupo'
+    return getattr(user, 'group_name', None) or roles.get_role(user).group_name
+
+@register.filter(name='can_access')
+def can_access(user, module):
+    """
+    Verifica se o usuário pode acessar o módulo "app_namespace:view_name".
+    Uso: {% if user|can_access:"phoenix:home" %}
+    """
+    app_namespace, _, view_name = module.partition(':')
+    return permissions.can_access(user, app_namespace, view_name)
+
+@register.simple_tag
+def accessible_modules(user, *modules):
+    """
+    Retorna, de uma vez, o conjunto dos módulos que o usuário pode acessar.
+    Uso: {% accessible_modules user "phoenix:home" "nexus:nexus" as allowed_modules %}
+    """
+    return permissions.accessible_modules(user, modules)
 
 @register.filter(name='last_activity')
 def last_activity(last_activity_datetime):
@@ -66,17 +83,20 @@ def last_activity(last_activity_datetime):
 
 @register.filter(name='is_online')
 def is_online(user):
-    id = user.id
-    active_sessions = Session.objects.filter(expire_date__gte=timezone.now())
-    user_ids = set()
+    """
+    Verifica se o usuário está online (uma consulta pela chave primária).
+    Em laços, prefira {% online_user_ids as online_ids %} e `u.id in online_ids`.
+    Uso: {% if user|is_online %}
+    """
+    return presence.is_online(user.id)
 
-    for session in active_sessions:
-        session_data = session.get_decoded()
-        user_id = session_data.get('_auth_user_id')
-        if user_id:
-            user_ids.add(int(user_id))
-    
-    return True if id in user_ids else False
+@register.simple_tag(takes_context=True)
+def online_user_ids(context):
+    """
+    Retorna o conjunto de ids dos usuários online (uma consulta por requisição).
+    Uso: {% online_user_ids as online_ids %}
+    """
+    return presence.online_user_ids(context.get('request'))
 
 @register.inclusion_tag('base/breadcrumbs.html', takes_context=True)
 def create_breadcrumbs(context):
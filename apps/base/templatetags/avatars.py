@@ -0,0 +1,50 @@
+from django import template
+from django.utils.html import format_html
+
+from apps.base import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar(user, size=42, css_class='rounded-circle', alt=None):
+    """
+    Foto de perfil em `size` pixels, com a miniatura WebP (e JPEG de
+    reserva) mais próxima e a versão 2x para telas de alta densidade.
+    Sem miniaturas, usa a foto original.
+    Uso: {% avatar u 42 "rounded-circle me-3" %}
+    """
+    alt = alt or f"Foto de {user.username}"
+    size = int(size)
+    one_x = thumbnails.variant(user, size)
+    if one_x is None:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy" style="object-fit: cover;">',
+            thumbnails.avatar_url(user, size), alt, css_class, size, size,
+        )
+
+    two_x = thumbnails.variant(user, size * 2) or one_x
+    digest = user.avatar_hash
+
+    def srcset(image_format):
+        urls = f"{thumbnails.thumbnail_url(digest, one_x, image_format)} 1x"
+        if two_x != one_x:
+            urls += f", {thumbnails.thumbnail_url(digest, two_x, image_format)} 2x"
+        return urls
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        srcset('webp'), thumbnails.thumbnail_url(digest, one_x, 'jpeg'), srcset('jpeg'),
+        alt, css_class, size, size,
+    )
+
+
+@register.simple_tag
+def avatar_url(user, size=42):
+    """
+    Apenas a URL da miniatura JPEG adequada a `size` pixels.
+    Uso: <img src="{% avatar_url user 64 %}">
+    """
+    return thumbnails.avatar_url(user, int(size))
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import path, resolve
+from django.utils import timezone
+
+from .activity import ActivityTracker
+from .instrumentation import QueryBudgetExceeded, offenders, query_budget, view_name
+from .models import CustomUser, UserPresence
+from .presence import is_online
+
+
+def user_names(request):
+    # Uma consulta por usuário: o N+1 que a instrumentação deve apontar.
+    names = [CustomUser.objects.get(pk=pk).username for pk in CustomUser.objects.values_list('pk', flat=True)]
+    return HttpResponse(', '.join(names))
+
+
+@query_budget(5)
+def user_names_with_budget(request):
+    return user_names(request)
+
+
+def user_count(request):
+    return HttpResponse(str(CustomUser.objects.count()))
+
+
+urlpatterns = [
+    path('nomes/', user_names, name='user_names'),
+    path('nomes-com-orcamento/', user_names_with_budget, name='user_names_with_budget'),
+    path('total/', user_count),
+]
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    QUERY_INSTRUMENTATION={'STRICT': True, 'DEFAULT_BUDGET': 50, 'N_PLUS_ONE_THRESHOLD': 10},
+)
+class QueryInstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        CustomUser.objects.bulk_create([CustomUser(username=f'usuario{index}') for index in range(12)])
+
+    def setUp(self):
+        offenders.clear()
+
+    def test_repeated_query_is_reported_as_n_plus_one(self):
+        response = self.client.get('/nomes/')
+
+        self.assertEqual(response.status_code, 200)
+        entry, = offenders.recent()
+        self.assertEqual(entry['view'], 'user_names')
+        self.assertEqual(entry['problems'], ['n+1'])
+        shape, count = entry['repeated'][0]
+        self.assertEqual(count, 12)
+        self.assertIn('"base_customuser"."id" = ?', shape)
+
+    def test_budget_exceeded_fails_in_strict_mode(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'user_names_with_budget executou 13 consultas (orçamento 5)'):
+            self.client.get('/nomes-com-orcamento/')
+
+        entry, = offenders.recent()
+        self.assertEqual(entry['problems'], ['orcamento', 'n+1'])
+
+    def test_request_within_budget_is_not_reported(self):
+        response = self.client.get('/total/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(offenders.recent(), [])
+
+    def test_unnamed_route_is_identified_by_view_path(self):
+        request = RequestFactory().get('/total/')
+        request.resolver_match = resolve('/total/')
+
+        self.assertEqual(view_name(request), f'{__name__}.user_count')
+
+
+class PresenceTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('presenca', password='senha')
+        # Outro processo, com atividade do usuário ainda não gravada.
+        self.other_process = ActivityTracker(resolution=0, flush_interval=3600, max_buffer=100)
+
+    def test_activity_flushed_after_logout_keeps_user_offline(self):
+        self.client.force_login(self.user)
+        self.assertTrue(is_online(self.user.pk))
+        self.other_process.record(self.user.pk)
+
+        self.client.logout()
+        self.other_process.flush()
+
+        self.assertFalse(is_online(self.user.pk))
+
+    def test_activity_renews_presence_of_logged_in_user(self):
+        self.client.force_login(self.user)
+        later = timezone.now() + timedelta(minutes=10)
+        self.other_process.record(self.user.pk, when=later)
+
+        self.other_process.flush()
+
+        presence = UserPresence.objects.get(user=self.user)
+        self.assertGreater(presence.expires_at, later)
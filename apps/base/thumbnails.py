@@ -0,0 +1,146 @@
+"""
+Miniaturas das fotos de perfil.
+
+Cada foto enviada é recortada ao centro em quadrados de `SIZES` pixels e
+gravada em WebP e JPEG. O nome dos arquivos é o hash do conteúdo da foto
+original (`<hash>_<tamanho>.<formato>`, em `DIRECTORY`): o mesmo arquivo
+nunca muda de conteúdo, então pode ser servido com cache longo
+(`Cache-Control: immutable`), e fotos iguais (como a foto padrão) têm um
+único conjunto de miniaturas. O hash fica em `CustomUser.avatar_hash`, o
+que permite ao template escolher a variante sem acessar o disco.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SIZES': (42, 96, 256),
+    'FORMATS': ('webp', 'jpeg'),
+    'DIRECTORY': 'profile_pics/thumbs',
+    'QUALITY': {'webp': 80, 'jpeg': 82},
+}
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+HASH_LENGTH = 16
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'AVATAR_THUMBNAILS', {})}
+
+
+def content_hash(field_file):
+    """Hash (sha256 truncado) do conteúdo do arquivo da foto."""
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def thumbnail_name(digest, size, image_format, options=None):
+    options = options or get_options()
+    return f"{options['DIRECTORY']}/{digest}_{size}.{EXTENSIONS[image_format]}"
+
+
+def thumbnail_url(digest, size, image_format):
+    return default_storage.url(thumbnail_name(digest, size, image_format))
+
+
+def _square(image, size):
+    return ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+
+
+def _encode(image, image_format, quality):
+    buffer = BytesIO()
+    if image_format == 'jpeg':
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=quality, method=6)
+    return buffer.getvalue()
+
+
+def _open(field_file):
+    field_file.open('rb')
+    try:
+        image = Image.open(field_file)
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            return background
+        return image.convert('RGB')
+    finally:
+        field_file.seek(0)
+
+
+def generate(field_file, force=False):
+    """
+    Gera as miniaturas da foto que ainda não existem (todas, com `force`).
+    Retorna o hash do conteúdo, usado nos nomes dos arquivos.
+    """
+    options = get_options()
+    digest = content_hash(field_file)
+    missing = [
+        (size, image_format)
+        for size in options['SIZES'] for image_format in options['FORMATS']
+        if force or not default_storage.exists(thumbnail_name(digest, size, image_format, options))
+    ]
+    if not missing:
+        return digest
+
+    image = _open(field_file)
+    # Reduz uma vez ao maior tamanho pedido; os menores partem dessa cópia.
+    largest = _square(image, max(size for size, _ in missing))
+    for size, image_format in missing:
+        name = thumbnail_name(digest, size, image_format, options)
+        if force and default_storage.exists(name):
+            default_storage.delete(name)
+        resized = largest if size == largest.width else _square(largest, size)
+        default_storage.save(name, ContentFile(_encode(resized, image_format, options['QUALITY'][image_format])))
+    return digest
+
+
+def update_user(user, force=False):
+    """Gera as miniaturas da foto do usuário e grava o hash em `avatar_hash`."""
+    if not user.profile_picture:
+        digest = ''
+    else:
+        try:
+            digest = generate(user.profile_picture, force=force)
+        except (OSError, ValueError):
+            logger.exception("Não foi possível gerar as miniaturas da foto de %s.", user.username)
+            digest = ''
+    if digest != user.avatar_hash:
+        user.avatar_hash = digest
+        user._meta.model._default_manager.filter(pk=user.pk).update(avatar_hash=digest)
+    return digest
+
+
+def variant(user, size):
+    """
+    Menor miniatura com pelo menos `size` pixels, ou None quando o usuário
+    ainda não tem miniaturas (ou o tamanho é maior que todas).
+    """
+    digest = getattr(user, 'avatar_hash', '')
+    if not digest:
+        return None
+    return next((available for available in sorted(get_options()['SIZES']) if available >= size), None)
+
+
+def avatar_url(user, size, image_format='jpeg'):
+    """URL da miniatura adequada a `size` pixels, ou da foto original quando não há miniatura."""
+    available = variant(user, size)
+    if available is not None:
+        return thumbnail_url(user.avatar_hash, available, image_format)
+    return user.profile_picture.url if user.profile_picture else None
@@ -17,6 +17,9 @@ from .views import (
     user_password_change_view,
     UserDeleteView,
     set_user_theme,
+    user_directory_view,
+    query_offenders_view,
+    metrics_view,
 )
 
 app_name = 'base'
@@ -40,9 +43,15 @@ urlpatterns = [
     path('management/users/access/<int:pk>/', manage_user_access_view, name='manage_user_access'),
     path('management/users/password-change/<int:pk>/', user_password_change_view, name='admin_password_change'),
     path('management/users/delete/<int:pk>/', UserDeleteView.as_view(), name='user_delete'),
+
+    # Diagnóstico (Administradores)
+    path('management/queries/', query_offenders_view, name='query_offenders'),
+    path('management/metrics/', metrics_view, name='metrics'),
     
     # Perfil e Listas Públicas
     # path('<str:username>', user_profile, name='user_profile'),
+    path('users/<int:pk>/', UserProfileView.as_view(), name='user_profile'),
+    path('users/directory/', user_directory_view, name='user_directory'),
     path('profile/edit/', self_profile_update_view, name='self_profile_update'),
     path('profile/change-password/', self_password_update_view, name='password_change'),
     
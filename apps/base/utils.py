@@ -1,22 +1,14 @@
-from django.contrib.auth.models import Group
-from django.contrib.sessions.models import Session
-from django.utils import timezone
-from .models import CustomUser
+from .roles import get_role
 
 def get_user_group_level(user):
     """
     Retorna o nível hierárquico de um usuário.
     Níveis mais baixos representam maior poder.
     """
-    if user.is_superuser or user.groups.filter(name='Administrador').exists():
-        return 1
-    if user.groups.filter(name='Coordenador').exists():
-        return 2
-    if user.groups.filter(name='Gerente').exists():
-        return 3
-    if user.groups.filter(name='Usuário').exists():
-        return 4
-    return 5 # Sem grupo
+    level = getattr(user, 'group_level', None)  # anotado por roles.annotate_roles
+    if level is not None:
+        return level
+    return get_role(user).level
 
 def user_can_manage_other(requesting_user, target_user):
     """
@@ -10,7 +10,8 @@ from django.urls import reverse_lazy, reverse
 from django.contrib.auth import login, logout, get_user_model, update_session_auth_hash, authenticate
 from django.contrib.auth.models import Group
 from .models import Application
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 import json
@@ -22,6 +23,10 @@ from .forms import (
     AdminPasswordChangeForm
 )
 from .utils import user_can_manage_other
+from .roles import GROUP_LEVELS, get_role, is_managerial
+from .instrumentation import offenders
+from . import metrics
+from .directory import UserDirectory, serialize as serialize_directory_row
 from .decorators import secure_module_access
 
 CustomUser = get_user_model()
@@ -39,12 +44,14 @@ def login_view(request):
             request_ip = x_forwarded_for.split(',')[0] if x_forwarded_for else request.META.get('REMOTE_ADDR')
 
             if user.allowed_ip_address != request_ip:
+                metrics.logins.inc(result='ip_negado')
                 return JsonResponse(
                     {"message": "Acesso negado. Endereço de IP não autorizado."}, 
                     status=403
                 )
         
         login(request, user)
+        metrics.logins.inc(result='sucesso')
         next_url = request.POST.get('next') or reverse('base:home')
         
         return JsonResponse({
@@ -53,6 +60,7 @@ def login_view(request):
         }, status=200)
 
     else:
+        metrics.logins.inc(result='falha')
         return JsonResponse(
             {"message": "Acesso negado. Usuário ou senha incorreto."}, 
             status=401
@@ -67,15 +75,49 @@ def logout_view(request):
         }, status=200)
 
 
-def home(request):
-    users = CustomUser.objects.filter(is_active=True).prefetch_related('groups')
-    applications = Application.objects.all() 
-    context = {
-        
+def _directory_filters(params):
+    """Filtros do diretório de usuários a partir da query string."""
+    online = params.get('online')
+    return {
+        'search': params.get('q', '').strip() or None,
+        'group': params.get('group') or None,
+        'online': {'1': True, '0': False}.get(online),
     }
+
+def home(request):
+    context = {}
+    if request.user.is_authenticated:
+        directory = UserDirectory(request.user)
+        page = directory.page(cursor=None, active_only=True)
+        context['users'] = page.rows
+        context['users_next_cursor'] = page.next_cursor
+        context['users_total'] = CustomUser.objects.filter(is_active=True).count()
     
     return render(request, "base/home.html", context)
 
+@login_required
+def user_directory_view(request):
+    """
+    Versão JSON do diretório de usuários, paginada por cursor.
+    Parâmetros: q, group, online (1/0), cursor, limit.
+    """
+    directory = UserDirectory(request.user)
+    try:
+        page = directory.page(
+            cursor=request.GET.get('cursor'),
+            limit=request.GET.get('limit'),
+            active_only=True,
+            **_directory_filters(request.GET),
+        )
+    except ValueError:
+        return JsonResponse({'message': 'Cursor inválido.'}, status=400)
+
+    return JsonResponse({
+        'results': [serialize_directory_row(u) for u in page.rows],
+        'next_cursor': page.next_cursor,
+        'has_more': page.has_more,
+    })
+
 def settings(request):
     context = {}
     return render(request, 'base/settings.html', context)
@@ -105,7 +147,7 @@ def self_password_update_view(request):
 # --- Mixins de Permissão Hierárquica ---
 class ManagerialRoleRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
     def test_func(self):
-        return self.request.user.groups.filter(name__in=['Administrador', 'Coordenador', 'Gerente']).exists()
+        return is_managerial(self.request.user)
 
     def handle_no_permission(self):
         messages.error(self.request, "Você não tem permissão para acessar esta página.")
@@ -115,18 +157,26 @@ class ManagerialRoleRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
 
 class UserManagementView(ManagerialRoleRequiredMixin, ListView):
     model = CustomUser
-    template_name = 'user_management.html'
+    template_name = 'settings/user_management.html'
     context_object_name = 'users'
 
     def get_queryset(self):
-        # user = self.request.user
-        # if user.groups.filter(name='Administrador').exists():
-        return CustomUser.objects.all().prefetch_related('groups')
-        # if user.groups.filter(name='Coordenador').exists():
-        #     return CustomUser.objects.filter(groups__name__in=['Coordenador', 'Gerente', 'Usuário']).distinct().prefetch_related('groups')
-        # if user.groups.filter(name='Gerente').exists():
-        #     return CustomUser.objects.filter(groups__name__in=['Gerente', 'Usuário']).distinct().prefetch_related('groups')
-        # return CustomUser.objects.none()
+        # Página do diretório: grupo, nível, status online e permissão de
+        # gerenciamento já vêm anotados em uma única consulta.
+        self.filters = _directory_filters(self.request.GET)
+        directory = UserDirectory(self.request.user)
+        try:
+            self.page = directory.page(cursor=self.request.GET.get('cursor'), **self.filters)
+        except ValueError:
+            self.page = directory.page(**self.filters)
+        return self.page.rows
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.page.next_cursor
+        context['filters'] = self.filters
+        context['groups'] = Group.objects.order_by('name').values_list('name', flat=True)
+        return context
 
 class UserCreateView(ManagerialRoleRequiredMixin, CreateView):
     model = CustomUser
@@ -193,12 +243,12 @@ class UserListView(LoginRequiredMixin, ListView):
 
 class UserProfileView(LoginRequiredMixin, DetailView):
     model = CustomUser
-    template_name = 'user_profile.html'
+    template_name = 'settings/user_profile.html'
     context_object_name = 'profile_user'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        profile_user = self.get_object()
+        profile_user = self.object
         all_applications = Application.objects.prefetch_related('modules').order_by('name')
         user_module_ids = set(profile_user.modules.values_list('id', flat=True))
 
@@ -274,4 +324,48 @@ def set_user_theme(request):
         else:
             return JsonResponse({'status': 'error', 'message': 'Tema inválido.'}, status=400)
     except (json.JSONDecodeError, AttributeError):
-        return JsonResponse({'status': 'error', 'message': 'Requisição inválida.'}, status=400)
\ No newline at end of file
+        return JsonResponse({'status': 'error', 'message': 'Requisição inválida.'}, status=400)
+
+
+def _is_administrator(user):
+    return get_role(user).level <= GROUP_LEVELS['Administrador']
+
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def query_offenders_view(request):
+    """
+    Requisições recentes que estouraram o orçamento de consultas, repetiram
+    consultas (N+1) ou tiveram instruções lentas. Somente administradores.
+    POST limpa a lista. Com `?format=json`, responde em JSON.
+    """
+    if not _is_administrator(request.user):
+        messages.error(request, "Você não tem permissão para acessar esta página.")
+        return redirect('base:home')
+
+    if request.method == 'POST':
+        offenders.clear()
+        messages.success(request, "Lista de consultas limpa.")
+        return redirect('base:query_offenders')
+
+    entries = offenders.recent()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'results': entries})
+    return render(request, 'settings/query_offenders.html', {'entries': entries})
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """
+    Métricas no formato de texto do Prometheus. Acesso para administradores
+    logados ou, para o coletor, com `Authorization: Bearer <METRICS['TOKEN']>`.
+    """
+    token = metrics.get_options()['TOKEN']
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    by_token = bool(token) and constant_time_compare(authorization, f'Bearer {token}')
+    if not by_token and not _is_administrator(request.user):
+        return HttpResponse('Acesso negado.\n', status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(
+        metrics.exposition(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
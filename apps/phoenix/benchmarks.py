@@ -0,0 +1,208 @@
+"""
+Benchmarks das pesquisas da Phoenix.
+
+Cada caso sorteia entradas reais da `sicadfull` (números de boletim e de
+procedimento, termos de relatos, nomes de envolvidos, municípios) com uma
+semente fixa e mede o caminho completo usado pela view: montagem do
+queryset, contagem aproximada e primeira página projetada. As agregações
+medem `rollups.count` tanto numa agregação pronta quanto no GROUP BY direto
+na `sicadfull`. O resultado é um dicionário serializável em JSON, com os
+tempos (ms) e a quantidade de consultas por execução, para comparar entre
+commits (`compare`).
+"""
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from apps.base.instrumentation import capture
+
+from . import rollups
+from .lookup import lookup
+from .models import Sicadfull
+from .results import RESULT_PROFILES, paginate, search_queryset
+from .text import tokenize
+
+Case = namedtuple('Case', ['name', 'description', 'inputs', 'run'])
+
+
+def _sample(queryset, field, count, rng):
+    """Até `count` valores não vazios de `field`, de registros sorteados pela chave primária."""
+    bounds = list(queryset.order_by('pk').values_list('pk', flat=True)[:1]) + \
+        list(queryset.order_by('-pk').values_list('pk', flat=True)[:1])
+    if not bounds:
+        return []
+    low, high = bounds[0], bounds[-1]
+    values = []
+    for _ in range(count * 3):
+        value = queryset.filter(pk__gte=rng.randint(low, high), **{f'{field}__isnull': False}) \
+            .order_by('pk').values_list(field, flat=True).first()
+        if value:
+            values.append(value)
+        if len(values) >= count:
+            break
+    return values
+
+
+def _page(tipo, data):
+    page, count = paginate(search_queryset(tipo, data), profile=RESULT_PROFILES[tipo])
+    return len(page.rows)
+
+
+def _terms(relatos, rng):
+    terms = []
+    for relato in relatos:
+        words = [word for word in tokenize(relato) if len(word) > 4]
+        if words:
+            terms.append(' '.join(rng.sample(words, min(2, len(words)))))
+    return terms
+
+
+def _names(nomes, rng):
+    # Metade pelo nome completo, metade por prenome + último sobrenome.
+    result = []
+    for nome in nomes:
+        parts = nome.split()
+        result.append(nome if rng.random() < 0.5 or len(parts) < 2 else f"{parts[0]} {parts[-1]}")
+    return result
+
+
+def build_cases(samples=20, seed=0):
+    rng = random.Random(seed)
+    queryset = Sicadfull.objects.filter(exclusao=False)
+    municipios = [
+        row['municipios'] for row in rollups.count(['municipios'])[:10] if row['municipios']
+    ]
+    anos = sorted({row['ano_fato'] for row in rollups.count(['ano_fato']) if row['ano_fato']})
+
+    return [
+        Case(
+            'bop', "Pesquisa por número de boletim",
+            [{'nro_bop': value} for value in _sample(queryset, 'nro_bop', samples, rng)],
+            lambda data: _page('bop', data),
+        ),
+        Case(
+            'procedimento', "Pesquisa por número de procedimento",
+            [{'nro_tombo': value} for value in _sample(queryset, 'nro_tombo', samples, rng)],
+            lambda data: _page('procedimento', data),
+        ),
+        Case(
+            'relato', "Pesquisa textual no relato",
+            [{'relato': terms} for terms in _terms(_sample(queryset, 'relato', samples, rng), rng)],
+            lambda data: _page('relato', data),
+        ),
+        Case(
+            'relato_filtrado', "Pesquisa textual no relato com município",
+            [
+                {'relato': terms, 'municipio': rng.choice(municipios)}
+                for terms in _terms(_sample(queryset, 'relato', samples, rng), rng)
+            ] if municipios else [],
+            lambda data: _page('relato', data),
+        ),
+        Case(
+            'pessoa', "Pesquisa por nome de envolvido",
+            [{'nome': nome} for nome in _names(_sample(queryset, 'vit_nome', samples, rng), rng)],
+            lambda data: _page('pessoa', data),
+        ),
+        Case(
+            'agregacao_municipio', "Total por município no ano (agregação pronta)",
+            [{'ano_fato': ano} for ano in anos],
+            lambda filters: len(rollups.count(['municipios', 'consolidado'], **filters)),
+        ),
+        Case(
+            'agregacao_sicadfull', "Total por RISP e dia da semana (GROUP BY na sicadfull)",
+            [{'municipios': municipio} for municipio in municipios[:5]],
+            lambda filters: len(rollups.count(['risp', 'dia_semana'], **filters)),
+        ),
+    ]
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(case, iterations=1, warmup=1):
+    """Executa o caso sobre todas as entradas `iterations` vezes e resume os tempos."""
+    if not case.inputs:
+        return {'description': case.description, 'skipped': "sem dados de entrada"}
+    for data in case.inputs[:warmup]:
+        case.run(data)
+
+    timings, queries, rows = [], [], []
+    for _ in range(iterations):
+        for data in case.inputs:
+            # Sem o LRU dos números: cada execução mede a consulta ao índice.
+            lookup.cache.clear()
+            with capture() as profile:
+                start = time.perf_counter()
+                rows.append(case.run(data))
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(profile.count)
+    return {
+        'description': case.description,
+        'runs': len(timings),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(_percentile(timings, 0.50), 3),
+        'p95_ms': round(_percentile(timings, 0.95), 3),
+        'p99_ms': round(_percentile(timings, 0.99), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'rows_mean': round(statistics.fmean(rows), 2),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(names=None, samples=20, iterations=3, warmup=2, seed=0):
+    """Executa os casos (todos, por padrão) e retorna o relatório."""
+    cases = [case for case in build_cases(samples, seed) if not names or case.name in names]
+    connection = connections[Sicadfull.objects.db]
+    return {
+        'meta': {
+            'commit': _commit(),
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'rows': Sicadfull.objects.count(),
+            'samples': samples,
+            'iterations': iterations,
+            'seed': seed,
+        },
+        'results': {case.name: run_case(case, iterations, warmup) for case in cases},
+    }
+
+
+def compare(baseline, current, metric='p50_ms'):
+    """
+    Lista `(caso, antes, depois, variação)` dos casos presentes nos dois
+    relatórios; a variação é relativa (0.1 = 10% mais lento).
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name, {}).get(metric)
+        after = result.get(metric)
+        if before is None or after is None:
+            continue
+        rows.append((name, before, after, (after - before) / before if before else 0.0))
+    return rows
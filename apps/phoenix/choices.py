@@ -0,0 +1,101 @@
+"""
+Catálogo das listas de opções (municípios e tipos de crime) usadas pelos
+formulários de pesquisa.
+
+As listas ficam na memória do processo e são recarregadas quando o TTL
+expira ou quando o carimbo de versão compartilhado muda, o que permite
+invalidar todos os workers de uma vez com
+`python manage.py refresh_phoenix_choices`. O carimbo fica no banco (uma
+linha de `IndexState`, como as versões dos índices auxiliares), e não no
+cache do Django, que é local a cada processo quando `CACHES` usa o
+LocMemCache.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from apps.base.metrics import cache_requests
+
+from .indexing import get_version
+from .models import Consolidados, IndexState, Localidades
+
+# Nome da linha de `IndexState` que guarda o carimbo de versão.
+VERSION_NAME = 'opcoes'
+# Intervalo (segundos) entre verificações do carimbo de versão.
+VERSION_CHECK_INTERVAL = 5
+
+
+class ChoiceCatalog:
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'PHOENIX_CHOICES_TTL', 3600)
+        self._data = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        municipios = (
+            Localidades.objects.exclude(municipios__isnull=True).exclude(municipios='')
+            .order_by('municipios').values_list('municipios', flat=True).distinct()
+        )
+        consolidados = (
+            Consolidados.objects.exclude(consolidado__isnull=True).exclude(consolidado='')
+            .order_by('consolidado').values_list('consolidado', flat=True).distinct()
+        )
+        return {
+            'municipios': tuple(municipios),
+            'consolidados': tuple(consolidados),
+        }
+
+    def _current(self):
+        now = time.monotonic()
+        if self._data is not None and now - self._loaded_at < self.ttl and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            cache_requests.inc(cache='phoenix.choices', result='hit')
+            return self._data
+        with self._lock:
+            version = get_version(VERSION_NAME)
+            if self._data is None or version != self._version or now - self._loaded_at >= self.ttl:
+                cache_requests.inc(cache='phoenix.choices', result='miss')
+                self._data = self._load()
+                self._version = version
+                self._loaded_at = now
+            else:
+                cache_requests.inc(cache='phoenix.choices', result='hit')
+            self._checked_at = now
+        return self._data
+
+    def municipios(self):
+        return self._current()['municipios']
+
+    def consolidados(self):
+        return self._current()['consolidados']
+
+    def municipio_choices(self):
+        return [('', '---------'), *((value, value) for value in self.municipios())]
+
+    def consolidado_choices(self):
+        return [('', '---------'), *((value, value) for value in self.consolidados())]
+
+    def invalidate(self):
+        """Muda o carimbo de versão, forçando a recarga em todos os processos."""
+        IndexState.objects.get_or_create(name=VERSION_NAME)
+        IndexState.objects.filter(name=VERSION_NAME).update(version=F('version') + 1, updated_at=timezone.now())
+        with self._lock:
+            self._data = None
+
+
+catalog = ChoiceCatalog()
+
+
+# Funções de módulo (e não métodos ligados) para uso como `choices` de
+# formulário: o Django copia os campos com deepcopy a cada instância.
+def municipio_choices():
+    return catalog.municipio_choices()
+
+
+def consolidado_choices():
+    return catalog.consolidado_choices()
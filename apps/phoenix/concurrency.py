@@ -0,0 +1,162 @@
+"""
+Execução das pesquisas da Phoenix com limites de concorrência e de tempo.
+
+As views assíncronas executam a pesquisa (código síncrono do ORM) em um
+executor próprio, separado das threads que atendem as demais requisições.
+Antes disso, `SearchLimiter` reserva uma vaga global e uma vaga do usuário;
+sem vaga, a pesquisa é recusada na hora em vez de entrar em fila. Cada
+pesquisa tem um orçamento de tempo: o banco interrompe a instrução quando o
+prazo acaba (`statement_timeout` no PostgreSQL, progress handler no SQLite)
+e a view responde 503 pedindo que a pesquisa seja refinada.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+
+DEFAULTS = {
+    'GLOBAL': 8,
+    'PER_USER': 2,
+    'TIMEOUT': 10,
+}
+
+# Código SQLSTATE do PostgreSQL para instrução cancelada (statement_timeout).
+QUERY_CANCELED = '57014'
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'PHOENIX_SEARCH_LIMITS', {})}
+
+
+class SearchRejected(Exception):
+    """Não há vaga para a pesquisa (`scope` é 'global' ou 'user')."""
+
+    def __init__(self, scope):
+        super().__init__(scope)
+        self.scope = scope
+
+
+class SearchTimeout(Exception):
+    """A pesquisa excedeu o orçamento de tempo."""
+
+
+class SearchLimiter:
+    """Contadores de pesquisas em andamento, no total e por usuário (por processo)."""
+
+    def __init__(self, global_limit, per_user_limit):
+        self.global_limit = global_limit
+        self.per_user_limit = per_user_limit
+        self._running = 0
+        self._per_user = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id):
+        with self._lock:
+            if self._per_user.get(user_id, 0) >= self.per_user_limit:
+                raise SearchRejected('user')
+            if self._running >= self.global_limit:
+                raise SearchRejected('global')
+            self._running += 1
+            self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+
+    def release(self, user_id):
+        with self._lock:
+            self._running -= 1
+            remaining = self._per_user.get(user_id, 1) - 1
+            if remaining:
+                self._per_user[user_id] = remaining
+            else:
+                self._per_user.pop(user_id, None)
+
+
+@contextmanager
+def statement_deadline(alias, deadline):
+    """
+    Faz o banco `alias` interromper as instruções executadas na thread atual
+    depois de `deadline` (valor de `time.monotonic()`).
+    """
+    connection = connections[alias]
+    connection.ensure_connection()
+    if connection.vendor == 'postgresql':
+        milliseconds = max(1, int((deadline - time.monotonic()) * 1000))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('statement_timeout', %s, false)", [str(milliseconds)])
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET statement_timeout")
+    elif connection.vendor == 'sqlite':
+        raw = connection.connection
+        raw.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+        try:
+            yield
+        finally:
+            raw.set_progress_handler(None, 0)
+    else:
+        yield
+
+
+def _is_timeout(exc):
+    cause = exc.__cause__
+    if getattr(cause, 'pgcode', None) == QUERY_CANCELED or getattr(cause, 'sqlstate', None) == QUERY_CANCELED:
+        return True
+    return 'interrupted' in str(exc)
+
+
+def _run_with_deadline(func, aliases, deadline):
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(statement_deadline(alias, deadline))
+            try:
+                return func()
+            except DatabaseError as exc:
+                if _is_timeout(exc) or time.monotonic() > deadline:
+                    raise SearchTimeout() from exc
+                raise
+    finally:
+        close_old_connections()
+
+
+class SearchRunner:
+    def __init__(self, global_limit, per_user_limit, timeout):
+        self.timeout = timeout
+        self.limiter = SearchLimiter(global_limit, per_user_limit)
+        # Uma thread por vaga global: as pesquisas não disputam as threads das demais views.
+        self.executor = ThreadPoolExecutor(max_workers=global_limit, thread_name_prefix='phoenix-search')
+
+    async def run(self, user_id, func, aliases=('default',), timeout=None):
+        """
+        Executa `func` no executor das pesquisas, com o prazo aplicado às
+        conexões `aliases`. Lança SearchRejected ou SearchTimeout.
+        """
+        timeout = timeout or self.timeout
+        self.limiter.acquire(user_id)
+        deadline = time.monotonic() + timeout
+        try:
+            future = self.executor.submit(_run_with_deadline, func, aliases, deadline)
+        except BaseException:
+            self.limiter.release(user_id)
+            raise
+        # A vaga é liberada quando a thread termina, e não quando a view desiste
+        # de esperar: uma consulta que ainda ocupa o banco continua contando.
+        future.add_done_callback(lambda _: self.limiter.release(user_id))
+        try:
+            # A folga cobre o tempo até o banco perceber o prazo e interromper a instrução.
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout + 1)
+        except asyncio.TimeoutError:
+            raise SearchTimeout() from None
+
+
+def _build_runner():
+    options = get_options()
+    return SearchRunner(options['GLOBAL'], options['PER_USER'], options['TIMEOUT'])
+
+
+runner = _build_runner()
@@ -0,0 +1,203 @@
+"""
+Exportação dos resultados das pesquisas em CSV e XLSX, em fluxo contínuo.
+
+As linhas são lidas com `QuerySet.iterator()` (cursor do lado do servidor
+no PostgreSQL) em blocos de `CHUNK_SIZE` e cada bloco é serializado e
+enviado antes do próximo ser lido, de modo que a memória usada não depende
+do tamanho do resultado. O XLSX é gerado diretamente como um ZIP em modo
+de fluxo, com strings embutidas nas células (sem `sharedStrings.xml`).
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime, time
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.base.utils import get_user_group_level
+
+from .projections import ALL_FIELDS, PROFILES
+
+CHUNK_SIZE = 2000
+
+# Máximo de linhas exportadas por nível hierárquico (ver apps.base.roles).
+# Usuários sem grupo (nível 5) não exportam.
+DEFAULT_ROW_LIMITS = {
+    1: 100000,
+    2: 50000,
+    3: 20000,
+    4: 5000,
+}
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Caracteres iniciais que o Excel e o LibreOffice interpretam como fórmula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+_NUMBER_RE = re.compile(r'[+-]?\d+(?:[.,]\d+)*')
+
+
+def row_limit(user):
+    """Quantidade máxima de linhas que o usuário pode exportar."""
+    limits = getattr(settings, 'PHOENIX_EXPORT_ROW_LIMITS', DEFAULT_ROW_LIMITS)
+    return limits.get(get_user_group_level(user), 0)
+
+
+def clean_columns(columns):
+    """
+    Valida as colunas pedidas, mantendo a ordem e descartando repetições.
+    Sem colunas, usa o perfil de resumo. Lança ValueError se alguma não existir.
+    """
+    if not columns:
+        return list(PROFILES['summary'])
+    unknown = [column for column in columns if column not in ALL_FIELDS]
+    if unknown:
+        raise ValueError(f"Colunas inválidas: {', '.join(unknown)}")
+    return list(dict.fromkeys(columns))
+
+
+def _chunks(queryset, columns):
+    rows = queryset.values_list(*columns).iterator(chunk_size=CHUNK_SIZE)
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        yield chunk
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_text(value):
+    """
+    Texto da célula no CSV. Valores que começam como fórmula (relatos, nomes,
+    endereços digitados) recebem um apóstrofo na frente para não serem
+    executados ao abrir a planilha; números com sinal (coordenadas) não.
+    """
+    text = _text(value)
+    if text.startswith(FORMULA_PREFIXES) and not _NUMBER_RE.fullmatch(text):
+        return "'" + text
+    return text
+
+
+def stream_csv(queryset, columns):
+    """Gera o CSV (UTF-8 com BOM, para abrir corretamente no Excel) em blocos."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(columns)
+    for chunk in _chunks(queryset, columns):
+        writer.writerows([_csv_text(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _Pipe:
+    """Destino não pesquisável para o `ZipFile`: acumula bytes até serem drenados."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Resultados" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    # Remove caracteres de controle, que não são válidos em XML.
+    text = ''.join(char for char in _text(value) if char >= ' ' or char in '\t\n\r')
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def stream_xlsx(queryset, columns):
+    """Gera a planilha XLSX em blocos, sem montá-la em memória."""
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', _ROOT_RELS)
+        workbook.writestr('xl/workbook.xml', _WORKBOOK)
+        workbook.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_SHEET_START + _xlsx_row(columns)).encode())
+            for chunk in _chunks(queryset, columns):
+                sheet.write(''.join(_xlsx_row(row) for row in chunk).encode())
+                yield pipe.drain()
+            sheet.write(_SHEET_END.encode())
+    yield pipe.drain()
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'xlsx': stream_xlsx,
+}
+
+
+def filename(tipo, formato):
+    return f"phoenix_{tipo}_{timezone.localtime():%Y%m%d_%H%M%S}.{formato}"
@@ -0,0 +1,259 @@
+"""
+Pesquisa textual nos campos narrativos da `sicadfull`
+(relato, complemento, identificacao_fato e observacao).
+
+O texto é normalizado (sem acentos, reduzido ao radical) antes de ser
+indexado em uma tabela auxiliar, e as consultas passam pela mesma análise.
+O backend é definido em `settings.PHOENIX_FULLTEXT['BACKEND']`.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .indexing import IndexSync
+from .text import analyze
+
+TEXT_FIELDS = ('relato', 'complemento', 'identificacao_fato', 'observacao')
+FILTER_FIELDS = ('data_fato', 'data_registro', 'municipios', 'consolidado')
+
+SearchHit = namedtuple('SearchHit', ['sicad_id', 'score'])
+
+
+def _document(row):
+    return [' '.join(analyze(row.get(field))) for field in TEXT_FIELDS]
+
+
+class BaseFullTextBackend:
+    """Interface dos backends de pesquisa textual."""
+    table = 'phoenix_relato_fts'
+
+    def __init__(self, options):
+        self.options = options
+        self.using = options.get('DATABASE', 'default')
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def ensure_schema(self):
+        raise NotImplementedError
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def delete(self, ids):
+        if not ids:
+            return
+        placeholders = ', '.join(['%s'] * len(ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE {self.id_column} IN ({placeholders})", list(ids))
+
+    def index_rows(self, rows):
+        """Atualiza o índice com as linhas informadas (remove as excluídas)."""
+        raise NotImplementedError
+
+    def search(self, termos, data_inicio=None, data_fim=None, municipio=None, consolidado=None, limit=100):
+        """Retorna uma lista de `SearchHit` ordenada por relevância."""
+        raise NotImplementedError
+
+    def match_sql(self, termos, data_inicio=None, data_fim=None, municipio=None, consolidado=None):
+        """
+        SQL (e parâmetros) que seleciona as chaves da `sicadfull` que casam com
+        os termos, para uso como subconsulta. Retorna None se não houver termos.
+        """
+        raise NotImplementedError
+
+    def _filters(self, data_inicio, data_fim, municipio, consolidado):
+        clauses, params = [], []
+        if data_inicio:
+            clauses.append("data_fato >= %s")
+            params.append(data_inicio.isoformat())
+        if data_fim:
+            clauses.append("data_fato <= %s")
+            params.append(data_fim.isoformat())
+        if municipio:
+            clauses.append("municipios = %s")
+            params.append(municipio)
+        if consolidado:
+            clauses.append("consolidado = %s")
+            params.append(consolidado)
+        return clauses, params
+
+
+class SQLiteFTS5Backend(BaseFullTextBackend):
+    """
+    Backend local baseado em uma tabela virtual FTS5 (ranking BM25).
+    O `rowid` da tabela virtual é a chave primária da `sicadfull`.
+    """
+    id_column = 'rowid'
+    # Pesos do BM25 por coluna, na ordem de TEXT_FIELDS.
+    weights = (10.0, 2.0, 4.0, 1.0)
+
+    def ensure_schema(self):
+        columns = ', '.join([*TEXT_FIELDS, *(f"{field} UNINDEXED" for field in FILTER_FIELDS)])
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def index_rows(self, rows):
+        self.delete([row['id'] for row in rows])
+        values = [
+            (row['id'], *_document(row), *(_param(row[field]) for field in FILTER_FIELDS))
+            for row in rows if not row['exclusao']
+        ]
+        if not values:
+            return
+        columns = ', '.join(['rowid', *TEXT_FIELDS, *FILTER_FIELDS])
+        placeholders = ', '.join(['%s'] * (1 + len(TEXT_FIELDS) + len(FILTER_FIELDS)))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"INSERT INTO {self.table} ({columns}) VALUES ({placeholders})", values)
+
+    @staticmethod
+    def match_expression(termos):
+        stems = analyze(termos)
+        return ' '.join(f'"{stem}"' for stem in stems)
+
+    def match_sql(self, termos, data_inicio=None, data_fim=None, municipio=None, consolidado=None):
+        match = self.match_expression(termos)
+        if not match:
+            return None
+        clauses, params = self._filters(data_inicio, data_fim, municipio, consolidado)
+        where = ' AND '.join([f"{self.table} MATCH %s", *clauses])
+        return f"SELECT rowid FROM {self.table} WHERE {where}", [match, *params]
+
+    def search(self, termos, data_inicio=None, data_fim=None, municipio=None, consolidado=None, limit=100):
+        match = self.match_expression(termos)
+        if not match:
+            return []
+        clauses, params = self._filters(data_inicio, data_fim, municipio, consolidado)
+        where = ' AND '.join([f"{self.table} MATCH %s", *clauses])
+        weights = ', '.join(str(weight) for weight in self.weights)
+        sql = (
+            f"SELECT rowid, bm25({self.table}, {weights}) AS score FROM {self.table} "
+            f"WHERE {where} ORDER BY score LIMIT %s"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [match, *params, limit])
+            # O BM25 do FTS5 é negativo (menor = mais relevante).
+            return [SearchHit(sicad_id, -score) for sicad_id, score in cursor.fetchall()]
+
+
+class PostgresFullTextBackend(BaseFullTextBackend):
+    """
+    Backend para PostgreSQL: tabela auxiliar com coluna `tsvector` indexada
+    por GIN e ranking por `ts_rank_cd`. O texto já chega sem acentos e
+    reduzido ao radical, por isso a configuração `simple` é suficiente.
+    """
+    table = 'phoenix_relato_documento'
+    id_column = 'sicad_id'
+    weights = ('A', 'C', 'B', 'D')
+
+    def ensure_schema(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "sicad_id integer PRIMARY KEY, data_fato date, data_registro date, "
+                "municipios varchar(500), consolidado varchar(500), documento tsvector)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_documento_gin "
+                f"ON {self.table} USING gin (documento)"
+            )
+
+    def index_rows(self, rows):
+        self.delete([row['id'] for row in rows])
+        document = ' || '.join(
+            f"setweight(to_tsvector('simple', %s), '{weight}')" for weight in self.weights
+        )
+        values = [
+            (row['id'], *(row[field] for field in FILTER_FIELDS), *_document(row))
+            for row in rows if not row['exclusao']
+        ]
+        if not values:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (sicad_id, {', '.join(FILTER_FIELDS)}, documento) "
+                f"VALUES (%s, %s, %s, %s, %s, {document})",
+                values,
+            )
+
+    def match_sql(self, termos, data_inicio=None, data_fim=None, municipio=None, consolidado=None):
+        query = ' & '.join(analyze(termos))
+        if not query:
+            return None
+        clauses, params = self._filters(data_inicio, data_fim, municipio, consolidado)
+        where = ' AND '.join(["documento @@ to_tsquery('simple', %s)", *clauses])
+        return f"SELECT sicad_id FROM {self.table} WHERE {where}", [query, *params]
+
+    def search(self, termos, data_inicio=None, data_fim=None, municipio=None, consolidado=None, limit=100):
+        query = ' & '.join(analyze(termos))
+        if not query:
+            return []
+        clauses, params = self._filters(data_inicio, data_fim, municipio, consolidado)
+        where = ' AND '.join(["documento @@ to_tsquery('simple', %s)", *clauses])
+        sql = (
+            f"SELECT sicad_id, ts_rank_cd(documento, to_tsquery('simple', %s)) AS score "
+            f"FROM {self.table} WHERE {where} ORDER BY score DESC LIMIT %s"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [query, query, *params, limit])
+            return [SearchHit(sicad_id, score) for sicad_id, score in cursor.fetchall()]
+
+
+def _param(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+_backend = None
+
+
+def get_backend():
+    """Retorna a instância do backend configurado em `PHOENIX_FULLTEXT`."""
+    global _backend
+    if _backend is None:
+        options = getattr(settings, 'PHOENIX_FULLTEXT', {})
+        backend_class = import_string(options.get('BACKEND', 'apps.phoenix.fulltext.SQLiteFTS5Backend'))
+        _backend = backend_class(options)
+    return _backend
+
+
+def search(termos, **filters):
+    """Atalho para `get_backend().search(...)`."""
+    return get_backend().search(termos, **filters)
+
+
+def filter_queryset(queryset, termos, max_matches=10000, **filters):
+    """
+    Restringe um queryset da `sicadfull` aos registros que casam com os termos.
+    Se o índice estiver no mesmo banco do queryset, usa uma subconsulta;
+    caso contrário, usa as `max_matches` chaves mais relevantes.
+    """
+    backend = get_backend()
+    if queryset.db == backend.using:
+        match = backend.match_sql(termos, **filters)
+        if match is None:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(*match))
+    hits = backend.search(termos, limit=max_matches, **filters)
+    return queryset.filter(pk__in=[hit.sicad_id for hit in hits])
+
+
+def refresh_index(rebuild=False, chunk_size=2000):
+    """Sincroniza o índice textual com a `sicadfull`."""
+    backend = get_backend()
+    backend.ensure_schema()
+    if rebuild:
+        backend.clear()
+    sync = IndexSync('relato', [*TEXT_FIELDS, *FILTER_FIELDS], rebuild=rebuild, chunk_size=chunk_size)
+    for rows in sync.chunks():
+        with transaction.atomic(using=backend.using):
+            backend.index_rows(rows)
+    sync.commit()
+    return sync.processed
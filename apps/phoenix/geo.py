@@ -0,0 +1,179 @@
+"""
+Índice geográfico da `sicadfull`.
+
+As coordenadas são texto na `sicadfull` ("-1,4558"). O índice guarda em
+`GeoPoint` as coordenadas convertidas e a célula de uma grade regular de
+`GRID_SIZE` graus; uma consulta por área vira poucos intervalos de células
+(um por linha da grade), resolvidos pelo índice de `cell`, e só os pontos
+dessas células são comparados com a área exata. Coordenadas ilegíveis, fora
+do intervalo válido ou zeradas vão para `GeoQuarantine`.
+"""
+import math
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .indexing import IndexSync
+from .models import GeoPoint, GeoQuarantine
+
+GRID_SIZE = 0.01  # graus (~1,1 km no equador)
+GRID_COLUMNS = int(360 / GRID_SIZE)
+# Acima desse número de linhas da grade, a área é consultada como um único intervalo de células.
+MAX_GRID_ROWS = 200
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+SOURCE_FIELDS = ['latitude', 'longitude', 'data_fato', 'municipios', 'consolidado']
+
+GeoHit = namedtuple('GeoHit', ['sicad_id', 'latitude', 'longitude', 'distance_km'])
+
+
+class InvalidCoordinate(ValueError):
+    pass
+
+
+def parse_coordinate(value, limit):
+    """Converte o texto da `sicadfull` em float; lança InvalidCoordinate."""
+    if value is None or not str(value).strip():
+        raise InvalidCoordinate('ausente')
+    text = str(value).strip().replace(' ', '').replace(',', '.')
+    try:
+        number = float(text)
+    except ValueError:
+        raise InvalidCoordinate('ilegível') from None
+    if not math.isfinite(number) or abs(number) > limit:
+        raise InvalidCoordinate('fora do intervalo')
+    if number == 0:
+        raise InvalidCoordinate('zerada')
+    return number
+
+
+def parse_point(latitude, longitude):
+    """
+    Retorna `(latitude, longitude)` validadas. Com `PHOENIX_GEO_BOUNDS`
+    (sul, oeste, norte, leste), pontos fora da região também são rejeitados.
+    """
+    point = parse_coordinate(latitude, 90), parse_coordinate(longitude, 180)
+    bounds = getattr(settings, 'PHOENIX_GEO_BOUNDS', None)
+    if bounds:
+        south, west, north, east = bounds
+        if not (south <= point[0] <= north and west <= point[1] <= east):
+            raise InvalidCoordinate('fora da região')
+    return point
+
+
+def _grid_row(latitude):
+    return min(int((latitude + 90) // GRID_SIZE), int(180 / GRID_SIZE) - 1)
+
+
+def _grid_column(longitude):
+    return min(int((longitude + 180) // GRID_SIZE), GRID_COLUMNS - 1)
+
+
+def grid_cell(latitude, longitude):
+    return _grid_row(latitude) * GRID_COLUMNS + _grid_column(longitude)
+
+
+def _cells(south, west, north, east):
+    first_row, last_row = _grid_row(south), _grid_row(north)
+    first_column, last_column = _grid_column(west), _grid_column(east)
+    if last_row - first_row + 1 > MAX_GRID_ROWS:
+        return Q(cell__range=(first_row * GRID_COLUMNS + first_column, last_row * GRID_COLUMNS + last_column))
+    cells = Q()
+    for row in range(first_row, last_row + 1):
+        cells |= Q(cell__range=(row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column))
+    return cells
+
+
+def _filter(queryset, data_inicio=None, data_fim=None, municipio=None, consolidado=None):
+    if data_inicio:
+        queryset = queryset.filter(data_fato__gte=data_inicio)
+    if data_fim:
+        queryset = queryset.filter(data_fato__lte=data_fim)
+    if municipio:
+        queryset = queryset.filter(municipios=municipio)
+    if consolidado:
+        queryset = queryset.filter(consolidado=consolidado)
+    return queryset
+
+
+def in_bbox(south, west, north, east, **filters):
+    """
+    Queryset de `GeoPoint` dentro da área (em graus), com os filtros
+    opcionais data_inicio, data_fim, municipio e consolidado.
+    """
+    if south > north or west > east:
+        raise ValueError("Área inválida: sul/oeste devem ser menores que norte/leste.")
+    queryset = GeoPoint.objects.filter(
+        _cells(south, west, north, east),
+        latitude__range=(south, north),
+        longitude__range=(west, east),
+    )
+    return _filter(queryset, **filters)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distância em km entre dois pontos."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def near(latitude, longitude, radius_km, limit=500, **filters):
+    """Lista de `GeoHit` a até `radius_km` do ponto, do mais próximo ao mais distante."""
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    candidates = in_bbox(
+        max(latitude - delta_lat, -90), max(longitude - delta_lon, -180),
+        min(latitude + delta_lat, 90), min(longitude + delta_lon, 180),
+        **filters,
+    ).values_list('sicad_id', 'latitude', 'longitude')
+
+    hits = []
+    for sicad_id, lat, lon in candidates:
+        distance = haversine(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            hits.append(GeoHit(sicad_id, lat, lon, round(distance, 3)))
+    hits.sort(key=lambda hit: (hit.distance_km, hit.sicad_id))
+    return hits[:limit]
+
+
+def _index_rows(rows):
+    ids = [row['id'] for row in rows]
+    GeoPoint.objects.filter(sicad_id__in=ids).delete()
+    GeoQuarantine.objects.filter(sicad_id__in=ids).delete()
+
+    points, quarantined = [], []
+    for row in rows:
+        if row['exclusao']:
+            continue
+        try:
+            latitude, longitude = parse_point(row['latitude'], row['longitude'])
+        except InvalidCoordinate as exc:
+            if exc.args[0] != 'ausente':
+                quarantined.append(GeoQuarantine(
+                    sicad_id=row['id'], latitude=row['latitude'], longitude=row['longitude'], motivo=exc.args[0],
+                ))
+            continue
+        points.append(GeoPoint(
+            sicad_id=row['id'], latitude=latitude, longitude=longitude,
+            cell=grid_cell(latitude, longitude),
+            data_fato=row['data_fato'], municipios=row['municipios'], consolidado=row['consolidado'],
+        ))
+    GeoPoint.objects.bulk_create(points, batch_size=2000)
+    GeoQuarantine.objects.bulk_create(quarantined, batch_size=2000)
+
+
+def refresh_index(rebuild=False, chunk_size=2000):
+    """Sincroniza o índice geográfico com a `sicadfull`."""
+    if rebuild:
+        GeoPoint.objects.all().delete()
+        GeoQuarantine.objects.all().delete()
+    sync = IndexSync('geo', SOURCE_FIELDS, rebuild=rebuild, chunk_size=chunk_size)
+    for rows in sync.chunks():
+        with transaction.atomic():
+            _index_rows(rows)
+    sync.commit()
+    return sync.processed
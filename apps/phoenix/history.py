@@ -0,0 +1,229 @@
+"""
+Histórico de pesquisas da Phoenix com escrita adiada.
+
+Cada pesquisa é apenas anotada em memória; as anotações são gravadas em lote
+(`bulk_create`) quando o buffer atinge `MAX_BUFFER` pesquisas, a cada
+`FLUSH_INTERVAL` segundos e no encerramento do processo. Pesquisas idênticas
+consecutivas do mesmo usuário (mesmos parâmetros normalizados) viram uma
+única linha, com `hit_count` e `last_searched` atualizados, tanto no buffer
+quanto em relação à última linha já gravada.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, DateTimeField, F, IntegerField, OuterRef, Subquery, Value, When
+from django.utils import timezone
+
+from .models import SearchHistory
+from .search_cache import normalize_params
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'FLUSH_INTERVAL': 10,
+    'MAX_BUFFER': 200,
+    'RETENTION_DAYS': 180,
+    'MAX_PER_USER': 200,
+}
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'SEARCH_HISTORY', {})}
+
+
+def query_hash(search_type, params):
+    """Hash dos parâmetros normalizados: pesquisas equivalentes têm o mesmo hash."""
+    raw = json.dumps([search_type, normalize_params(params)], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _serializable(params):
+    return {
+        field: value.isoformat() if hasattr(value, 'isoformat') else value
+        for field, value in params.items() if value not in (None, '')
+    }
+
+
+@dataclass
+class _Entry:
+    search_type: str
+    search_query: dict
+    query_hash: str
+    first: object
+    last: object
+    hits: int = 1
+
+
+class HistoryWriter:
+    def __init__(self, flush_interval, max_buffer):
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._pending = {}
+        self._size = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def record(self, user_id, search_type, params, when=None):
+        """Anota uma pesquisa do usuário; grava no banco só quando necessário."""
+        when = when or timezone.now()
+        digest = query_hash(search_type, params)
+        with self._lock:
+            entries = self._pending.setdefault(user_id, [])
+            if entries and entries[-1].query_hash == digest:
+                entries[-1].hits += 1
+                entries[-1].last = when
+            else:
+                entries.append(_Entry(search_type, _serializable(params), digest, when, when))
+                self._size += 1
+            should_flush = (
+                self._size >= self.max_buffer
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if self._flusher is None:
+                self._start_flusher()
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Grava o buffer. Retorna a quantidade de pesquisas anotadas que foram gravadas."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._size = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            with transaction.atomic():
+                latest = SearchHistory.objects.filter(user=OuterRef('user')).order_by('-last_searched').values('pk')[:1]
+                last_rows = {
+                    user_id: (pk, digest)
+                    for user_id, pk, digest in SearchHistory.objects.filter(
+                        user_id__in=pending, pk=Subquery(latest),
+                    ).values_list('user_id', 'pk', 'query_hash')
+                }
+
+                repeats, rows = {}, []
+                for user_id, entries in pending.items():
+                    last_pk, last_hash = last_rows.get(user_id, (None, None))
+                    if entries and last_hash == entries[0].query_hash:
+                        repeats[last_pk] = entries[0]
+                        entries = entries[1:]
+                    rows.extend(
+                        SearchHistory(
+                            user_id=user_id, search_type=entry.search_type, search_query=entry.search_query,
+                            query_hash=entry.query_hash, hit_count=entry.hits,
+                            timestamp=entry.first, last_searched=entry.last,
+                        )
+                        for entry in entries
+                    )
+                if repeats:
+                    SearchHistory.objects.filter(pk__in=repeats).update(
+                        hit_count=F('hit_count') + Case(
+                            *(When(pk=pk, then=Value(entry.hits)) for pk, entry in repeats.items()),
+                            output_field=IntegerField(),
+                        ),
+                        last_searched=Case(
+                            *(When(pk=pk, then=Value(entry.last)) for pk, entry in repeats.items()),
+                            output_field=DateTimeField(),
+                        ),
+                    )
+                SearchHistory.objects.bulk_create(rows, batch_size=500)
+        except Exception:
+            logger.exception("Falha ao gravar o histórico de pesquisas de %d usuário(s).", len(pending))
+            with self._lock:
+                # Devolve ao buffer o que não foi gravado, antes das anotações mais novas.
+                for user_id, entries in pending.items():
+                    self._pending[user_id] = entries + self._pending.get(user_id, [])
+                    self._size += len(entries)
+            return 0
+        return sum(entry.hits for entries in pending.values() for entry in entries)
+
+    def _start_flusher(self):
+        self._flusher = threading.Thread(target=self._run, name='search-history-flusher', daemon=True)
+        self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+                connections.close_all()
+
+
+def _build_writer():
+    options = get_options()
+    return HistoryWriter(flush_interval=options['FLUSH_INTERVAL'], max_buffer=options['MAX_BUFFER'])
+
+
+writer = _build_writer()
+atexit.register(writer.flush)
+
+
+def recent_searches(user, limit=10):
+    """
+    Pesquisas mais recentes do usuário (uma consulta no índice
+    `user, -last_searched`). Não inclui o que ainda está no buffer.
+    """
+    return SearchHistory.objects.filter(user=user).order_by('-last_searched')[:limit]
+
+
+def _archive_rows(pks, archive):
+    rows = SearchHistory.objects.filter(pk__in=pks).values(
+        'pk', 'user_id', 'search_type', 'search_query', 'hit_count', 'timestamp', 'last_searched',
+    )
+    for row in rows.iterator(chunk_size=1000):
+        archive.write(json.dumps(row, default=str, ensure_ascii=False) + '\n')
+
+
+def compact(retention_days=None, max_per_user=None, archive=None):
+    """
+    Compacta o histórico de cada usuário: funde linhas consecutivas da mesma
+    pesquisa (somando `hit_count`), remove as linhas cuja última repetição é
+    anterior a `retention_days` dias e mantém no máximo `max_per_user` linhas.
+    Com `archive` (arquivo de texto aberto), as linhas removidas são gravadas
+    nele em JSON, uma por linha. Retorna `(fundidas, removidas)`.
+    """
+    options = get_options()
+    retention_days = options['RETENTION_DAYS'] if retention_days is None else retention_days
+    max_per_user = options['MAX_PER_USER'] if max_per_user is None else max_per_user
+    cutoff = timezone.now() - timedelta(days=retention_days)
+
+    merged = removed = 0
+    user_ids = SearchHistory.objects.order_by('user_id').values_list('user_id', flat=True).distinct()
+    for user_id in list(user_ids):
+        rows = SearchHistory.objects.filter(user_id=user_id).order_by('-last_searched').values_list(
+            'pk', 'query_hash', 'hit_count', 'timestamp', 'last_searched',
+        )
+        kept, merged_pks, changed = [], [], {}
+        for pk, digest, hits, first, last in rows:
+            if kept and digest and kept[-1][1] == digest:
+                newer = kept[-1]
+                kept[-1] = (newer[0], digest, newer[2] + hits, first, newer[4])
+                changed[newer[0]] = kept[-1]
+                merged_pks.append(pk)
+            else:
+                kept.append((pk, digest, hits, first, last))
+        expired = [row[0] for index, row in enumerate(kept) if index >= max_per_user or row[4] < cutoff]
+
+        with transaction.atomic():
+            # Também nas linhas que vão expirar: o arquivo recebe a linha já com
+            # as repetições das linhas fundidas nela.
+            for pk, _, hits, first, _ in changed.values():
+                SearchHistory.objects.filter(pk=pk).update(hit_count=hits, timestamp=first)
+            if expired and archive is not None:
+                _archive_rows(expired, archive)
+            for start in range(0, len(merged_pks) + len(expired), 1000):
+                SearchHistory.objects.filter(pk__in=(merged_pks + expired)[start:start + 1000]).delete()
+        merged += len(merged_pks)
+        removed += len(expired)
+    return merged, removed
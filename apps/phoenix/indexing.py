@@ -0,0 +1,103 @@
+"""
+Infraestrutura comum dos índices auxiliares da Phoenix.
+
+A tabela `sicadfull` não é gerenciada pelo Django, então não podemos criar
+índices nela. Cada índice auxiliar mantém uma cópia enxuta dos dados que
+precisa e é sincronizado de forma incremental a partir de `data_modificacao`
+(registros alterados) e da chave primária (registros novos).
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import IndexState, Sicadfull
+
+# Nome do índice -> função `refresh(rebuild=False, chunk_size=...)` que o sincroniza.
+INDEXES = {
+    'relato': 'apps.phoenix.fulltext.refresh_index',
+    'nomes': 'apps.phoenix.names.refresh_index',
+    'numeros': 'apps.phoenix.lookup.refresh_index',
+    'estatisticas': 'apps.phoenix.rollups.refresh_index',
+    'geo': 'apps.phoenix.geo.refresh_index',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class IndexSync:
+    """
+    Percorre os registros da `sicadfull` que mudaram desde a última
+    sincronização do índice `name`, em lotes de dicionários.
+
+    Uso:
+        sync = IndexSync('relato', ['relato', 'observacao'])
+        for rows in sync.chunks():
+            ...  # linhas com `exclusao=True` devem sair do índice
+        sync.commit()
+    """
+
+    def __init__(self, name, fields, rebuild=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.name = name
+        self.fields = ['id', 'exclusao', 'data_modificacao', *fields]
+        self.rebuild = rebuild
+        self.chunk_size = chunk_size
+        self.state, _ = IndexState.objects.get_or_create(name=name)
+        self.processed = 0
+        self._max_pk = 0 if rebuild else self.state.last_pk
+        self._max_modified = None if rebuild else self.state.last_modified
+
+    def queryset(self):
+        qs = Sicadfull.objects.all()
+        if not self.rebuild:
+            changed = Q(pk__gt=self.state.last_pk)
+            if self.state.last_modified:
+                # `data_modificacao` tem resolução de dia: o próprio dia do
+                # último ponto de controle é reprocessado (a indexação é idempotente).
+                changed |= Q(data_modificacao__gte=self.state.last_modified)
+            qs = qs.filter(changed)
+        return qs.values(*self.fields).order_by()
+
+    def chunks(self):
+        rows = []
+        for row in self.queryset().iterator(chunk_size=self.chunk_size):
+            rows.append(row)
+            if len(rows) >= self.chunk_size:
+                yield self._consume(rows)
+                rows = []
+        if rows:
+            yield self._consume(rows)
+
+    def _consume(self, rows):
+        for row in rows:
+            if row['id'] > self._max_pk:
+                self._max_pk = row['id']
+            modified = row['data_modificacao']
+            if modified and (self._max_modified is None or modified > self._max_modified):
+                self._max_modified = modified
+        self.processed += len(rows)
+        return rows
+
+    @transaction.atomic
+    def commit(self):
+        """Grava o ponto de controle e incrementa a versão do índice."""
+        self.state.last_pk = self._max_pk
+        self.state.last_modified = self._max_modified
+        self.state.version += 1
+        self.state.save()
+
+
+def refresh(names=None, rebuild=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Sincroniza os índices informados (todos, por padrão).
+    Retorna um dicionário nome -> quantidade de registros processados.
+    """
+    results = {}
+    for name in names or INDEXES:
+        refresh_index = import_string(INDEXES[name])
+        results[name] = refresh_index(rebuild=rebuild, chunk_size=chunk_size)
+    return results
+
+
+def get_version(name):
+    """Retorna a versão atual do índice (0 se nunca foi sincronizado)."""
+    return IndexState.objects.filter(name=name).values_list('version', flat=True).first() or 0
@@ -0,0 +1,156 @@
+"""
+Consulta exata por número de boletim (nro_bop/nro_bop_aditado) e de
+procedimento (nro_tombo).
+
+Os números são canonizados (sem pontuação e sem zeros à esquerda) e
+mantidos no índice auxiliar `NumberIndex`. Antes do índice há um filtro de
+Bloom, para que números inexistentes sejam descartados sem consultar o
+banco, e um LRU com os resultados recentes.
+"""
+import hashlib
+import re
+import threading
+import time
+from math import ceil, log
+
+from django.db import transaction
+
+from apps.base.caching import LRUCache
+
+from .indexing import IndexSync, get_version
+from .models import NumberIndex
+from .text import fold
+
+NUMBER_FIELDS = {
+    'nro_bop': 'BOP',
+    'nro_bop_aditado': 'BOP',
+    'nro_tombo': 'PROC',
+}
+
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+# Intervalo (segundos) entre verificações da versão do índice.
+VERSION_CHECK_INTERVAL = 30
+
+_GROUP_RE = re.compile(r'[a-z0-9]+')
+
+
+def canonicalize(numero):
+    """
+    Forma canônica de um número: grupos alfanuméricos em maiúsculas,
+    sem zeros à esquerda, separados por ponto.
+    Ex.: "00123/2024.100045-5" -> "123.2024.100045.5"
+    """
+    groups = _GROUP_RE.findall(fold(numero))
+    return '.'.join((group.lstrip('0') or '0') if group.isdigit() else group.upper() for group in groups)[:100]
+
+
+class BloomFilter:
+    """Filtro de Bloom com hashes derivados de um único BLAKE2b (double hashing)."""
+
+    def __init__(self, capacity, error_rate=BLOOM_FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, ceil(-capacity * log(error_rate) / (log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class NumberLookup:
+    """Filtro de Bloom + LRU sobre o `NumberIndex`, recarregados quando o índice muda."""
+
+    def __init__(self, cache_size=4096):
+        self.cache = LRUCache(maxsize=cache_size, name='phoenix.lookup')
+        self._bloom = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _bloom_filter(self):
+        now = time.monotonic()
+        if self._bloom is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return self._bloom
+        with self._lock:
+            version = get_version('numeros')
+            if self._bloom is None or version != self._version:
+                numbers = NumberIndex.objects.values_list('tipo', 'numero')
+                bloom = BloomFilter(numbers.count())
+                for tipo, numero in numbers.iterator(chunk_size=10000):
+                    bloom.add(f"{tipo}:{numero}")
+                self._bloom, self._version = bloom, version
+                self.cache.clear()
+            self._checked_at = now
+        return self._bloom
+
+    def find(self, tipo, numero):
+        """Retorna a lista de chaves primárias da `sicadfull` com esse número."""
+        canonical = canonicalize(numero)
+        key = f"{tipo}:{canonical}"
+        # O filtro confere a versão do índice antes do LRU: depois de uma
+        # sincronização feita em outro processo, os resultados antigos deixam
+        # de ser servidos em até `VERSION_CHECK_INTERVAL` segundos.
+        bloom = self._bloom_filter()
+        cache_key = f"{self._version}:{key}"
+        ids = self.cache.get(cache_key)
+        if ids is not None:
+            return list(ids)
+        if key not in bloom:
+            return []
+        ids = tuple(NumberIndex.objects.filter(tipo=tipo, numero=canonical)
+                    .order_by('sicad_id').values_list('sicad_id', flat=True).distinct())
+        self.cache.set(cache_key, ids)
+        return list(ids)
+
+    def invalidate(self):
+        self._bloom = None
+        self.cache.clear()
+
+
+lookup = NumberLookup()
+
+
+def find_bop(nro_bop):
+    """Registros cujo nro_bop ou nro_bop_aditado corresponde ao número informado."""
+    return lookup.find('BOP', nro_bop)
+
+
+def find_procedure(nro_tombo):
+    """Registros cujo nro_tombo corresponde ao número informado."""
+    return lookup.find('PROC', nro_tombo)
+
+
+def _index_rows(rows):
+    NumberIndex.objects.filter(sicad_id__in=[row['id'] for row in rows]).delete()
+    entries = {
+        (NUMBER_FIELDS[field], canonicalize(row[field]), row['id'])
+        for row in rows if not row['exclusao']
+        for field in NUMBER_FIELDS if row[field]
+    }
+    NumberIndex.objects.bulk_create(
+        [NumberIndex(tipo=tipo, numero=numero, sicad_id=sicad_id) for tipo, numero, sicad_id in entries if numero],
+        batch_size=5000,
+    )
+
+
+def refresh_index(rebuild=False, chunk_size=2000):
+    """Sincroniza o índice de números com a `sicadfull`."""
+    if rebuild:
+        NumberIndex.objects.all().delete()
+    sync = IndexSync('numeros', list(NUMBER_FIELDS), rebuild=rebuild, chunk_size=chunk_size)
+    for rows in sync.chunks():
+        with transaction.atomic():
+            _index_rows(rows)
+    sync.commit()
+    lookup.invalidate()
+    return sync.processed
@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.phoenix import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede as pesquisas da Phoenix (boletim, procedimento, relato, pessoa e agregações) "
+        "e grava os resultados em JSON para comparação entre commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('cases', nargs='*', help="Casos a executar. Padrão: todos.")
+        parser.add_argument('--samples', type=int, default=20, help="Entradas sorteadas por caso.")
+        parser.add_argument('--iterations', type=int, default=3, help="Repetições de cada entrada.")
+        parser.add_argument('--warmup', type=int, default=2, help="Execuções descartadas antes da medição.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Arquivo JSON onde o relatório é gravado.")
+        parser.add_argument('--compare', help="Relatório JSON anterior, para comparar o p50 e o p95.")
+        parser.add_argument(
+            '--max-regression', type=float,
+            help="Com --compare, falha se algum caso ficar mais lento que isso (0.2 = 20%%) no p50.",
+        )
+
+    def handle(self, *args, **options):
+        report = benchmarks.run(
+            names=options['cases'], samples=options['samples'], iterations=options['iterations'],
+            warmup=options['warmup'], seed=options['seed'],
+        )
+        meta = report['meta']
+        self.stdout.write(f"{meta['rows']} registros ({meta['database']}), commit {meta['commit'] or '?'}")
+        self.stdout.write(f"{'caso':<22} {'exec':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'consultas':>10}")
+        for name, result in report['results'].items():
+            if 'skipped' in result:
+                self.stdout.write(f"{name:<22} ignorado: {result['skipped']}")
+                continue
+            self.stdout.write(
+                f"{name:<22} {result['runs']:>5} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['queries_mean']:>10.1f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['output']}."))
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = []
+            for metric in ('p50_ms', 'p95_ms'):
+                for name, before, after, change in benchmarks.compare(baseline, report, metric):
+                    self.stdout.write(f"{name:<22} {metric}: {before:.2f} -> {after:.2f} ({change:+.1%})")
+                    if metric == 'p50_ms' and options['max_regression'] is not None and change > options['max_regression']:
+                        regressions.append(name)
+            if regressions:
+                raise CommandError(f"Regressão acima do limite em: {', '.join(regressions)}")
@@ -0,0 +1,34 @@
+import gzip
+
+from django.core.management.base import BaseCommand
+
+from apps.phoenix.history import compact, get_options
+
+
+class Command(BaseCommand):
+    help = "Compacta o histórico de pesquisas da Phoenix e remove as linhas antigas."
+
+    def add_arguments(self, parser):
+        options = get_options()
+        parser.add_argument(
+            '--days', type=int, default=options['RETENTION_DAYS'],
+            help="Remove pesquisas repetidas pela última vez há mais de N dias.",
+        )
+        parser.add_argument(
+            '--keep', type=int, default=options['MAX_PER_USER'],
+            help="Máximo de linhas mantidas por usuário.",
+        )
+        parser.add_argument(
+            '--archive',
+            help="Arquivo .jsonl.gz onde as linhas removidas são gravadas antes da exclusão.",
+        )
+
+    def handle(self, *args, **options):
+        if options['archive']:
+            with gzip.open(options['archive'], 'at', encoding='utf-8') as archive:
+                merged, removed = compact(options['days'], options['keep'], archive)
+        else:
+            merged, removed = compact(options['days'], options['keep'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{merged} linha(s) fundida(s) e {removed} linha(s) removida(s)."
+        ))
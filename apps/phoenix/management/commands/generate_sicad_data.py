@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.phoenix import synthetic
+from apps.phoenix.indexing import refresh
+from apps.phoenix.routers import pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria as tabelas sicadfull, localidades e consolidados em um banco SQLite local "
+        "e as preenche com dados sintéticos (para desenvolvimento e benchmarks)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Quantidade de registros a inserir.")
+        parser.add_argument('--seed', type=int, default=0, help="Semente do gerador (mesma semente, mesmos dados).")
+        parser.add_argument('--batch-size', type=int, default=synthetic.DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--database', default=pool.primary,
+            help="Alias do banco (padrão: o banco analítico configurado).",
+        )
+        parser.add_argument('--reset', action='store_true', help="Apaga os registros existentes antes de gerar.")
+        parser.add_argument(
+            '--no-index', action='store_true',
+            help="Não sincroniza os índices auxiliares da Phoenix ao final.",
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        try:
+            created = synthetic.ensure_tables(using)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for table in created:
+            self.stdout.write(f"Tabela {table} criada.")
+
+        if options['reset']:
+            synthetic.clear(using)
+        synthetic.populate_reference(using)
+
+        total = options['rows']
+        started = time.monotonic()
+
+        def progress(inserted):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"\r{inserted}/{total} registros ({inserted / max(elapsed, 1e-9):.0f}/s)", ending='')
+            self.stdout.flush()
+
+        synthetic.generate(total, using=using, seed=options['seed'], batch_size=options['batch_size'], progress=progress)
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} registro(s) inserido(s) em {time.monotonic() - started:.1f}s."
+        ))
+
+        if not options['no_index']:
+            results = refresh(rebuild=options['reset'])
+            for name, processed in results.items():
+                self.stdout.write(self.style.SUCCESS(f"{name}: {processed} registro(s) processado(s)."))
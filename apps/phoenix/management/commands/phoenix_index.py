@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.phoenix.indexing import DEFAULT_CHUNK_SIZE, INDEXES, refresh
+
+
+class Command(BaseCommand):
+    help = "Sincroniza os índices auxiliares da Phoenix com a tabela sicadfull."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'indexes', nargs='*',
+            help=f"Índices a sincronizar ({', '.join(INDEXES)}). Padrão: todos.",
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Descarta o conteúdo atual e reindexa a tabela inteira.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        unknown = set(options['indexes']) - set(INDEXES)
+        if unknown:
+            raise CommandError(f"Índice(s) desconhecido(s): {', '.join(sorted(unknown))}")
+
+        results = refresh(options['indexes'], rebuild=options['rebuild'], chunk_size=options['chunk_size'])
+        for name, processed in results.items():
+            self.stdout.write(self.style.SUCCESS(f"{name}: {processed} registro(s) processado(s)."))
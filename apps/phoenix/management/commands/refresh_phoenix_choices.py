@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.phoenix.choices import catalog
+
+
+class Command(BaseCommand):
+    help = "Recarrega as listas de municípios e tipos de crime dos formulários da Phoenix."
+
+    def handle(self, *args, **options):
+        catalog.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f"Catálogo atualizado: {len(catalog.municipios())} município(s), "
+            f"{len(catalog.consolidados())} tipo(s) de crime."
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Índice')),
+                ('last_modified', models.DateField(blank=True, null=True, verbose_name='Última Modificação Indexada')),
+                ('last_pk', models.IntegerField(default=0, verbose_name='Último Registro Indexado')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Versão')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Estado de Índice',
+                'verbose_name_plural': 'Estados de Índices',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0002_indexstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonName',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sicad_id', models.IntegerField(db_index=True, verbose_name='Registro SICAD')),
+                ('nro_bop', models.CharField(blank=True, max_length=500, null=True, verbose_name='Número do Boletim')),
+                ('campo', models.CharField(choices=[('vit_nome', 'Nome da Vítima'), ('vit_alcunha', 'Alcunha da Vítima'), ('vit_mae', 'Mãe da Vítima'), ('aut_nome', 'Nome do Autor'), ('aut_alcunha', 'Alcunha do Autor'), ('aut_mae', 'Mãe do Autor')], max_length=20, verbose_name='Campo')),
+                ('nome', models.CharField(max_length=500, verbose_name='Nome')),
+                ('nome_normalizado', models.CharField(db_index=True, max_length=500, verbose_name='Nome Normalizado')),
+                ('data_fato', models.DateField(blank=True, null=True)),
+                ('municipios', models.CharField(blank=True, max_length=500, null=True)),
+                ('consolidado', models.CharField(blank=True, max_length=500, null=True)),
+            ],
+            options={
+                'verbose_name': 'Nome de Envolvido',
+                'verbose_name_plural': 'Nomes de Envolvidos',
+            },
+        ),
+        migrations.CreateModel(
+            name='NameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='phoenix.personname')),
+            ],
+            options={
+                'verbose_name': 'Trigrama de Nome',
+                'verbose_name_plural': 'Trigramas de Nomes',
+                'indexes': [models.Index(fields=['trigram', 'name'], name='phoenix_nam_trigram_7ff6ea_idx')],
+            },
+        ),
+    ]
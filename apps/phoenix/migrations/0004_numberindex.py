@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0003_personname_nametrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('BOP', 'Boletim de Ocorrência'), ('PROC', 'Procedimento')], max_length=4, verbose_name='Tipo')),
+                ('numero', models.CharField(max_length=100, verbose_name='Número Canônico')),
+                ('sicad_id', models.IntegerField(db_index=True, verbose_name='Registro SICAD')),
+            ],
+            options={
+                'verbose_name': 'Índice de Número',
+                'verbose_name_plural': 'Índices de Números',
+                'indexes': [models.Index(fields=['tipo', 'numero'], name='phoenix_num_tipo_3692e8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0004_numberindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccurrenceFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('municipios', models.CharField(default='', max_length=500)),
+                ('risp', models.CharField(default='', max_length=500)),
+                ('aisp', models.CharField(default='', max_length=500)),
+                ('consolidado', models.CharField(default='', max_length=500)),
+                ('grupo_ocorrencia', models.CharField(default='', max_length=500)),
+                ('ano_fato', models.IntegerField(default=0)),
+                ('mes_fato', models.CharField(default='', max_length=500)),
+                ('dia_semana', models.CharField(default='', max_length=500)),
+                ('fx_4_hor', models.CharField(default='', max_length=500)),
+                ('sicad_id', models.IntegerField(unique=True, verbose_name='Registro SICAD')),
+            ],
+            options={
+                'verbose_name': 'Fato de Ocorrência',
+                'verbose_name_plural': 'Fatos de Ocorrências',
+            },
+        ),
+        migrations.CreateModel(
+            name='OccurrenceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('municipios', models.CharField(default='', max_length=500)),
+                ('risp', models.CharField(default='', max_length=500)),
+                ('aisp', models.CharField(default='', max_length=500)),
+                ('consolidado', models.CharField(default='', max_length=500)),
+                ('grupo_ocorrencia', models.CharField(default='', max_length=500)),
+                ('ano_fato', models.IntegerField(default=0)),
+                ('mes_fato', models.CharField(default='', max_length=500)),
+                ('dia_semana', models.CharField(default='', max_length=500)),
+                ('fx_4_hor', models.CharField(default='', max_length=500)),
+                ('rollup', models.CharField(max_length=30, verbose_name='Agregação')),
+                ('chave', models.CharField(max_length=40, verbose_name='Chave')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+            ],
+            options={
+                'verbose_name': 'Estatística de Ocorrências',
+                'verbose_name_plural': 'Estatísticas de Ocorrências',
+                'indexes': [models.Index(fields=['rollup', 'ano_fato'], name='phoenix_occ_rollup_6818b0_idx')],
+                'constraints': [models.UniqueConstraint(fields=('rollup', 'chave'), name='phoenix_rollup_chave_unique')],
+            },
+        ),
+    ]
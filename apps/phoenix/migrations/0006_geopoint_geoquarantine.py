@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0005_occurrence_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeoPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sicad_id', models.IntegerField(unique=True, verbose_name='Registro SICAD')),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('cell', models.BigIntegerField(db_index=True, verbose_name='Célula da Grade')),
+                ('data_fato', models.DateField(blank=True, null=True)),
+                ('municipios', models.CharField(blank=True, max_length=500, null=True)),
+                ('consolidado', models.CharField(blank=True, max_length=500, null=True)),
+            ],
+            options={
+                'verbose_name': 'Ponto Geográfico',
+                'verbose_name_plural': 'Pontos Geográficos',
+            },
+        ),
+        migrations.CreateModel(
+            name='GeoQuarantine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sicad_id', models.IntegerField(unique=True, verbose_name='Registro SICAD')),
+                ('latitude', models.CharField(blank=True, max_length=500, null=True)),
+                ('longitude', models.CharField(blank=True, max_length=500, null=True)),
+                ('motivo', models.CharField(max_length=100, verbose_name='Motivo')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Coordenada em Quarentena',
+                'verbose_name_plural': 'Coordenadas em Quarentena',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:39
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_timestamp(apps, schema_editor):
+    SearchHistory = apps.get_model('phoenix', 'SearchHistory')
+    SearchHistory.objects.update(last_searched=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0006_geopoint_geoquarantine'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='searchhistory',
+            options={'ordering': ['-last_searched'], 'verbose_name': 'Histórico de Pesquisa', 'verbose_name_plural': 'Históricos de Pesquisa'},
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='hit_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Repetições'),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='last_searched',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Última Repetição'),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='query_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Hash da Pesquisa'),
+        ),
+        migrations.RunPython(copy_timestamp, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='searchhistory',
+            index=models.Index(fields=['user', '-last_searched'], name='phoenix_history_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0007_searchhistory_hit_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saveditem',
+            name='sicad_id',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Registro SICAD'),
+        ),
+        migrations.AddField(
+            model_name='saveditem',
+            name='source_modified',
+            field=models.DateField(blank=True, null=True, verbose_name='Modificação do Registro ao Salvar'),
+        ),
+    ]
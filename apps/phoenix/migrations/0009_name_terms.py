@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def reset_names_index(apps, schema_editor):
+    # O índice de nomes muda de formato: é reconstruído na próxima sincronização.
+    apps.get_model('phoenix', 'PersonName').objects.all().delete()
+    apps.get_model('phoenix', 'IndexState').objects.filter(name='nomes').update(last_pk=0, last_modified=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phoenix', '0008_saveditem_sicad_id'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='NameTrigram',
+        ),
+        migrations.RunPython(reset_names_index, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='NameTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('palavra', models.CharField(max_length=500, unique=True, verbose_name='Palavra')),
+            ],
+            options={
+                'verbose_name': 'Palavra de Nome',
+                'verbose_name_plural': 'Palavras de Nomes',
+            },
+        ),
+        migrations.CreateModel(
+            name='NormalizedName',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome_normalizado', models.CharField(max_length=500, unique=True, verbose_name='Nome Normalizado')),
+                ('terms', models.ManyToManyField(related_name='names', to='phoenix.nameterm', verbose_name='Palavras')),
+            ],
+            options={
+                'verbose_name': 'Nome Normalizado',
+                'verbose_name_plural': 'Nomes Normalizados',
+            },
+        ),
+        migrations.RemoveField(
+            model_name='personname',
+            name='nome_normalizado',
+        ),
+        migrations.AddField(
+            model_name='personname',
+            name='normalized',
+            field=models.ForeignKey(default=0, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='phoenix.normalizedname', verbose_name='Nome Normalizado'),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='NameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='phoenix.nameterm')),
+            ],
+            options={
+                'verbose_name': 'Trigrama de Nome',
+                'verbose_name_plural': 'Trigramas de Nomes',
+                'indexes': [models.Index(fields=['trigram', 'term'], name='phoenix_nam_trigram_2463e8_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 # --- Modelos de Tabelas Existentes ---
 
@@ -138,12 +139,17 @@ class SearchHistory(models.Model):
     )
     search_type = models.CharField(max_length=100, verbose_name="Tipo de Pesquisa")
     search_query = models.JSONField(verbose_name="Parâmetros da Pesquisa")
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Data da Pesquisa")
+    query_hash = models.CharField(max_length=64, blank=True, default='', verbose_name="Hash da Pesquisa")
+    hit_count = models.PositiveIntegerField(default=1, verbose_name="Repetições")
+    # Gravado pelo buffer (apps.phoenix.history) com o horário da primeira pesquisa.
+    timestamp = models.DateTimeField(default=timezone.now, verbose_name="Data da Pesquisa")
+    last_searched = models.DateTimeField(default=timezone.now, verbose_name="Última Repetição")
 
     class Meta:
         verbose_name = 'Histórico de Pesquisa'
         verbose_name_plural = 'Históricos de Pesquisa'
-        ordering = ['-timestamp']
+        ordering = ['-last_searched']
+        indexes = [models.Index(fields=['user', '-last_searched'], name='phoenix_history_recent_idx')]
 
 class SavedItem(models.Model):
     """Armazena boletins ou procedimentos salvos por um usuário."""
@@ -159,10 +165,208 @@ class SavedItem(models.Model):
     item_type = models.CharField(max_length=4, choices=SAVED_TYPES, verbose_name="Tipo de Item")
     item_id = models.CharField(max_length=100, verbose_name="Identificador do Item")
     description = models.CharField(max_length=255, blank=True, null=True, verbose_name="Descrição Rápida")
+    sicad_id = models.IntegerField(blank=True, null=True, verbose_name="Registro SICAD")
+    source_modified = models.DateField(blank=True, null=True, verbose_name="Modificação do Registro ao Salvar")
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Data de Salvamento")
 
     class Meta:
         verbose_name = 'Item Salvo'
         verbose_name_plural = 'Itens Salvos'
         unique_together = ('user', 'item_type', 'item_id')
-        ordering = ['-timestamp']
\ No newline at end of file
+        ordering = ['-timestamp']
+
+# --- Índices Auxiliares ---
+
+class IndexState(models.Model):
+    """Ponto de controle da sincronização de um índice auxiliar com a tabela sicadfull."""
+    name = models.CharField(max_length=50, unique=True, verbose_name="Índice")
+    last_modified = models.DateField(blank=True, null=True, verbose_name="Última Modificação Indexada")
+    last_pk = models.IntegerField(default=0, verbose_name="Último Registro Indexado")
+    version = models.PositiveIntegerField(default=0, verbose_name="Versão")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = 'Estado de Índice'
+        verbose_name_plural = 'Estados de Índices'
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} (v{self.version})"
+
+
+class NameTerm(models.Model):
+    """Palavra distinta dos nomes normalizados (vocabulário da pesquisa aproximada)."""
+    palavra = models.CharField(max_length=500, unique=True, verbose_name="Palavra")
+
+    class Meta:
+        verbose_name = 'Palavra de Nome'
+        verbose_name_plural = 'Palavras de Nomes'
+
+    def __str__(self):
+        return self.palavra
+
+
+class NormalizedName(models.Model):
+    """Nome normalizado distinto, com as palavras que o compõem."""
+    nome_normalizado = models.CharField(max_length=500, unique=True, verbose_name="Nome Normalizado")
+    terms = models.ManyToManyField(NameTerm, related_name='names', verbose_name="Palavras")
+
+    class Meta:
+        verbose_name = 'Nome Normalizado'
+        verbose_name_plural = 'Nomes Normalizados'
+
+    def __str__(self):
+        return self.nome_normalizado
+
+
+class PersonName(models.Model):
+    """Ocorrência de um nome de vítima ou autor na sicadfull."""
+    NAME_FIELDS = (
+        ('vit_nome', 'Nome da Vítima'),
+        ('vit_alcunha', 'Alcunha da Vítima'),
+        ('vit_mae', 'Mãe da Vítima'),
+        ('aut_nome', 'Nome do Autor'),
+        ('aut_alcunha', 'Alcunha do Autor'),
+        ('aut_mae', 'Mãe do Autor'),
+    )
+    sicad_id = models.IntegerField(db_index=True, verbose_name="Registro SICAD")
+    nro_bop = models.CharField(max_length=500, blank=True, null=True, verbose_name="Número do Boletim")
+    campo = models.CharField(max_length=20, choices=NAME_FIELDS, verbose_name="Campo")
+    nome = models.CharField(max_length=500, verbose_name="Nome")
+    normalized = models.ForeignKey(
+        NormalizedName, on_delete=models.CASCADE, related_name='occurrences', verbose_name="Nome Normalizado",
+    )
+    data_fato = models.DateField(blank=True, null=True)
+    municipios = models.CharField(max_length=500, blank=True, null=True)
+    consolidado = models.CharField(max_length=500, blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Nome de Envolvido'
+        verbose_name_plural = 'Nomes de Envolvidos'
+
+    def __str__(self):
+        return self.nome
+
+
+class NameTrigram(models.Model):
+    """Trigrama de um `NameTerm` (lista invertida da pesquisa aproximada)."""
+    trigram = models.CharField(max_length=3)
+    term = models.ForeignKey(NameTerm, on_delete=models.CASCADE, related_name='trigrams')
+
+    class Meta:
+        indexes = [models.Index(fields=['trigram', 'term'])]
+        verbose_name = 'Trigrama de Nome'
+        verbose_name_plural = 'Trigramas de Nomes'
+
+
+class NumberIndex(models.Model):
+    """Número de boletim ou procedimento canonizado, apontando para o registro da sicadfull."""
+    NUMBER_TYPES = (
+        ('BOP', 'Boletim de Ocorrência'),
+        ('PROC', 'Procedimento'),
+    )
+    tipo = models.CharField(max_length=4, choices=NUMBER_TYPES, verbose_name="Tipo")
+    numero = models.CharField(max_length=100, verbose_name="Número Canônico")
+    sicad_id = models.IntegerField(db_index=True, verbose_name="Registro SICAD")
+
+    class Meta:
+        verbose_name = 'Índice de Número'
+        verbose_name_plural = 'Índices de Números'
+        indexes = [models.Index(fields=['tipo', 'numero'])]
+
+    def __str__(self):
+        return f"{self.tipo} {self.numero}"
+
+
+# --- Estatísticas Pré-agregadas ---
+
+class OccurrenceDimensions(models.Model):
+    """
+    Dimensões das estatísticas de ocorrências. Valores ausentes são gravados
+    como '' (ou 0 no ano) para que participem das restrições de unicidade.
+    """
+    municipios = models.CharField(max_length=500, default='')
+    risp = models.CharField(max_length=500, default='')
+    aisp = models.CharField(max_length=500, default='')
+    consolidado = models.CharField(max_length=500, default='')
+    grupo_ocorrencia = models.CharField(max_length=500, default='')
+    ano_fato = models.IntegerField(default=0)
+    mes_fato = models.CharField(max_length=500, default='')
+    dia_semana = models.CharField(max_length=500, default='')
+    fx_4_hor = models.CharField(max_length=500, default='')
+
+    class Meta:
+        abstract = True
+
+
+class OccurrenceFact(OccurrenceDimensions):
+    """
+    Dimensões de cada registro ativo da sicadfull, como foram contadas nas
+    agregações. Permite descontar a contribuição antiga de um registro alterado.
+    """
+    sicad_id = models.IntegerField(unique=True, verbose_name="Registro SICAD")
+
+    class Meta:
+        verbose_name = 'Fato de Ocorrência'
+        verbose_name_plural = 'Fatos de Ocorrências'
+
+
+class OccurrenceRollup(OccurrenceDimensions):
+    """
+    Contagem de ocorrências de uma agregação (`rollup`) por combinação de
+    dimensões. As dimensões fora da agregação ficam vazias; `chave` é o hash
+    dos valores das dimensões da agregação.
+    """
+    rollup = models.CharField(max_length=30, verbose_name="Agregação")
+    chave = models.CharField(max_length=40, verbose_name="Chave")
+    total = models.IntegerField(default=0, verbose_name="Total")
+
+    class Meta:
+        verbose_name = 'Estatística de Ocorrências'
+        verbose_name_plural = 'Estatísticas de Ocorrências'
+        constraints = [
+            models.UniqueConstraint(fields=['rollup', 'chave'], name='phoenix_rollup_chave_unique'),
+        ]
+        indexes = [models.Index(fields=['rollup', 'ano_fato'])]
+
+    def __str__(self):
+        return f"{self.rollup}: {self.total}"
+
+
+# --- Índice Geográfico ---
+
+class GeoPoint(models.Model):
+    """
+    Coordenadas válidas de um registro da sicadfull, já convertidas para
+    número, com a célula da grade usada para as consultas por área.
+    """
+    sicad_id = models.IntegerField(unique=True, verbose_name="Registro SICAD")
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    cell = models.BigIntegerField(db_index=True, verbose_name="Célula da Grade")
+    data_fato = models.DateField(blank=True, null=True)
+    municipios = models.CharField(max_length=500, blank=True, null=True)
+    consolidado = models.CharField(max_length=500, blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Ponto Geográfico'
+        verbose_name_plural = 'Pontos Geográficos'
+
+    def __str__(self):
+        return f"{self.latitude}, {self.longitude}"
+
+
+class GeoQuarantine(models.Model):
+    """Registro da sicadfull com coordenadas ausentes da grade por serem inválidas."""
+    sicad_id = models.IntegerField(unique=True, verbose_name="Registro SICAD")
+    latitude = models.CharField(max_length=500, blank=True, null=True)
+    longitude = models.CharField(max_length=500, blank=True, null=True)
+    motivo = models.CharField(max_length=100, verbose_name="Motivo")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = 'Coordenada em Quarentena'
+        verbose_name_plural = 'Coordenadas em Quarentena'
+
+    def __str__(self):
+        return f"{self.sicad_id}: {self.motivo}"
@@ -0,0 +1,246 @@
+"""
+Índice de nomes de envolvidos (vítimas, autores, alcunhas e mães).
+
+Os nomes são normalizados (sem acentos, minúsculos, espaços simples). Cada
+nome distinto é gravado uma única vez (`NormalizedName`), ligado às
+palavras que o compõem (`NameTerm`), e as ocorrências na sicadfull
+(`PersonName`) apontam para ele. Os trigramas ficam nas palavras: o
+vocabulário dos nomes é pequeno e cresce pouco com a base, ao contrário de
+um trigrama por ocorrência.
+
+A pesquisa combina prefixo exato do nome com palavras parecidas com cada
+palavra da consulta (similaridade de trigramas), o que tolera acentuação
+inconsistente e erros de digitação.
+"""
+from collections import defaultdict, namedtuple
+from math import ceil
+
+from django.db import transaction
+from django.db.models import Case, Count, FloatField, Value, When
+from django.db.models.functions import Length
+
+from .indexing import IndexSync
+from .models import NameTerm, NameTrigram, NormalizedName, PersonName
+from .text import tokenize
+
+NAME_FIELDS = [field for field, _ in PersonName.NAME_FIELDS]
+EXTRA_FIELDS = ['nro_bop', 'data_fato', 'municipios', 'consolidado']
+
+# Fração mínima dos trigramas de uma palavra da consulta que uma palavra do
+# vocabulário precisa conter para ser comparada com ela.
+MIN_TRIGRAM_OVERLAP = 0.5
+MIN_TERM_SIMILARITY = 0.4
+MIN_TERM_LENGTH = 3
+TERM_LIMIT = 20
+MIN_SIMILARITY = 0.3
+CANDIDATE_LIMIT = 500
+
+PersonHit = namedtuple('PersonHit', ['nome', 'campo', 'sicad_id', 'nro_bop', 'score'])
+NameTerms = NormalizedName.terms.through
+
+
+def normalize_name(nome):
+    """ "  JOSÉ  da Conceição" -> "jose da conceicao" """
+    return ' '.join(tokenize(nome))
+
+
+def trigrams(normalized):
+    """Trigramas no estilo do pg_trgm: cada palavra é completada com espaços."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """Similaridade de Jaccard entre dois conjuntos de trigramas."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _filter(queryset, prefix, data_inicio=None, data_fim=None, municipio=None, consolidado=None):
+    filters = {}
+    if data_inicio:
+        filters[f'{prefix}data_fato__gte'] = data_inicio
+    if data_fim:
+        filters[f'{prefix}data_fato__lte'] = data_fim
+    if municipio:
+        filters[f'{prefix}municipios'] = municipio
+    if consolidado:
+        filters[f'{prefix}consolidado'] = consolidado
+    return queryset.filter(**filters)
+
+
+def _names(filters):
+    """Nomes distintos; com filtros, apenas os que têm alguma ocorrência que os atende."""
+    queryset = NormalizedName.objects.all()
+    if any(filters.values()):
+        queryset = queryset.filter(pk__in=_filter(PersonName.objects, '', **filters).values('normalized_id'))
+    return queryset
+
+
+def similar_terms(word):
+    """
+    Ids das palavras do vocabulário iguais, parecidas ou que começam com
+    `word`, das mais para as menos parecidas (até `TERM_LIMIT`).
+    """
+    grams = trigrams(word)
+    min_hits = max(1, ceil(len(grams) * MIN_TRIGRAM_OVERLAP))
+    fuzzy = NameTrigram.objects.filter(trigram__in=grams).values('term_id').annotate(
+        hits=Count('term_id'),
+    ).filter(hits__gte=min_hits).values_list('term_id', flat=True)
+    prefixed = NameTerm.objects.filter(
+        palavra__gte=word, palavra__lt=word + '\uffff',
+    ).order_by('palavra').values_list('pk', flat=True)[:TERM_LIMIT]
+
+    ranked = []
+    for pk, palavra in NameTerm.objects.filter(pk__in=set(fuzzy) | set(prefixed)).values_list('pk', 'palavra'):
+        score = similarity(grams, trigrams(palavra))
+        if score >= MIN_TERM_SIMILARITY or palavra.startswith(word):
+            ranked.append((palavra != word, -score, len(palavra), pk))
+    ranked.sort()
+    return [pk for *_, pk in ranked[:TERM_LIMIT]]
+
+
+def _with_terms(names, matches):
+    """
+    Até `CANDIDATE_LIMIT` nomes com uma das palavras de cada grupo de
+    `matches`; os mais curtos primeiro, por terem maior similaridade com a consulta.
+    """
+    for terms in matches:
+        names = names.filter(pk__in=NameTerms.objects.filter(nameterm_id__in=terms).values('normalizedname_id'))
+    return list(names.order_by(Length('nome_normalizado'), 'pk').values_list('pk', flat=True)[:CANDIDATE_LIMIT])
+
+
+def search(nome, limit=50, **filters):
+    """
+    Retorna uma lista de `PersonHit` ordenada por relevância.
+    Aceita os mesmos filtros opcionais do Person_SearchForm
+    (data_inicio, data_fim, municipio, consolidado).
+    """
+    query = normalize_name(nome)
+    query_grams = trigrams(query)
+    if not query_grams:
+        return []
+    names = _names(filters)
+
+    # Candidatos por prefixo: intervalo no índice de `nome_normalizado`, em
+    # ordem, para que o nome exato e os mais próximos dele entrem no limite.
+    candidate_ids = set(names.filter(
+        nome_normalizado__gte=query, nome_normalizado__lt=query + '\uffff',
+    ).order_by('nome_normalizado').values_list('pk', flat=True)[:CANDIDATE_LIMIT])
+
+    # Candidatos aproximados: nomes com uma palavra parecida com cada palavra
+    # da consulta. Partículas ("da", "de") e palavras que não se parecem com
+    # nenhuma do vocabulário são ignoradas; se nenhum nome tiver todas as
+    # palavras, tolera uma a menos.
+    words = [word for word in dict.fromkeys(query.split()) if len(word) >= MIN_TERM_LENGTH]
+    matches = [terms for terms in map(similar_terms, words or query.split()) if terms]
+    fuzzy = _with_terms(names, matches) if matches else []
+    if not fuzzy and len(matches) > 1:
+        for index in range(len(matches)):
+            fuzzy += _with_terms(names, matches[:index] + matches[index + 1:])
+    candidate_ids.update(fuzzy)
+
+    # A pontuação é calculada uma vez por nome distinto.
+    scores = {}
+    candidates = NormalizedName.objects.filter(pk__in=candidate_ids)
+    for pk, normalized in candidates.values_list('pk', 'nome_normalizado'):
+        score = similarity(query_grams, trigrams(normalized))
+        if normalized.startswith(query):
+            score += 1.0
+        elif any(word.startswith(query) for word in normalized.split()):
+            score += 0.5
+        if score >= MIN_SIMILARITY:
+            scores[pk] = round(score, 4)
+    if not scores:
+        return []
+
+    # Ocorrências dos nomes pontuados, já ordenadas e limitadas pelo banco
+    # (um `WHEN` por pontuação distinta, não por nome).
+    by_score = defaultdict(list)
+    for pk, value in scores.items():
+        by_score[value].append(pk)
+    score = Case(
+        *[When(normalized_id__in=pks, then=Value(value)) for value, pks in by_score.items()],
+        output_field=FloatField(),
+    )
+    occurrences = _filter(PersonName.objects, '', **filters).filter(
+        normalized_id__in=scores,
+    ).annotate(score=score).order_by('-score', 'nome').values_list(
+        'nome', 'campo', 'sicad_id', 'nro_bop', 'score',
+    )[:limit]
+    return [PersonHit(*row) for row in occurrences]
+
+
+def _keys(model, field, values):
+    """`{valor: pk}` de `values`, criando as linhas que ainda não existem. Retorna também os criados."""
+    keys = dict(model.objects.filter(**{f'{field}__in': values}).values_list(field, 'pk'))
+    missing = [value for value in values if value not in keys]
+    created = {}
+    if missing:
+        model.objects.bulk_create([model(**{field: value}) for value in missing], batch_size=5000)
+        created = dict(model.objects.filter(**{f'{field}__in': missing}).values_list(field, 'pk'))
+        keys.update(created)
+    return keys, created
+
+
+def _index_rows(rows):
+    ids = [row['id'] for row in rows]
+    previous = set(PersonName.objects.filter(sicad_id__in=ids).values_list('normalized_id', flat=True))
+    PersonName.objects.filter(sicad_id__in=ids).delete()
+
+    occurrences = []
+    for row in rows:
+        if row['exclusao']:
+            continue
+        for field in NAME_FIELDS:
+            normalized = normalize_name(row[field])[:500]
+            if normalized:
+                occurrences.append((normalized, PersonName(
+                    sicad_id=row['id'], campo=field, nome=row[field].strip()[:500],
+                    **{extra: row[extra] for extra in EXTRA_FIELDS},
+                )))
+
+    # Nomes ainda não indexados ganham uma linha e são ligados às suas
+    # palavras; só as palavras novas ganham trigramas.
+    names, new_names = _keys(NormalizedName, 'nome_normalizado', {normalized for normalized, _ in occurrences})
+    if new_names:
+        words = {word for normalized in new_names for word in normalized.split()}
+        terms, new_terms = _keys(NameTerm, 'palavra', words)
+        NameTrigram.objects.bulk_create(
+            [NameTrigram(trigram=gram, term_id=pk) for word, pk in new_terms.items() for gram in trigrams(word)],
+            batch_size=5000,
+        )
+        NameTerms.objects.bulk_create(
+            [
+                NameTerms(normalizedname_id=pk, nameterm_id=terms[word])
+                for normalized, pk in new_names.items() for word in set(normalized.split())
+            ],
+            batch_size=5000,
+        )
+
+    for normalized, person in occurrences:
+        person.normalized_id = names[normalized]
+    PersonName.objects.bulk_create([person for _, person in occurrences], batch_size=5000)
+
+    # Nomes que ficaram sem ocorrências saem do índice.
+    NormalizedName.objects.filter(pk__in=previous - set(names.values()), occurrences__isnull=True).delete()
+
+
+def refresh_index(rebuild=False, chunk_size=2000):
+    """Sincroniza o índice de nomes com a `sicadfull`."""
+    if rebuild:
+        PersonName.objects.all().delete()
+        NormalizedName.objects.all().delete()
+        NameTerm.objects.all().delete()
+    sync = IndexSync('nomes', NAME_FIELDS + EXTRA_FIELDS, rebuild=rebuild, chunk_size=chunk_size)
+    for rows in sync.chunks():
+        with transaction.atomic():
+            _index_rows(rows)
+    # Palavras que deixaram de aparecer em qualquer nome.
+    NameTerm.objects.filter(names__isnull=True).delete()
+    sync.commit()
+    return sync.processed
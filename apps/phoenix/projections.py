@@ -0,0 +1,113 @@
+"""
+Perfis de projeção da `sicadfull` e linhas compactas.
+
+A `sicadfull` tem cerca de cem colunas, várias delas textos longos. Um
+perfil define quais colunas uma listagem realmente usa; `fetch` busca só
+essas colunas (`values_list`) e embrulha cada tupla em um objeto com
+`__slots__`, sem o custo de instanciar o modelo. Os demais campos podem ser
+lidos normalmente como atributos: na primeira vez são buscados, todos de
+uma só vez, com uma consulta pela chave primária. Para uma página inteira,
+`load_fields` faz essa busca com uma única consulta.
+"""
+from .models import Sicadfull
+
+ALL_FIELDS = tuple(field.attname for field in Sicadfull._meta.concrete_fields)
+
+PROFILES = {
+    'summary': (
+        'id', 'nro_bop', 'nro_tombo', 'data_registro', 'data_fato', 'municipios', 'bairros', 'consolidado',
+    ),
+    'person': (
+        'id', 'nro_bop', 'data_registro', 'data_fato', 'municipios', 'consolidado',
+        'vit_nome', 'vit_alcunha', 'vit_mae', 'vit_idade', 'vit_sexo',
+        'aut_nome', 'aut_alcunha', 'aut_mae', 'aut_idade', 'aut_sexo',
+    ),
+    # Itens salvos: o resumo mais o necessário para detectar exclusões e alterações.
+    'saved': (
+        'id', 'nro_bop', 'nro_tombo', 'data_registro', 'data_fato', 'municipios', 'bairros',
+        'consolidado', 'exclusao', 'data_modificacao',
+    ),
+    'full': ALL_FIELDS,
+}
+
+
+class Row:
+    """
+    Linha projetada: os valores do perfil ficam em uma tupla e os demais
+    campos, se acessados, em `_extra`.
+    """
+    __slots__ = ('_values', '_extra')
+
+    profile = None
+    fields = ()
+    _index = {}
+
+    def __init__(self, values):
+        self._values = values
+        self._extra = None
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        index = self._index.get(name)
+        if index is not None:
+            return self._values[index]
+        if name == 'pk':
+            return self.id
+        if name not in ALL_FIELDS:
+            raise AttributeError(f"'{type(self).__name__}' não tem o atributo '{name}'")
+        if self._extra is None:
+            load_fields([self])
+        return self._extra[name]
+
+    def as_dict(self):
+        """Campos do perfil como dicionário (para respostas JSON)."""
+        return dict(zip(self.fields, self._values))
+
+    def __eq__(self, other):
+        return isinstance(other, Row) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} id={self.id}>"
+
+
+def _row_class(profile, fields):
+    return type(f"{profile.title()}Row", (Row,), {
+        '__slots__': (),
+        'profile': profile,
+        'fields': fields,
+        '_index': {field: index for index, field in enumerate(fields)},
+    })
+
+
+ROW_CLASSES = {profile: _row_class(profile, fields) for profile, fields in PROFILES.items()}
+
+
+def fetch(queryset, profile='summary'):
+    """Executa o queryset trazendo apenas as colunas do perfil; retorna a lista de linhas."""
+    row_class = ROW_CLASSES[profile]
+    return [row_class(values) for values in queryset.values_list(*row_class.fields)]
+
+
+def load_fields(rows):
+    """Busca, em uma única consulta, os campos fora do perfil das linhas informadas."""
+    pending = {row.id: row for row in rows if row._extra is None}
+    if not pending:
+        return rows
+    by_profile = {}
+    for row in pending.values():
+        by_profile.setdefault(type(row), []).append(row.id)
+    for row_class, ids in by_profile.items():
+        extra = tuple(field for field in ALL_FIELDS if field not in row_class._index)
+        if not extra:
+            continue
+        for values in Sicadfull.objects.filter(pk__in=ids).values_list('id', *extra):
+            pending[values[0]]._extra = dict(zip(extra, values[1:]))
+    # Registros que não existem mais (ou perfis sem campos extras).
+    for row in pending.values():
+        if row._extra is None:
+            row._extra = dict.fromkeys(field for field in ALL_FIELDS if field not in row._index)
+    return rows
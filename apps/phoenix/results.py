@@ -0,0 +1,157 @@
+"""
+Resultados das pesquisas do Phoenix, paginados por chave.
+
+Todas as pesquisas produzem um queryset da `sicadfull` ordenado por
+`(data_registro DESC, pk DESC)`; o cursor carrega o último par dessa chave,
+de modo que a página N custa o mesmo que a primeira. O total exibido é
+aproximado (estimativa do planejador ou contagem limitada) e é calculado
+apenas na primeira página, seguindo no cursor para as seguintes.
+"""
+import json
+from datetime import date, datetime
+
+from django.db import connections
+from django.db.models import F, Q
+
+from apps.base.pagination import KeysetPage, clamp_limit, decode_cursor, encode_cursor
+
+from . import fulltext, lookup, names
+from .forms import BOP_SearchForm, Person_SearchForm, Procedure_SearchForm, Report_SearchForm
+from .models import IndexState, Sicadfull
+from .projections import fetch
+
+PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+# A contagem exata para de contar aqui; acima disso o total é exibido como "1000+".
+COUNT_CAP = 1000
+# Limite de chaves trazidas de um índice que não está no mesmo banco da `sicadfull`.
+MAX_MATCHES = 10000
+
+# Perfil de projeção (apps.phoenix.projections) usado por tipo de pesquisa.
+RESULT_PROFILES = {
+    'bop': 'summary',
+    'procedimento': 'summary',
+    'relato': 'summary',
+    'pessoa': 'person',
+}
+
+SEARCH_FORMS = {
+    'bop': BOP_SearchForm,
+    'procedimento': Procedure_SearchForm,
+    'relato': Report_SearchForm,
+    'pessoa': Person_SearchForm,
+}
+
+
+def search_aliases(analytical):
+    """Bancos consultados por uma pesquisa: o analítico escolhido e os dos índices auxiliares."""
+    return sorted({analytical, fulltext.get_backend().using, IndexState.objects.db})
+
+
+def _filters(data):
+    return {
+        'data_inicio': data.get('data_inicio'),
+        'data_fim': data.get('data_fim'),
+        'municipio': data.get('municipio') or None,
+        'consolidado': data.get('consolidado') or None,
+    }
+
+
+def _apply_filters(queryset, data_inicio=None, data_fim=None, municipio=None, consolidado=None):
+    if data_inicio:
+        queryset = queryset.filter(data_fato__gte=data_inicio)
+    if data_fim:
+        queryset = queryset.filter(data_fato__lte=data_fim)
+    if municipio:
+        queryset = queryset.filter(municipios=municipio)
+    if consolidado:
+        queryset = queryset.filter(consolidado=consolidado)
+    return queryset
+
+
+def search_queryset(tipo, data):
+    """
+    Queryset (sem ordenação) dos registros que atendem à pesquisa `tipo`,
+    a partir do `cleaned_data` do formulário correspondente.
+    """
+    queryset = Sicadfull.objects.filter(exclusao=False)
+    if tipo == 'bop':
+        return queryset.filter(pk__in=lookup.find_bop(data['nro_bop']))
+    if tipo == 'procedimento':
+        return queryset.filter(pk__in=lookup.find_procedure(data['nro_tombo']))
+
+    filters = _filters(data)
+    if tipo == 'relato':
+        queryset = fulltext.filter_queryset(queryset, data['relato'], max_matches=MAX_MATCHES, **filters)
+    elif tipo == 'pessoa':
+        hits = names.search(data['nome'], limit=MAX_MATCHES, **filters)
+        queryset = queryset.filter(pk__in={hit.sicad_id for hit in hits})
+    else:
+        raise ValueError(f"Tipo de pesquisa desconhecido: {tipo}")
+    return _apply_filters(queryset, **filters)
+
+
+def ordered(queryset):
+    """Ordenação dos resultados: `data_registro` mais recente primeiro, depois `pk`."""
+    return queryset.order_by(F('data_registro').desc(nulls_last=True), '-pk')
+
+
+def _after(queryset, data_registro, pk):
+    """Registros que vêm depois de `(data_registro, pk)` na ordenação dos resultados."""
+    if data_registro is None:
+        return queryset.filter(data_registro__isnull=True, pk__lt=pk)
+    return queryset.filter(
+        Q(data_registro__lt=data_registro)
+        | Q(data_registro=data_registro, pk__lt=pk)
+        | Q(data_registro__isnull=True)
+    )
+
+
+def approximate_count(queryset):
+    """
+    Retorna `(total, estimado)`. No PostgreSQL usa a estimativa do
+    planejador; nos demais bancos, uma contagem limitada a `COUNT_CAP`.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate > COUNT_CAP:
+            return estimate, True
+    total = queryset[:COUNT_CAP + 1].count()
+    return min(total, COUNT_CAP), total > COUNT_CAP
+
+
+def paginate(queryset, cursor=None, limit=PAGE_SIZE, profile='summary'):
+    """
+    Retorna `(KeysetPage, (total, estimado))` com as linhas projetadas no `profile`.
+    `cursor` é o `next_cursor` da página anterior; lança ValueError se for inválido.
+    """
+    limit = clamp_limit(limit, PAGE_SIZE, MAX_PAGE_SIZE)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 4:
+            raise ValueError("Cursor inválido.")
+        data_registro, pk, total, estimated = values
+        valid_date = data_registro is None or (isinstance(data_registro, date) and not isinstance(data_registro, datetime))
+        if not valid_date or not isinstance(pk, int) or not isinstance(total, int) or not isinstance(estimated, bool):
+            raise ValueError("Cursor inválido.")
+        queryset = _after(queryset, data_registro, pk)
+        count = (total, estimated)
+    else:
+        count = approximate_count(queryset)
+
+    rows = fetch(ordered(queryset)[:limit + 1], profile)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([last.data_registro, last.id, *count])
+    return KeysetPage(rows, next_cursor, has_more), count
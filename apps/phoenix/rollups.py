@@ -0,0 +1,161 @@
+"""
+Estatísticas de ocorrências pré-agregadas.
+
+Cada agregação (`ROLLUPS`) guarda, em `OccurrenceRollup`, o total de
+registros ativos por combinação das suas dimensões. A sincronização é
+incremental (ver `apps.phoenix.indexing`): para cada registro alterado, a
+contribuição antiga, lida de `OccurrenceFact`, é descontada e a nova é
+somada; registros com `exclusao` apenas saem das contagens.
+
+`count` responde a partir da menor agregação que cobre as dimensões pedidas
+e só recorre a um GROUP BY na `sicadfull` quando nenhuma cobre.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .indexing import IndexSync
+from .models import OccurrenceFact, OccurrenceRollup, Sicadfull
+
+DIMENSIONS = (
+    'municipios', 'risp', 'aisp', 'consolidado', 'grupo_ocorrencia',
+    'ano_fato', 'mes_fato', 'dia_semana', 'fx_4_hor',
+)
+INTEGER_DIMENSIONS = frozenset({'ano_fato'})
+
+# Nome da agregação -> dimensões. Manter em ordem crescente de tamanho.
+ROLLUPS = {
+    'municipio_mes': ('municipios', 'consolidado', 'ano_fato', 'mes_fato'),
+    'grupo_mes': ('grupo_ocorrencia', 'consolidado', 'ano_fato', 'mes_fato'),
+    'area_mes': ('risp', 'aisp', 'consolidado', 'ano_fato', 'mes_fato'),
+    'horario': ('municipios', 'consolidado', 'ano_fato', 'dia_semana', 'fx_4_hor'),
+}
+
+
+def _stored(dimension, value):
+    """Valor da dimensão como gravado nas tabelas de agregação."""
+    if dimension in INTEGER_DIMENSIONS:
+        return value or 0
+    return (value or '')[:500]
+
+
+def _chave(values):
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode()).hexdigest()
+
+
+def find_rollup(dimensions):
+    """Nome da menor agregação que contém todas as dimensões, ou None."""
+    dimensions = set(dimensions)
+    for name, fields in ROLLUPS.items():
+        if dimensions <= set(fields):
+            return name
+    return None
+
+
+def _lookup(dimension, value, stored):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        values = [stored(dimension, item) if stored else item for item in value]
+        return {f'{dimension}__in': values}
+    if value is None and not stored:
+        return {f'{dimension}__isnull': True}
+    return {dimension: stored(dimension, value) if stored else value}
+
+
+def count(group_by=(), **filters):
+    """
+    Total de ocorrências ativas agrupado por `group_by`, com filtros de
+    igualdade (ou listas de valores) nas dimensões. Retorna uma lista de
+    dicionários com as dimensões agrupadas e `total`, do maior para o menor.
+
+        count(['municipios'], consolidado='ROUBO', ano_fato=2024)
+    """
+    group_by = list(group_by)
+    unknown = (set(group_by) | set(filters)) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Dimensão(ões) desconhecida(s): {', '.join(sorted(unknown))}")
+
+    rollup = find_rollup([*group_by, *filters])
+    if rollup is None:
+        queryset = Sicadfull.objects.filter(exclusao=False)
+        for dimension, value in filters.items():
+            queryset = queryset.filter(**_lookup(dimension, value, None))
+        if not group_by:
+            return [queryset.aggregate(total=Count('pk'))]
+        return list(queryset.values(*group_by).annotate(total=Count('pk')).order_by('-total', *group_by))
+
+    queryset = OccurrenceRollup.objects.filter(rollup=rollup)
+    for dimension, value in filters.items():
+        queryset = queryset.filter(**_lookup(dimension, value, _stored))
+    if not group_by:
+        return [{'total': queryset.aggregate(total=Sum('total'))['total'] or 0}]
+    rows = queryset.values(*group_by).annotate(total=Sum('total')).order_by('-total', *group_by)
+    # Valores vazios voltam a ser None, como na sicadfull.
+    return [
+        {**{dimension: row[dimension] or None for dimension in group_by}, 'total': row['total']}
+        for row in rows
+    ]
+
+
+def total(**filters):
+    """Total de ocorrências ativas que atendem aos filtros."""
+    return count((), **filters)[0]['total']
+
+
+def _apply(rows):
+    ids = [row['id'] for row in rows]
+    old = {
+        values[0]: dict(zip(DIMENSIONS, values[1:]))
+        for values in OccurrenceFact.objects.filter(sicad_id__in=ids).values_list('sicad_id', *DIMENSIONS)
+    }
+    new = {
+        row['id']: {dimension: _stored(dimension, row[dimension]) for dimension in DIMENSIONS}
+        for row in rows if not row['exclusao']
+    }
+
+    deltas = {name: defaultdict(int) for name in ROLLUPS}
+    for facts, sign in ((old, -1), (new, 1)):
+        for dimensions in facts.values():
+            for name, fields in ROLLUPS.items():
+                deltas[name][tuple(dimensions[field] for field in fields)] += sign
+
+    OccurrenceFact.objects.filter(sicad_id__in=ids).delete()
+    OccurrenceFact.objects.bulk_create(
+        [OccurrenceFact(sicad_id=sicad_id, **dimensions) for sicad_id, dimensions in new.items()],
+        batch_size=2000,
+    )
+
+    for name, fields in ROLLUPS.items():
+        changes = {_chave(list(key)): (key, delta) for key, delta in deltas[name].items() if delta}
+        if not changes:
+            continue
+        existing = {
+            entry.chave: entry
+            for entry in OccurrenceRollup.objects.filter(rollup=name, chave__in=list(changes)).only('chave', 'total')
+        }
+        updated, emptied, created = [], [], []
+        for chave, (key, delta) in changes.items():
+            if chave in existing:
+                entry = existing[chave]
+                entry.total += delta
+                (updated if entry.total > 0 else emptied).append(entry)
+            elif delta > 0:
+                created.append(OccurrenceRollup(rollup=name, chave=chave, total=delta, **dict(zip(fields, key))))
+        OccurrenceRollup.objects.bulk_update(updated, ['total'], batch_size=2000)
+        OccurrenceRollup.objects.filter(pk__in=[entry.pk for entry in emptied]).delete()
+        OccurrenceRollup.objects.bulk_create(created, batch_size=2000)
+
+
+def refresh_index(rebuild=False, chunk_size=2000):
+    """Sincroniza as estatísticas pré-agregadas com a `sicadfull`."""
+    if rebuild:
+        OccurrenceRollup.objects.all().delete()
+        OccurrenceFact.objects.all().delete()
+    sync = IndexSync('estatisticas', list(DIMENSIONS), rebuild=rebuild, chunk_size=chunk_size)
+    for rows in sync.chunks():
+        with transaction.atomic():
+            _apply(rows)
+    sync.commit()
+    return sync.processed
@@ -0,0 +1,154 @@
+"""
+Roteamento entre o banco transacional e o banco analítico do SICAD.
+
+Os modelos não gerenciados da Phoenix (`sicadfull`, `localidades`,
+`consolidados`) são lidos do banco analítico, somente leitura; todo o
+resto (usuários, sessões, histórico, itens salvos, índices auxiliares)
+fica no `default`. Com réplicas configuradas em `PHOENIX_DATABASES`, cada
+leitura escolhe uma réplica por rodízio (`round_robin`) ou pela que tem
+menos consultas em andamento neste processo (`least_loaded`); réplicas que
+falham ficam fora da escolha por `RETRY_AFTER` segundos.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connections
+from django.db.backends.signals import connection_created
+
+DEFAULTS = {
+    'ANALYTICAL': 'default',
+    'REPLICAS': [],
+    'STRATEGY': 'round_robin',
+    'RETRY_AFTER': 30,
+}
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'PHOENIX_DATABASES', {})}
+
+
+def is_analytical_model(model):
+    return model._meta.app_label == 'phoenix' and not model._meta.managed
+
+
+class ReplicaPool:
+    """Escolha da réplica de leitura, com contagem de carga e de falhas por alias."""
+
+    def __init__(self, primary, replicas, strategy, retry_after):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self.in_flight = {alias: 0 for alias in self.aliases}
+        self._down_until = {}
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    @property
+    def aliases(self):
+        return [self.primary, *self.replicas]
+
+    def healthy(self):
+        now = time.monotonic()
+        return [alias for alias in self.replicas if self._down_until.get(alias, 0) <= now]
+
+    def choose(self):
+        candidates = self.healthy()
+        if not candidates:
+            return self.primary
+        with self._lock:
+            if self.strategy == 'least_loaded':
+                return min(candidates, key=lambda alias: self.in_flight[alias])
+            for _ in range(len(self.replicas)):
+                alias = next(self._cycle)
+                if alias in candidates:
+                    return alias
+        return self.primary
+
+    def mark_down(self, alias):
+        if alias in self.replicas:
+            self._down_until[alias] = time.monotonic() + self.retry_after
+
+    def track(self, alias):
+        """Execute wrapper que conta as consultas em andamento e detecta réplicas fora do ar."""
+        def wrapper(execute, sql, params, many, context):
+            with self._lock:
+                self.in_flight[alias] += 1
+            try:
+                return execute(sql, params, many, context)
+            except (OperationalError, InterfaceError):
+                if not connections[alias].is_usable():
+                    self.mark_down(alias)
+                raise
+            finally:
+                with self._lock:
+                    self.in_flight[alias] -= 1
+        wrapper.replica_pool = self
+        return wrapper
+
+
+_local = threading.local()
+
+
+def _build_pool():
+    options = get_options()
+    return ReplicaPool(options['ANALYTICAL'], options['REPLICAS'], options['STRATEGY'], options['RETRY_AFTER'])
+
+
+pool = _build_pool()
+
+
+def analytical_database():
+    """Alias usado para as leituras da `sicadfull` nesta thread (fixado ou escolhido agora)."""
+    return getattr(_local, 'alias', None) or pool.choose()
+
+
+@contextmanager
+def use_database(alias):
+    """Fixa o alias analítico na thread atual, para que uma operação use uma única réplica."""
+    previous = getattr(_local, 'alias', None)
+    _local.alias = alias
+    try:
+        yield alias
+    finally:
+        _local.alias = previous
+
+
+def _install_tracking(sender, connection, **kwargs):
+    # `connection_created` é enviado a cada reconexão do mesmo objeto de
+    # conexão; um segundo wrapper contaria cada consulta duas vezes.
+    if connection.alias not in pool.replicas:
+        return
+    if not any(getattr(wrapper, 'replica_pool', None) is pool for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(pool.track(connection.alias))
+
+
+connection_created.connect(_install_tracking, dispatch_uid='phoenix_replica_tracking')
+
+
+class AnalyticalRouter:
+    """Envia os modelos não gerenciados da Phoenix ao banco analítico e o resto ao `default`."""
+
+    def db_for_read(self, model, **hints):
+        if is_analytical_model(model):
+            return analytical_database()
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        if is_analytical_model(model):
+            # O banco analítico é somente leitura em produção; a escrita só funciona
+            # quando ele é o próprio `default` (desenvolvimento).
+            return pool.primary
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # `_meta.model` e não `type()`: `request.user` chega como `SimpleLazyObject`.
+        return is_analytical_model(obj1._meta.model) == is_analytical_model(obj2._meta.model) or None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db != 'default' and db in pool.aliases:
+            return False
+        return None
@@ -0,0 +1,184 @@
+"""
+Itens salvos (boletins e procedimentos) dos usuários.
+
+Ao salvar, o número informado é resolvido pelo índice de números
+(`apps.phoenix.lookup`) e o item guarda a chave do registro na `sicadfull`
+e a `data_modificacao` daquele momento. A lista de um usuário é resolvida
+com consultas `IN` por chave primária, em blocos, trazendo só o perfil
+`saved` de colunas, o que permite indicar os itens cujo registro foi
+excluído (`exclusao`) ou alterado depois de salvo.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Max
+
+from .lookup import canonicalize
+from .models import NumberIndex, SavedItem, Sicadfull
+from .projections import fetch
+
+CHUNK_SIZE = 500
+
+STATUS_OK = 'ok'
+STATUS_MODIFIED = 'modificado'
+STATUS_REMOVED = 'removido'
+STATUS_NOT_FOUND = 'nao_encontrado'
+
+ResolvedItem = namedtuple('ResolvedItem', ['item', 'record', 'status'])
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def clean_items(items):
+    """
+    Valida os itens enviados pelo cliente: uma lista de dicionários com
+    `item_type` e `item_id` (texto ou número) e, opcionalmente,
+    `description`. Retorna os itens com `item_id` como texto. Lança
+    ValueError se algum for inválido.
+    """
+    if not isinstance(items, list):
+        raise ValueError("A lista de itens é inválida.")
+    cleaned = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("A lista de itens é inválida.")
+        item_type, item_id, description = item.get('item_type'), item.get('item_id'), item.get('description')
+        if not isinstance(item_type, str) or isinstance(item_id, bool) or not isinstance(item_id, (str, int)):
+            raise ValueError("Cada item precisa de item_type e item_id.")
+        if description is not None and not isinstance(description, str):
+            raise ValueError("A descrição do item é inválida.")
+        cleaned.append({'item_type': item_type, 'item_id': str(item_id), 'description': description})
+    return cleaned
+
+
+def clean_ids(pks):
+    """Valida uma lista de chaves de itens salvos (inteiros). Lança ValueError se for inválida."""
+    if not isinstance(pks, list) or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in pks):
+        raise ValueError("A lista de itens é inválida.")
+    return pks
+
+
+def _resolve_numbers(item_type, item_ids):
+    """Mapeia números informados -> chave do registro mais recente com esse número."""
+    canonical = {item_id: canonicalize(item_id) for item_id in item_ids}
+    found = {}
+    for chunk in _chunks(set(canonical.values())):
+        found.update(
+            NumberIndex.objects.filter(tipo=item_type, numero__in=chunk)
+            .values('numero').annotate(sicad_id=Max('sicad_id')).values_list('numero', 'sicad_id')
+        )
+    return {item_id: found[numero] for item_id, numero in canonical.items() if numero in found}
+
+
+def _fetch_records(sicad_ids):
+    records = {}
+    for chunk in _chunks(set(sicad_ids)):
+        records.update((row.id, row) for row in fetch(Sicadfull.objects.filter(pk__in=chunk), 'saved'))
+    return records
+
+
+def _status(item, record):
+    if record is None:
+        return STATUS_NOT_FOUND
+    if record.exclusao:
+        return STATUS_REMOVED
+    if record.data_modificacao and (item.source_modified is None or record.data_modificacao > item.source_modified):
+        return STATUS_MODIFIED
+    return STATUS_OK
+
+
+def resolve(user):
+    """
+    Lista de `ResolvedItem` com os itens salvos do usuário, na ordem da
+    lista. Itens antigos ainda sem `sicad_id` são resolvidos pelo número
+    e têm a chave gravada.
+    """
+    items = list(user.saved_items.all())
+
+    unresolved = [item for item in items if item.sicad_id is None]
+    for item_type in {item.item_type for item in unresolved}:
+        of_type = [item for item in unresolved if item.item_type == item_type]
+        found = _resolve_numbers(item_type, [item.item_id for item in of_type])
+        for item in of_type:
+            item.sicad_id = found.get(item.item_id)
+    newly_resolved = [item for item in unresolved if item.sicad_id is not None]
+
+    records = _fetch_records(item.sicad_id for item in items if item.sicad_id is not None)
+    for item in newly_resolved:
+        # A referência para detectar alterações passa a ser o estado atual.
+        item.source_modified = getattr(records.get(item.sicad_id), 'data_modificacao', None)
+    SavedItem.objects.bulk_update(newly_resolved, ['sicad_id', 'source_modified'], batch_size=CHUNK_SIZE)
+
+    resolved = []
+    for item in items:
+        record = records.get(item.sicad_id)
+        resolved.append(ResolvedItem(item, record, _status(item, record)))
+    return resolved
+
+
+@transaction.atomic
+def save_items(user, items):
+    """
+    Salva vários itens de uma vez. `items` é uma sequência de dicionários com
+    `item_type`, `item_id` e, opcionalmente, `description`. Itens já salvos
+    são mantidos. Retorna a quantidade de itens enviados ao banco.
+    """
+    items = [item for item in items if item.get('item_type') in dict(SavedItem.SAVED_TYPES) and item.get('item_id')]
+    sicad_ids = {}
+    for item_type in {item['item_type'] for item in items}:
+        found = _resolve_numbers(item_type, [item['item_id'] for item in items if item['item_type'] == item_type])
+        sicad_ids.update(((item_type, item_id), sicad_id) for item_id, sicad_id in found.items())
+
+    modified = {}
+    for chunk in _chunks(set(sicad_ids.values())):
+        modified.update(Sicadfull.objects.filter(pk__in=chunk).values_list('id', 'data_modificacao'))
+
+    objs = []
+    for item in items:
+        sicad_id = sicad_ids.get((item['item_type'], item['item_id']))
+        objs.append(SavedItem(
+            user=user,
+            item_type=item['item_type'],
+            item_id=str(item['item_id'])[:100],
+            description=(item.get('description') or '')[:255] or None,
+            sicad_id=sicad_id,
+            source_modified=modified.get(sicad_id),
+        ))
+    SavedItem.objects.bulk_create(objs, batch_size=CHUNK_SIZE, ignore_conflicts=True)
+    return len(objs)
+
+
+@transaction.atomic
+def unsave_items(user, items):
+    """Remove vários itens (dicionários com `item_type` e `item_id`). Retorna quantos foram removidos."""
+    removed = 0
+    by_type = {}
+    for item in items:
+        by_type.setdefault(item.get('item_type'), set()).add(str(item.get('item_id')))
+    for item_type, item_ids in by_type.items():
+        for chunk in _chunks(item_ids):
+            removed += SavedItem.objects.filter(user=user, item_type=item_type, item_id__in=chunk).delete()[0]
+    return removed
+
+
+@transaction.atomic
+def acknowledge(user, pks=None):
+    """
+    Marca as alterações dos registros como vistas: `source_modified` passa
+    a ser a `data_modificacao` atual. Sem `pks`, vale para todos os itens.
+    """
+    items = user.saved_items.exclude(sicad_id__isnull=True)
+    if pks is not None:
+        items = items.filter(pk__in=pks)
+    items = list(items.only('pk', 'sicad_id', 'source_modified'))
+    modified = {}
+    for chunk in _chunks({item.sicad_id for item in items}):
+        modified.update(Sicadfull.objects.filter(pk__in=chunk).values_list('id', 'data_modificacao'))
+    for item in items:
+        item.source_modified = modified.get(item.sicad_id, item.source_modified)
+    SavedItem.objects.bulk_update(items, ['source_modified'], batch_size=CHUNK_SIZE)
+    return len(items)
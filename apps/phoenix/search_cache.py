@@ -0,0 +1,120 @@
+"""
+Cache dos resultados das pesquisas da Phoenix.
+
+A chave é o hash dos parâmetros normalizados da pesquisa (o número do
+boletim canonizado, os termos do relato já analisados, o nome normalizado,
+os filtros), da página pedida e da versão do índice que responde àquele
+tipo de pesquisa. Quando `phoenix_index` sincroniza um índice, a versão
+muda e as entradas antigas deixam de ser usadas, até saírem pelo LRU.
+
+O cache é compartilhado entre os usuários: ele guarda apenas o resultado
+da pesquisa, e a verificação de acesso ao módulo continua sendo feita, para
+cada usuário, pela view antes de consultá-lo. Pesquisas idênticas
+simultâneas são executadas uma única vez (`SingleFlight`).
+"""
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+
+from apps.base.caching import MISSING, LRUCache, SingleFlight
+
+from .lookup import canonicalize
+from .models import IndexState
+from .names import normalize_name
+from .text import analyze
+
+DEFAULTS = {
+    'MAX_ENTRIES': 1024,
+    'TTL': 300,
+}
+# Intervalo (segundos) entre verificações das versões dos índices.
+VERSION_CHECK_INTERVAL = 30
+
+# Tipo de pesquisa -> índice auxiliar que a responde.
+SEARCH_INDEXES = {
+    'bop': 'numeros',
+    'procedimento': 'numeros',
+    'relato': 'relato',
+    'pessoa': 'nomes',
+}
+
+NORMALIZERS = {
+    'nro_bop': canonicalize,
+    'nro_tombo': canonicalize,
+    'relato': lambda termos: ' '.join(analyze(termos)),
+    'nome': normalize_name,
+}
+
+
+def normalize_params(data):
+    """Parâmetros da pesquisa em forma canônica, sem os campos vazios."""
+    params = {}
+    for field, value in data.items():
+        if value in (None, ''):
+            continue
+        if field in NORMALIZERS:
+            value = NORMALIZERS[field](value)
+        elif hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        params[field] = value
+    return params
+
+
+class SearchResultCache:
+
+    def __init__(self, max_entries=None, ttl=None):
+        options = {**DEFAULTS, **getattr(settings, 'PHOENIX_RESULT_CACHE', {})}
+        self.cache = LRUCache(
+            maxsize=max_entries or options['MAX_ENTRIES'],
+            ttl=ttl if ttl is not None else options['TTL'],
+            name='phoenix.results',
+        )
+        self.flight = SingleFlight()
+        self._versions = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def versions(self):
+        """Versões dos índices auxiliares, relidas no máximo a cada `VERSION_CHECK_INTERVAL`."""
+        now = time.monotonic()
+        if now - self._checked_at >= VERSION_CHECK_INTERVAL:
+            with self._lock:
+                if now - self._checked_at >= VERSION_CHECK_INTERVAL:
+                    self._versions = dict(IndexState.objects.values_list('name', 'version'))
+                    self._checked_at = now
+        return self._versions
+
+    def key(self, tipo, data, **page):
+        """Chave canônica de uma página de resultados."""
+        payload = {
+            'tipo': tipo,
+            'params': normalize_params(data),
+            'page': {name: value for name, value in page.items() if value not in (None, '')},
+            'version': self.versions().get(SEARCH_INDEXES.get(tipo), 0),
+        }
+        raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get_or_compute(self, key, compute):
+        value = self.cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        def run():
+            value = self.cache.get(key, MISSING)
+            if value is MISSING:
+                value = compute()
+                self.cache.set(key, value)
+            return value
+
+        return self.flight.do(key, run)
+
+    def clear(self):
+        self.cache.clear()
+        self._checked_at = 0.0
+
+
+result_cache = SearchResultCache()
@@ -0,0 +1,251 @@
+"""
+Dados sintéticos do SICAD para desenvolvimento e medições de desempenho.
+
+Cria localmente (SQLite) as tabelas não gerenciadas `sicadfull`,
+`localidades` e `consolidados` e as preenche com registros plausíveis:
+municípios e bairros do Pará com coordenadas próximas da sede, números de
+boletim e de procedimento no formato do SICAD, nomes em português e relatos
+montados a partir de modelos por tipo de crime. A geração é determinística
+para uma mesma semente, o que torna os benchmarks comparáveis entre commits.
+"""
+import random
+from datetime import date, time as dtime, timedelta
+
+from django.db import connections, transaction
+
+from .models import Consolidados, Localidades, Sicadfull
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Município -> (latitude, longitude, RISP, peso, bairros).
+MUNICIPIOS = {
+    'BELÉM': (-1.4558, -48.4902, '1', 30, ['NAZARÉ', 'UMARIZAL', 'MARCO', 'PEDREIRA', 'GUAMÁ', 'JURUNAS', 'CREMAÇÃO', 'TELÉGRAFO', 'SACRAMENTA', 'BENGUI', 'TAPANÃ', 'ICOARACI']),
+    'ANANINDEUA': (-1.3659, -48.3721, '1', 12, ['CENTRO', 'COQUEIRO', 'CIDADE NOVA', 'ÁGUAS LINDAS', 'GUANABARA', 'ICUÍ-GUAJARÁ']),
+    'MARITUBA': (-1.3554, -48.3421, '1', 4, ['CENTRO', 'DECOUVILLE', 'NOVA MARITUBA', 'UNIÃO']),
+    'SANTARÉM': (-2.4385, -54.6996, '10', 8, ['CENTRO', 'ALDEIA', 'SANTA CLARA', 'MAICÁ', 'NOVA REPÚBLICA']),
+    'MARABÁ': (-5.3686, -49.1178, '8', 7, ['NOVA MARABÁ', 'CIDADE NOVA', 'VELHA MARABÁ', 'SÃO FÉLIX']),
+    'CASTANHAL': (-1.2939, -47.9262, '3', 5, ['CENTRO', 'NOVA OLINDA', 'JADERLÂNDIA', 'SANTA HELENA']),
+    'PARAUAPEBAS': (-6.0678, -49.9037, '8', 5, ['CIDADE NOVA', 'RIO VERDE', 'UNIÃO', 'LIBERDADE']),
+    'ABAETETUBA': (-1.7218, -48.8788, '2', 3, ['CENTRO', 'SÃO JOÃO', 'ALGODOAL', 'CAMPO VERDE']),
+    'CAMETÁ': (-2.2445, -49.4958, '2', 2, ['CENTRO', 'NOVA CAMETÁ', 'BAIRRO NOVO']),
+    'ALTAMIRA': (-3.2033, -52.2064, '11', 3, ['CENTRO', 'BRASÍLIA', 'MUTIRÃO', 'SUDAM']),
+    'BRAGANÇA': (-1.0536, -46.7656, '4', 2, ['CENTRO', 'ALDEIA', 'PERPÉTUO SOCORRO']),
+    'TUCURUÍ': (-3.7662, -49.6725, '9', 2, ['CENTRO', 'JARDIM MARILUCY', 'SÃO SEBASTIÃO']),
+    'REDENÇÃO': (-8.0258, -50.0317, '13', 2, ['CENTRO', 'JARDIM BELA VISTA', 'VILA PAULISTA']),
+    'BREVES': (-1.6822, -50.4799, '6', 1, ['CENTRO', 'CIDADE NOVA', 'AEROPORTO']),
+    'SALINÓPOLIS': (-0.6136, -47.3561, '4', 1, ['CENTRO', 'ATALAIA', 'SÃO TOMÉ']),
+}
+
+# Crime consolidado -> (grupo, peso, modelos de relato).
+CRIMES = {
+    'ROUBO': ('CRIMES CONTRA O PATRIMÔNIO', 25, [
+        'A vítima relata que foi abordada por {n} indivíduo(s) em uma motocicleta {cor}, que anunciaram o assalto com uma arma de fogo e levaram seu {objeto}.',
+        'Comunica a vítima que, ao sair do {local}, foi surpreendida pelo autor que, mediante grave ameaça com uma faca, subtraiu seu {objeto} e fugiu a pé.',
+        'Relata que estava no ponto de ônibus quando dois homens armados roubaram seu {objeto} e sua carteira com documentos.',
+    ]),
+    'FURTO': ('CRIMES CONTRA O PATRIMÔNIO', 30, [
+        'A vítima informa que deixou o {objeto} no {local} e, ao retornar, percebeu que havia sido furtado, sem testemunhas.',
+        'Comunica o furto de seu {objeto} durante a madrugada, quando a residência estava vazia; o autor entrou pela janela.',
+        'Relata que teve o {objeto} subtraído do interior do veículo {cor} estacionado em frente ao {local}.',
+    ]),
+    'LESÃO CORPORAL': ('CRIMES CONTRA A PESSOA', 12, [
+        'A vítima relata que foi agredida com socos e chutes pelo autor durante uma discussão no {local}.',
+        'Comunica que sofreu lesões no braço após ser atingida com um pedaço de madeira por {n} indivíduo(s).',
+    ]),
+    'AMEAÇA': ('CRIMES CONTRA A PESSOA', 10, [
+        'A vítima informa que vem sendo ameaçada de morte pelo ex-companheiro, por mensagens e pessoalmente no {local}.',
+        'Relata que o vizinho a ameaçou com uma faca após desentendimento sobre o muro da residência.',
+    ]),
+    'HOMICÍDIO': ('CRIMES CONTRA A VIDA', 3, [
+        'Guarnição acionada para ocorrência de homicídio no {local}; a vítima foi atingida por disparos de arma de fogo efetuados por {n} indivíduo(s) em uma motocicleta {cor}.',
+        'Comunica o óbito da vítima após ser golpeada com faca durante briga em frente ao {local}.',
+    ]),
+    'TRÁFICO DE DROGAS': ('CRIMES DE ENTORPECENTES', 6, [
+        'Durante abordagem no {local}, o autor foi flagrado com porções de substância semelhante a cocaína e dinheiro trocado.',
+        'A guarnição recebeu denúncia anônima e encontrou com o autor embalagens de maconha prontas para venda.',
+    ]),
+    'ESTELIONATO': ('CRIMES CONTRA O PATRIMÔNIO', 8, [
+        'A vítima relata que realizou transferência via pix para um suposto vendedor de {objeto} na internet e não recebeu o produto.',
+        'Comunica que recebeu ligação de falso funcionário do banco e teve valores retirados da conta.',
+    ]),
+    'VIOLÊNCIA DOMÉSTICA': ('CRIMES CONTRA A PESSOA', 6, [
+        'A vítima informa que foi agredida pelo companheiro dentro da residência, na presença dos filhos, após discussão.',
+        'Relata que o ex-marido invadiu a casa e quebrou o {objeto}, descumprindo medida protetiva.',
+    ]),
+}
+
+OBJETOS = ['celular', 'notebook', 'bicicleta', 'motocicleta', 'relógio', 'cordão de ouro', 'televisor', 'bolsa', 'botijão de gás', 'aparelho de som']
+LOCAIS = ['supermercado', 'terminal rodoviário', 'feira', 'posto de gasolina', 'bar', 'escola', 'igreja', 'academia', 'shopping', 'porto']
+CORES = ['preta', 'vermelha', 'branca', 'prata', 'azul']
+
+PRENOMES_M = ['José', 'João', 'Antônio', 'Francisco', 'Carlos', 'Paulo', 'Pedro', 'Lucas', 'Luiz', 'Marcos', 'Raimundo', 'Sebastião', 'Manoel', 'Rafael', 'Daniel', 'Marcelo', 'Bruno', 'Eduardo', 'Felipe', 'Gabriel']
+PRENOMES_F = ['Maria', 'Ana', 'Francisca', 'Antônia', 'Adriana', 'Juliana', 'Márcia', 'Fernanda', 'Patrícia', 'Aline', 'Raimunda', 'Sandra', 'Camila', 'Amanda', 'Bruna', 'Jéssica', 'Letícia', 'Luana', 'Conceição', 'Rosângela']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes', 'Freitas', 'Cardoso', 'Ramos', 'Gonçalves', 'Santana', 'Teixeira', 'Pinheiro', 'Cunha', 'Monteiro', 'Batista', 'Conceição']
+ALCUNHAS = ['Baixinho', 'Neguinho', 'Galego', 'Magrão', 'Careca', 'Zé Pequeno', 'Pretinho', 'Cabeça', 'Boca', 'Gordo']
+
+DIAS_SEMANA = ['SEGUNDA-FEIRA', 'TERÇA-FEIRA', 'QUARTA-FEIRA', 'QUINTA-FEIRA', 'SEXTA-FEIRA', 'SÁBADO', 'DOMINGO']
+MESES = ['JANEIRO', 'FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO', 'JULHO', 'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
+FAIXAS_4H = ['00:00 A 03:59', '04:00 A 07:59', '08:00 A 11:59', '12:00 A 15:59', '16:00 A 19:59', '20:00 A 23:59']
+
+FIELDS = [
+    'nro_bop', 'nro_bop_aditado', 'nro_tombo', 'tipo_tombo', 'unidade_origem', 'unidade_responsavel',
+    'data_registro', 'hora_registro', 'data_fato', 'hora_fato', 'data_modificacao', 'dia_semana',
+    'fx_4_hor', 'mes_registro', 'mes_fato', 'ano_registro', 'ano_fato', 'consolidado',
+    'grupo_ocorrencia', 'latitude', 'longitude', 'municipios', 'bairros', 'risp', 'aisp', 'rua_fato',
+    'relato', 'vit_nome', 'vit_idade', 'vit_sexo', 'vit_mae', 'aut_nome', 'aut_alcunha', 'aut_sexo',
+    'qtd', 'exclusao',
+]
+
+
+def ensure_tables(using):
+    """Cria as tabelas não gerenciadas que ainda não existem no banco `using` (somente SQLite)."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        raise ValueError("Os dados sintéticos só podem ser criados em um banco SQLite local.")
+    existing = set(connection.introspection.table_names())
+    created = []
+    with connection.schema_editor() as editor:
+        for model in (Sicadfull, Localidades, Consolidados):
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+                created.append(model._meta.db_table)
+    return created
+
+
+def clear(using):
+    for model in (Sicadfull, Localidades, Consolidados):
+        model.objects.using(using).all().delete()
+
+
+def _nome(rng, sexo):
+    prenomes = PRENOMES_M if sexo == 'MASCULINO' else PRENOMES_F
+    partes = [rng.choice(prenomes)]
+    if rng.random() < 0.4:
+        partes.append(rng.choice(prenomes))
+    partes.extend(rng.sample(SOBRENOMES, rng.choice((1, 2, 2, 3))))
+    if rng.random() < 0.15:
+        partes.insert(-1, rng.choice(('da', 'dos', 'de')))
+    return ' '.join(partes)
+
+
+class Generator:
+    """Gera linhas da `sicadfull` (tuplas na ordem de `FIELDS`) a partir de uma semente."""
+
+    def __init__(self, seed=0, start=date(2019, 1, 1), end=date(2025, 12, 31)):
+        self.rng = random.Random(seed)
+        self.start = start
+        self.days = (end - start).days
+        self.municipios = list(MUNICIPIOS)
+        self.municipio_weights = [MUNICIPIOS[name][3] for name in self.municipios]
+        self.crimes = list(CRIMES)
+        self.crime_weights = [CRIMES[name][1] for name in self.crimes]
+
+    def row(self, sequence):
+        rng = self.rng
+        municipio = rng.choices(self.municipios, self.municipio_weights)[0]
+        latitude, longitude, risp, _, bairros = MUNICIPIOS[municipio]
+        crime = rng.choices(self.crimes, self.crime_weights)[0]
+        grupo, _, relatos = CRIMES[crime]
+
+        data_fato = self.start + timedelta(days=rng.randrange(self.days))
+        data_registro = data_fato + timedelta(days=rng.choice((0, 0, 0, 1, 1, 2, 5)))
+        hora_fato = dtime(rng.randrange(24), rng.randrange(60))
+        modificado = data_registro + timedelta(days=rng.randrange(30)) if rng.random() < 0.1 else data_registro
+        unidade = 10000 + rng.randrange(900)
+        ano = data_registro.year
+
+        nro_bop = f"{sequence % 100000:05d}/{ano}.{unidade:06d}-{sequence % 10}"
+        aditado = f"{(sequence + 7) % 100000:05d}/{ano}.{unidade:06d}-{(sequence + 3) % 10}" if rng.random() < 0.02 else None
+        tombo = f"{rng.randrange(1, 10000):04d}/{ano}.{unidade:06d}-{rng.randrange(10)}" if rng.random() < 0.3 else None
+
+        vit_sexo = rng.choice(('MASCULINO', 'FEMININO'))
+        aut_sexo = rng.choice(('MASCULINO', 'MASCULINO', 'MASCULINO', 'FEMININO'))
+        autor_conhecido = rng.random() < 0.35
+        relato = rng.choice(relatos).format(
+            n=rng.choice(('um', 'dois', 'três')), cor=rng.choice(CORES),
+            objeto=rng.choice(OBJETOS), local=rng.choice(LOCAIS),
+        )
+        # Coordenadas: ~1% sem coordenada e ~0,5% inválidas, como na base real.
+        if rng.random() < 0.01:
+            lat = lon = None
+        elif rng.random() < 0.005:
+            lat, lon = '0', '0'
+        else:
+            lat = f"{latitude + rng.gauss(0, 0.03):.6f}".replace('.', ',')
+            lon = f"{longitude + rng.gauss(0, 0.03):.6f}".replace('.', ',')
+
+        return (
+            nro_bop, aditado, tombo, 'IPL' if tombo else None,
+            f"SECCIONAL {municipio}", f"SECCIONAL {municipio}",
+            data_registro, dtime(rng.randrange(24), rng.randrange(60)), data_fato, hora_fato, modificado,
+            DIAS_SEMANA[data_fato.weekday()], FAIXAS_4H[hora_fato.hour // 4],
+            MESES[data_registro.month - 1], MESES[data_fato.month - 1], data_registro.year, data_fato.year,
+            crime, grupo, lat, lon, municipio, rng.choice(bairros), risp, f"{risp}.{rng.randrange(1, 5)}",
+            f"RUA {rng.choice(SOBRENOMES).upper()}, {rng.randrange(1, 3000)}",
+            relato, _nome(rng, vit_sexo), rng.randrange(12, 90), vit_sexo, _nome(rng, 'FEMININO'),
+            _nome(rng, aut_sexo) if autor_conhecido else None,
+            rng.choice(ALCUNHAS) if autor_conhecido and rng.random() < 0.3 else None,
+            aut_sexo if autor_conhecido else None,
+            1, rng.random() < 0.01,
+        )
+
+    def rows(self, count, first_sequence=1):
+        for sequence in range(first_sequence, first_sequence + count):
+            yield self.row(sequence)
+
+
+def _adapters(connection):
+    """Conversão de cada coluna de `FIELDS` para o valor aceito pelo driver do banco."""
+    ops = connection.ops
+    by_type = {
+        'DateField': ops.adapt_datefield_value,
+        'TimeField': ops.adapt_timefield_value,
+    }
+    return [by_type.get(Sicadfull._meta.get_field(field).get_internal_type()) for field in FIELDS]
+
+
+def _insert_sql(connection):
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(Sicadfull._meta.get_field(field).column) for field in FIELDS)
+    placeholders = ', '.join(['%s'] * len(FIELDS))
+    return f"INSERT INTO {quote(Sicadfull._meta.db_table)} ({columns}) VALUES ({placeholders})"
+
+
+def populate_reference(using):
+    """Preenche `localidades` e `consolidados` (se vazias) com os valores usados pelo gerador."""
+    if not Localidades.objects.using(using).exists():
+        Localidades.objects.using(using).bulk_create(
+            Localidades(risp=risp, municipios=municipio, bairros=bairro)
+            for municipio, (_, _, risp, _, bairros) in MUNICIPIOS.items()
+            for bairro in bairros
+        )
+    if not Consolidados.objects.using(using).exists():
+        Consolidados.objects.using(using).bulk_create(Consolidados(consolidado=crime) for crime in CRIMES)
+
+
+def generate(count, using='default', seed=0, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Insere `count` registros sintéticos na `sicadfull` do banco `using`,
+    em lotes de `batch_size`. Os números de boletim continuam a partir do
+    maior `pk` existente. `progress(inseridos)` é chamado após cada lote.
+    """
+    connection = connections[using]
+    sql = _insert_sql(connection)
+    adapters = [(index, adapt) for index, adapt in enumerate(_adapters(connection)) if adapt]
+    last_pk = Sicadfull.objects.using(using).order_by('-pk').values_list('pk', flat=True).first() or 0
+    generator = Generator(seed=seed + last_pk)
+    inserted = 0
+    while inserted < count:
+        size = min(batch_size, count - inserted)
+        batch = []
+        for row in generator.rows(size, first_sequence=last_pk + inserted + 1):
+            row = list(row)
+            for index, adapt in adapters:
+                row[index] = adapt(row[index])
+            batch.append(row)
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        inserted += size
+        if progress:
+            progress(inserted)
+    return inserted
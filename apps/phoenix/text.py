@@ -0,0 +1,61 @@
+"""
+Normalização de texto em português usada pelos índices da Phoenix.
+"""
+import re
+import unicodedata
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+    a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela
+    pelos pelas para com sem sob sobre ao aos e ou que se sua seu suas seus
+    ele ela eles elas lhe lhes me te nao sim foi era ser estar esta este isso
+""".split())
+
+# Sufixos removidos em ordem (já sem acentos), inspirados no RSLP (Orengo & Huyck).
+# Cada regra: (sufixo, tamanho mínimo do radical, substituição).
+PLURAL_RULES = (
+    ('oes', 3, 'ao'), ('aes', 3, 'ao'), ('ais', 2, 'al'), ('eis', 2, 'el'),
+    ('ois', 2, 'ol'), ('ns', 1, 'm'), ('res', 3, 'r'), ('s', 2, ''),
+)
+SUFFIX_RULES = (
+    ('amente', 4, ''), ('mente', 4, ''), ('idade', 4, ''), ('mento', 4, ''),
+    ('acao', 3, ''), ('icao', 3, ''), ('ucao', 3, ''), ('ador', 3, ''),
+    ('ando', 3, ''), ('endo', 3, ''), ('indo', 3, ''), ('aram', 3, ''),
+    ('eram', 3, ''), ('iram', 3, ''), ('ava', 3, ''), ('ado', 3, ''),
+    ('ido', 3, ''), ('ada', 3, ''), ('ida', 3, ''), ('ar', 3, ''),
+    ('er', 3, ''), ('ir', 3, ''), ('ou', 3, ''), ('eu', 3, ''), ('iu', 3, ''),
+    ('ao', 3, ''), ('a', 3, ''), ('o', 3, ''), ('e', 3, ''),
+)
+
+
+def fold(text):
+    """Remove acentos e converte para minúsculas ("Ação" -> "acao")."""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Divide o texto normalizado em palavras."""
+    return TOKEN_RE.findall(fold(text))
+
+
+def _strip(word, rules):
+    for suffix, min_stem, replacement in rules:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def stem(word):
+    """Radical aproximado de uma palavra já normalizada ("roubados" -> "roub")."""
+    if word.isdigit() or len(word) <= 3:
+        return word
+    return _strip(_strip(word, PLURAL_RULES), SUFFIX_RULES)
+
+
+def analyze(text):
+    """Tokeniza, remove stopwords e reduz cada palavra ao radical."""
+    return [stem(token) for token in tokenize(text) if token not in STOPWORDS]
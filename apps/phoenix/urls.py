@@ -5,5 +5,7 @@ app_name = 'phoenix'
 
 urlpatterns = [
     path('', views.home, name='home'),
-    # Adicionaremos as URLs dos resultados da pesquisa aqui no futuro
+    path('resultados/<str:tipo>/', views.resultados, name='resultados'),
+    path('exportar/<str:tipo>.<str:formato>', views.exportar, name='exportar'),
+    path('itens-salvos/', views.itens_salvos, name='itens_salvos'),
 ]
\ No newline at end of file
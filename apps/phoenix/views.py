@@ -1,6 +1,15 @@
+import json
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET, require_http_methods
 from apps.base.decorators import secure_module_access
+from . import export, results, saved
+from .concurrency import SearchRejected, SearchTimeout, runner as search_runner
+from .routers import analytical_database, use_database
+from .history import recent_searches, writer as history_writer
+from .search_cache import result_cache
 
 @secure_module_access
 def home(request):
@@ -8,5 +17,147 @@ def home(request):
     Exibe a página principal da aplicação Phoenix com o histórico 
     de pesquisas e itens salvos do usuário.
     """
-    context = {}
-    return render(request, 'phoenix.html', context)
\ No newline at end of file
+    context = {
+        'search_history': recent_searches(request.user),
+    }
+    return render(request, 'phoenix.html', context)
+
+@require_GET
+@secure_module_access
+async def resultados(request, tipo):
+    """
+    Resultados de uma pesquisa em JSON, paginados por cursor.
+    `tipo` é bop, procedimento, relato ou pessoa; os demais parâmetros são os
+    campos do formulário correspondente, mais `cursor` e `limit`.
+
+    A pesquisa roda no executor de `apps.phoenix.concurrency`, com limite de
+    pesquisas simultâneas (global e por usuário) e de tempo.
+    """
+    form_class = results.SEARCH_FORMS.get(tipo)
+    if form_class is None:
+        return JsonResponse({'message': 'Tipo de pesquisa inválido.'}, status=404)
+    form = form_class(request.GET)
+    if not await sync_to_async(form.is_valid)():
+        return JsonResponse({'message': 'Parâmetros inválidos.', 'errors': form.errors}, status=400)
+
+    user_id = request.user.pk
+    cursor, limit = request.GET.get('cursor'), request.GET.get('limit')
+
+    # Uma única réplica do banco analítico atende a pesquisa inteira.
+    database = analytical_database()
+
+    def search():
+        if not cursor:
+            history_writer.record(user_id, tipo, form.cleaned_data)
+        # O cache é compartilhado entre usuários; o acesso já foi verificado por @secure_module_access.
+        key = result_cache.key(tipo, form.cleaned_data, cursor=cursor, limit=limit)
+        with use_database(database):
+            return result_cache.get_or_compute(key, lambda: _search_payload(tipo, form.cleaned_data, cursor, limit))
+
+    try:
+        payload = await search_runner.run(user_id, search, aliases=results.search_aliases(database))
+    except SearchRejected as exc:
+        message = (
+            'Você já tem pesquisas em andamento. Aguarde a conclusão antes de iniciar outra.'
+            if exc.scope == 'user' else
+            'O sistema está com muitas pesquisas em andamento. Tente novamente em instantes.'
+        )
+        response = JsonResponse({'message': message}, status=429 if exc.scope == 'user' else 503)
+        response['Retry-After'] = '5'
+        return response
+    except SearchTimeout:
+        return JsonResponse({
+            'message': 'A pesquisa excedeu o tempo limite. Refine sua pesquisa '
+                       '(por exemplo, informe um período menor, o município ou o tipo de crime).',
+            'refine': True,
+        }, status=503)
+    except ValueError:
+        return JsonResponse({'message': 'Cursor inválido.'}, status=400)
+    return JsonResponse(payload)
+
+def _search_payload(tipo, data, cursor, limit):
+    page, (total, estimated) = results.paginate(
+        results.search_queryset(tipo, data),
+        cursor=cursor,
+        limit=limit,
+        profile=results.RESULT_PROFILES[tipo],
+    )
+    return {
+        'results': [row.as_dict() for row in page.rows],
+        'next_cursor': page.next_cursor,
+        'has_more': page.has_more,
+        'total': total,
+        'total_is_estimate': estimated,
+    }
+
+@require_GET
+@secure_module_access
+def exportar(request, tipo, formato):
+    """
+    Exporta os resultados de uma pesquisa em CSV ou XLSX, em fluxo contínuo.
+    As colunas vêm do parâmetro `colunas` (repetido); o total de linhas é
+    limitado conforme o nível hierárquico do usuário.
+    """
+    form_class = results.SEARCH_FORMS.get(tipo)
+    if form_class is None or formato not in export.FORMATS:
+        return JsonResponse({'message': 'Exportação inválida.'}, status=404)
+    max_rows = export.row_limit(request.user)
+    if max_rows <= 0:
+        return JsonResponse({'message': 'Seu perfil não permite exportar resultados.'}, status=403)
+    form = form_class(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'message': 'Parâmetros inválidos.', 'errors': form.errors}, status=400)
+    try:
+        columns = export.clean_columns(request.GET.getlist('colunas'))
+    except ValueError as exc:
+        return JsonResponse({'message': str(exc)}, status=400)
+
+    queryset = results.ordered(results.search_queryset(tipo, form.cleaned_data))[:max_rows]
+    response = StreamingHttpResponse(
+        export.STREAMERS[formato](queryset, columns),
+        content_type=export.FORMATS[formato],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export.filename(tipo, formato)}"'
+    return response
+
+@require_http_methods(['GET', 'POST'])
+@secure_module_access
+def itens_salvos(request):
+    """
+    GET: itens salvos do usuário, resolvidos nos registros da sicadfull.
+    POST (JSON): {"action": "save" | "unsave" | "acknowledge", "items": [...]}
+    para salvar ou remover vários itens em uma única transação.
+    """
+    if request.method == 'POST':
+        try:
+            body = json.loads(request.body)
+            action, items = body.get('action'), body.get('items') or []
+        except (ValueError, AttributeError):
+            return JsonResponse({'message': 'Requisição inválida.'}, status=400)
+        try:
+            if action in ('save', 'unsave'):
+                items = saved.clean_items(items)
+            elif action == 'acknowledge':
+                items = saved.clean_ids(items)
+        except ValueError as exc:
+            return JsonResponse({'message': str(exc)}, status=400)
+        if action == 'save':
+            return JsonResponse({'saved': saved.save_items(request.user, items)})
+        if action == 'unsave':
+            return JsonResponse({'removed': saved.unsave_items(request.user, items)})
+        if action == 'acknowledge':
+            return JsonResponse({'acknowledged': saved.acknowledge(request.user, items or None)})
+        return JsonResponse({'message': 'Ação inválida.'}, status=400)
+
+    return JsonResponse({'results': [
+        {
+            'id': entry.item.pk,
+            'item_type': entry.item.item_type,
+            'item_id': entry.item.item_id,
+            'description': entry.item.description,
+            'saved_at': entry.item.timestamp,
+            'status': entry.status,
+            'record': entry.record.as_dict() if entry.record else None,
+        }
+        for entry in saved.resolve(request.user)
+    ]})
@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -34,8 +35,19 @@ INSTALLED_APPS = [
     'apps.nexus'
 ]
 
+# A ordem importa:
+# - MetricsMiddleware vem antes de QueryInstrumentationMiddleware, porque lê o
+#   perfil de consultas que ela anexa à requisição.
+# - As duas ficam antes de Session e AuthenticationMiddleware, para medir
+#   também as consultas da sessão e do usuário. Por isso não podem usar
+#   `request.user` antes de chamar `get_response`.
+# - Views que autorizam por `request.user` (metrics_view e query_offenders_view
+#   conferem se é administrador) dependem de AuthenticationMiddleware estar
+#   nesta lista. Sem ela, `request.user` não existe e a view falha.
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.base.middleware.MetricsMiddleware',
+    'apps.base.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -74,9 +86,45 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Banco analítico do SICAD (sicadfull, localidades, consolidados), somente leitura.
+# Sem SICAD_DB_NAME, essas tabelas são lidas do `default`. SICAD_DB_REPLICAS é uma
+# lista de hosts separados por vírgula, com os mesmos banco e credenciais.
+SICAD_DB_NAME = os.getenv("SICAD_DB_NAME")
+PHOENIX_DATABASES = {
+    'ANALYTICAL': 'default',
+    'REPLICAS': [],
+    'STRATEGY': os.getenv("SICAD_DB_STRATEGY", 'round_robin'),  # ou 'least_loaded'
+    'RETRY_AFTER': 30,
+}
+if SICAD_DB_NAME:
+    SICAD_DB_ENGINE = os.getenv("SICAD_DB_ENGINE", 'django.db.backends.postgresql')
+    DATABASES['sicad'] = {
+        'ENGINE': SICAD_DB_ENGINE,
+        'NAME': SICAD_DB_NAME,
+        'USER': os.getenv("SICAD_DB_USER", ''),
+        'PASSWORD': os.getenv("SICAD_DB_PASSWORD", ''),
+        'HOST': os.getenv("SICAD_DB_HOST", ''),
+        'PORT': os.getenv("SICAD_DB_PORT", ''),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': (
+            {'options': '-c default_transaction_read_only=on'}
+            if SICAD_DB_ENGINE == 'django.db.backends.postgresql' else {}
+        ),
+        'TEST': {'MIRROR': 'default'},
+    }
+    PHOENIX_DATABASES['ANALYTICAL'] = 'sicad'
+    for index, host in enumerate(filter(None, os.getenv("SICAD_DB_REPLICAS", '').split(',')), start=1):
+        DATABASES[f'sicad_replica_{index}'] = {**DATABASES['sicad'], 'HOST': host.strip()}
+        PHOENIX_DATABASES['REPLICAS'].append(f'sicad_replica_{index}')
+
+DATABASE_ROUTERS = ['apps.phoenix.routers.AnalyticalRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -132,4 +180,135 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 SESSION_COOKIE_AGE = 1800
 
 # Salva a sessão a cada requisição, atualizando o tempo de expiração
-SESSION_SAVE_EVERY_REQUEST = True
\ No newline at end of file
+SESSION_SAVE_EVERY_REQUEST = True
+
+# Pesquisa textual da Phoenix (relato, complemento, identificação do fato e observação).
+# Em produção, use 'apps.phoenix.fulltext.PostgresFullTextBackend'.
+PHOENIX_FULLTEXT = {
+    'BACKEND': 'apps.phoenix.fulltext.SQLiteFTS5Backend',
+    'DATABASE': 'default',
+}
+
+# Tempo (segundos) que as listas de municípios e tipos de crime ficam em memória.
+# refresh_phoenix_choices invalida todos os processos pelo carimbo de versão no banco,
+# conferido a cada 5 segundos.
+PHOENIX_CHOICES_TTL = 3600
+
+# Registro de última atividade (apps.base.activity): no máximo uma anotação por
+# usuário a cada RESOLUTION segundos, gravadas em lote a cada FLUSH_INTERVAL
+# segundos ou quando o buffer atinge MAX_BUFFER usuários.
+ACTIVITY_TRACKING = {
+    'RESOLUTION': 60,
+    'FLUSH_INTERVAL': 30,
+    'MAX_BUFFER': 500,
+}
+
+# Validade (segundos) do snapshot de permissões de módulo de cada usuário no cache.
+# As alterações de acesso valem na hora: os sinais de apps.base incrementam
+# CustomUser.permissions_version, que faz parte da chave do snapshot.
+PERMISSION_SNAPSHOT_TTL = 300
+
+# Máximo de linhas por exportação da Phoenix, por nível hierárquico
+# (1 = Administrador ... 4 = Usuário). Níveis ausentes não exportam.
+PHOENIX_EXPORT_ROW_LIMITS = {
+    1: 100000,
+    2: 50000,
+    3: 20000,
+    4: 5000,
+}
+
+# Região (sul, oeste, norte, leste) fora da qual as coordenadas da sicadfull
+# vão para a quarentena do índice geográfico. None aceita qualquer ponto válido.
+PHOENIX_GEO_BOUNDS = None
+
+# Cache (em memória de cada processo) das páginas de resultados da Phoenix.
+# As entradas deixam de valer quando o índice correspondente é sincronizado.
+PHOENIX_RESULT_CACHE = {
+    'MAX_ENTRIES': 1024,
+    'TTL': 300,
+}
+
+# Histórico de pesquisas da Phoenix (apps.phoenix.history): gravado em lote a cada
+# FLUSH_INTERVAL segundos ou MAX_BUFFER pesquisas. O comando compact_search_history
+# remove o que passou de RETENTION_DAYS dias e mantém até MAX_PER_USER linhas por usuário.
+SEARCH_HISTORY = {
+    'FLUSH_INTERVAL': 10,
+    'MAX_BUFFER': 200,
+    'RETENTION_DAYS': 180,
+    'MAX_PER_USER': 200,
+}
+
+# Limites das pesquisas da Phoenix (por processo): pesquisas simultâneas no total
+# e por usuário, e tempo máximo (segundos) de cada pesquisa no banco.
+PHOENIX_SEARCH_LIMITS = {
+    'GLOBAL': 8,
+    'PER_USER': 2,
+    'TIMEOUT': 10,
+}
+
+# Instrumentação das consultas SQL por requisição (apps.base.instrumentation).
+# BUDGETS dá o máximo de consultas por view (`app_name:url_name`); as demais usam
+# DEFAULT_BUDGET. Em `manage.py test` o orçamento estourado faz a requisição falhar.
+QUERY_INSTRUMENTATION = {
+    'ENABLED': True,
+    'STRICT': sys.argv[1:2] == ['test'],
+    'DEFAULT_BUDGET': 50,
+    'BUDGETS': {
+        'base:home': 15,
+        'base:user_management': 15,
+        'base:user_directory': 15,
+        'base:user_profile': 20,
+        'phoenix:home': 20,
+        'phoenix:resultados': 25,
+        'phoenix:itens_salvos': 30,
+    },
+    'N_PLUS_ONE_THRESHOLD': 10,
+    'SLOW_QUERY_MS': 200,
+    'KEEP_SLOWEST': 5,
+    'RING_SIZE': 100,
+}
+
+# Métricas no formato do Prometheus (apps.base.metrics), em management/metrics/.
+# Com vários processos (gunicorn), aponte MULTIPROCESS_DIR para um diretório
+# local limpo a cada reinício. TOKEN libera a coleta por `Authorization: Bearer`.
+METRICS = {
+    'ENABLED': True,
+    'NAMESPACE': 'sara',
+    'MULTIPROCESS_DIR': os.getenv('METRICS_MULTIPROCESS_DIR') or None,
+    'FLUSH_INTERVAL': 15,
+    'TOKEN': os.getenv('METRICS_TOKEN') or None,
+}
+
+# Teste de carga em processo (`python manage.py loadtest`). SLOS define, por view
+# (`app_name:url_name`), limites de p50_ms/p95_ms/p99_ms/error_rate; as demais
+# usam DEFAULT_SLO. Os usuários de teste são contas reais com o prefixo abaixo
+# (`loadtest --cleanup` as remove). Com DEBUG desligado, o teste só roda com
+# --i-know-this-is-not-production, mesmo com LOAD_TEST_PASSWORD definida; sem
+# senha, cada execução sorteia uma. As senhas de teste usam PASSWORD_HASHERS (rápido), para
+# que o login não meça só o custo do PBKDF2.
+LOAD_TEST = {
+    'USERS': 10,
+    'DURATION': 30,
+    'THINK_TIME': 0.5,
+    'PASSWORD': os.getenv('LOAD_TEST_PASSWORD'),
+    'USERNAME_PREFIX': 'loadtest_',
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+    'DEFAULT_SLO': {'p95_ms': 500, 'error_rate': 0.01},
+    'SLOS': {
+        'base:home': {'p95_ms': 300},
+        'base:set_theme': {'p95_ms': 200},
+        'base:user_management': {'p95_ms': 400},
+        'phoenix:home': {'p95_ms': 300},
+        'phoenix:resultados': {'p95_ms': 800, 'error_rate': 0.02},
+    },
+}
+
+# Miniaturas das fotos de perfil (apps.base.thumbnails). Os arquivos em DIRECTORY têm
+# o hash do conteúdo no nome e nunca mudam: sirva-os com `Cache-Control: immutable`.
+# Para as fotos já existentes: python manage.py generate_avatar_thumbnails
+AVATAR_THUMBNAILS = {
+    'SIZES': (42, 96, 256),
+    'FORMATS': ('webp', 'jpeg'),
+    'DIRECTORY': 'profile_pics/thumbs',
+    'QUALITY': {'webp': 80, 'jpeg': 82},
+}